@@ -1,8 +1,9 @@
-"""Health check endpoint"""
+"""Health check endpoints"""
 from fastapi import APIRouter
-from app.models.schemas import HealthResponse
-from app.core.azure_speech import azure_speech_service
-from app.services.phoneme_service import phoneme_service
+from fastapi.responses import ORJSONResponse
+
+from app.core.startup import startup
+from app.models.schemas import HealthResponse, LivenessResponse, ReadinessResponse
 from app import __version__
 
 router = APIRouter()
@@ -11,9 +12,37 @@ router = APIRouter()
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """Check API health and service status"""
+    from app.core.azure_speech import azure_speech_service
+    from app.services.phoneme_service import phoneme_service
+
     return HealthResponse(
         status="healthy",
         version=__version__,
         azure_configured=azure_speech_service.configured,
-        allosaurus_loaded=phoneme_service.loaded
+        # The model loads on first use, so report whether it can be used
+        allosaurus_loaded=phoneme_service.available
     )
+
+
+@router.get("/health/live", response_model=LivenessResponse)
+async def liveness():
+    """The process is up and serving (touches no backend)"""
+    return LivenessResponse(status="alive", uptime_seconds=round(startup.uptime(), 3))
+
+
+@router.get(
+    "/health/ready",
+    response_model=ReadinessResponse,
+    responses={503: {"model": ReadinessResponse, "description": "Starting or still warming up"}}
+)
+async def readiness():
+    """
+    Whether startup and the warm-up have finished, with each component's
+    state and the startup phase timings
+
+    Answers 503 until then. Components that could not be warmed are
+    reported (status "degraded") but do not keep the instance out of
+    rotation; the API serves without them as it would after a lazy load.
+    """
+    stats = startup.get_stats()
+    return ORJSONResponse(status_code=200 if stats["ready"] else 503, content=stats)
@@ -0,0 +1,42 @@
+"""Admin endpoints for stored request profiles"""
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import FileResponse
+
+from app.core.config import settings
+from app.core.profiling import profile_store, token_matches
+
+router = APIRouter()
+
+
+def _authorize(admin_token: Optional[str]) -> None:
+    if not settings.PROFILING_ENABLED or not settings.PROFILING_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token_matches(admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.get("/admin/profiles")
+async def list_profiles(x_admin_token: Optional[str] = Header(None)):
+    """
+    List stored profiles, newest first
+
+    Requires the X-Admin-Token header to equal PROFILING_TOKEN.
+    """
+    _authorize(x_admin_token)
+    return {"profiles": profile_store.list()}
+
+
+@router.get("/admin/profiles/{profile_id}/{kind}")
+async def download_profile(profile_id: str, kind: str, x_admin_token: Optional[str] = Header(None)):
+    """
+    Download one profile
+
+    kind is "cpu" (folded stacks) or "alloc" (tracemalloc growth by line).
+    """
+    _authorize(x_admin_token)
+    path = profile_store.path(profile_id, kind)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain; charset=utf-8", filename=f"{profile_id}.{kind}.txt")
@@ -1,10 +1,24 @@
 """Pronunciation assessment endpoints"""
-from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Body
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import Any, Dict, Optional, Tuple, Union
+import asyncio
 import logging
 import base64
 
-from app.models.schemas import PronunciationScoreResponse, PronunciationScoreRequest, ErrorResponse
+from app.api.serialization import score_response_encoder
+from app.core.config import settings
+from app.core.executor import WorkerPoolSaturated
+from app.core.metrics import metrics
+from app.models.schemas import (
+    PronunciationScoreResponse,
+    PronunciationScoreRequest,
+    ErrorResponse,
+    BatchScoreRequest,
+    BatchScoreResponse,
+    BatchItemResult,
+)
+from app.services.drill_corpus import Drill, resolve_reference
 from app.services.pronunciation_service import pronunciation_service
 
 logger = logging.getLogger(__name__)
@@ -26,63 +40,274 @@ async def score_pronunciation(request: PronunciationScoreRequest):
     Request body:
     {
         "text": "word to pronounce",
+        "exercise_id": "ex-1" (optional, a drill; may replace text),
         "audio_data": "base64_encoded_audio",
         "item_type": "word" (optional)
     }
+
+    Prefer /api/score/upload or /api/score/raw for new clients: they skip
+    the base64 overhead and the extra copy of the audio.
     """
+    # Decode base64 audio
     try:
-        # Extract parameters from Pydantic model
-        text = request.text
-        audio_base64 = request.audio_data
-        item_type = request.item_type
-        audio_format = request.audio_format
+        audio_data = base64.b64decode(request.audio_data)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid base64 audio data: {str(e)}")
+
+    if len(audio_data) > settings.MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=_too_large_detail())
+
+    text, drill = _resolve_reference(request.text, request.exercise_id)
+    return await _score_audio(audio_data, text, request.audio_format, drill)
+
+
+@router.post("/api/score/upload", response_model=PronunciationScoreResponse)
+async def score_pronunciation_upload(
+    audio: UploadFile = File(..., description="Audio file (webm, wav, mp3)"),
+    text: Optional[str] = Form(None, description="Expected text to pronounce"),
+    exercise_id: Optional[str] = Form(None, description="Drill id, in place of or alongside text"),
+    item_type: str = Form("word", description="Type of item (word/phrase/sentence)"),
+    audio_format: Optional[str] = Form(None, description="Audio format; defaults to the file extension")
+):
+    """
+    Score pronunciation from a multipart/form-data upload
+
+    Returns the same response as /api/score.
+    """
+    text, drill = _resolve_reference(text, exercise_id)
+    if not audio_format:
+        audio_format = _format_from_filename(audio.filename)
+
+    audio_data = bytearray()
+    while True:
+        chunk = await audio.read(settings.UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        _append_capped(audio_data, chunk)
+
+    return await _score_audio(audio_data, text, audio_format, drill)
+
+
+@router.post(
+    "/api/score/raw",
+    response_model=PronunciationScoreResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/octet-stream": {"schema": {"type": "string", "format": "binary"}}}
+        }
+    }
+)
+async def score_pronunciation_raw(
+    request: Request,
+    text: Optional[str] = Query(None, description="Expected text to pronounce"),
+    exercise_id: Optional[str] = Query(None, description="Drill id, in place of or alongside text"),
+    item_type: str = Query("word", description="Type of item (word/phrase/sentence)"),
+    audio_format: str = Query("webm", description="Audio format (webm, wav, mp3, or pcm for headerless 16kHz mono 16-bit)")
+):
+    """
+    Score pronunciation from a raw application/octet-stream request body
+
+    The body is read as it streams in and rejected as soon as it exceeds
+    MAX_UPLOAD_BYTES. Returns the same response as /api/score.
+    """
+    text, drill = _resolve_reference(text, exercise_id)
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=_too_large_detail())
+
+    audio_data = bytearray()
+    async for chunk in request.stream():
+        _append_capped(audio_data, chunk)
+
+    return await _score_audio(audio_data, text, audio_format, drill)
+
+
+@router.post("/api/score/batch", response_model=BatchScoreResponse)
+async def score_pronunciation_batch(request: BatchScoreRequest):
+    """
+    Score several recordings (e.g. a whole lesson) in one request
+
+    Items are decoded and assessed concurrently, at most BATCH_CONCURRENCY
+    at a time. A failing item is reported in its own result and does not
+    affect the others.
 
-        # Decode base64 audio
+    With "stream": true the response is NDJSON, one BatchItemResult per
+    line, sent in input order ("order": "input") or as each item finishes
+    ("order": "completion").
+    """
+    if not request.items:
+        raise HTTPException(status_code=400, detail="Batch has no items")
+    if len(request.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch has {len(request.items)} items, the limit is {settings.BATCH_MAX_ITEMS}"
+        )
+
+    semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+    tasks = [
+        asyncio.ensure_future(_score_batch_item(index, item, semaphore))
+        for index, item in enumerate(request.items)
+    ]
+
+    if not request.stream:
+        results = await asyncio.gather(*tasks)
+        succeeded = sum(1 for item_result in results if item_result.success)
+        return BatchScoreResponse(
+            results=results,
+            succeeded=succeeded,
+            failed=len(results) - succeeded
+        )
+
+    pending = tasks if request.order == "input" else asyncio.as_completed(tasks)
+
+    async def stream_results():
         try:
-            audio_data = base64.b64decode(audio_base64)
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Invalid base64 audio data: {str(e)}")
+            for next_result in pending:
+                item_result = await next_result
+                yield item_result.model_dump_json() + "\n"
+        finally:
+            # Client went away: stop the remaining assessments
+            for task in tasks:
+                task.cancel()
 
-        if len(audio_data) == 0:
-            raise HTTPException(status_code=400, detail="Empty audio file")
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
 
-        logger.info(f"Processing audio: {len(audio_data)} bytes, format: {audio_format}")
-        logger.info(f"Expected text: {text}")
+
+async def _score_batch_item(
+    index: int,
+    item: PronunciationScoreRequest,
+    semaphore: asyncio.Semaphore
+) -> BatchItemResult:
+    """Decode and assess one batch item, capturing any failure in the result"""
+    try:
+        audio_data = base64.b64decode(item.audio_data)
+    except Exception as e:
+        return BatchItemResult(
+            index=index,
+            success=False,
+            error=ErrorResponse(message="Invalid base64 audio data", detail=str(e))
+        )
+
+    try:
+        text, drill = resolve_reference(item.text, item.exercise_id)
+    except ValueError as e:
+        return BatchItemResult(index=index, success=False, error=ErrorResponse(message=str(e)))
+
+    if len(audio_data) == 0:
+        return BatchItemResult(index=index, success=False, error=ErrorResponse(message="Empty audio file"))
+    if len(audio_data) > settings.MAX_UPLOAD_BYTES:
+        return BatchItemResult(index=index, success=False, error=ErrorResponse(message=_too_large_detail()))
+
+    async with semaphore:
+        status_code, outcome = await _run_assessment(audio_data, text, item.audio_format, drill)
+
+    if status_code == 200:
+        return BatchItemResult(index=index, success=True, result=outcome)
+    return BatchItemResult(index=index, success=False, error=outcome)
+
+
+async def _score_audio(
+    audio_data: Union[bytes, bytearray],
+    text: str,
+    audio_format: str,
+    drill: Optional[Drill] = None
+):
+    """Run the assessment and build the HTTP response shared by all score endpoints"""
+    if len(audio_data) == 0:
+        raise HTTPException(status_code=400, detail="Empty audio file")
+
+    status_code, outcome = await _run_assessment(audio_data, text, audio_format, drill)
+    if status_code == 200:
+        # Already in the response model's shape: skip FastAPI's validation and encoding
+        return ORJSONResponse(content=outcome)
+
+    headers = {"Retry-After": "1"} if status_code == 503 else None
+    return ORJSONResponse(status_code=status_code, content=outcome.model_dump(), headers=headers)
+
+
+async def _run_assessment(
+    audio_data: Union[bytes, bytearray],
+    text: str,
+    audio_format: str,
+    drill: Optional[Drill] = None
+) -> Tuple[int, Union[Dict[str, Any], ErrorResponse]]:
+    """
+    Assess audio and map the outcome to an HTTP status and response body
+
+    Returns:
+        Tuple of (status_code, PronunciationScoreResponse-shaped dict or ErrorResponse)
+    """
+    try:
+        logger.debug("Processing audio: %d bytes, format: %s, expected text: %r", len(audio_data), audio_format, text)
 
         # Assess pronunciation
         result = await pronunciation_service.assess_pronunciation(
             audio_data=audio_data,
             reference_text=text,
-            audio_format=audio_format
+            audio_format=audio_format,
+            drill=drill
         )
 
         if not result.get("success", False):
-            return JSONResponse(
-                status_code=400,
-                content=ErrorResponse(
-                    success=False,
-                    message=result.get("message", "Assessment failed"),
-                    detail=result.get("detail")
-                ).dict()
+            metrics.assessments.inc("400")
+            return 400, ErrorResponse(
+                success=False,
+                message=result.get("message", "Assessment failed"),
+                detail=result.get("detail")
             )
 
         # Return successful result
-        return PronunciationScoreResponse(**result)
+        with metrics.stage("serialize"):
+            response = score_response_encoder.to_dict(result)
+        metrics.assessments.inc("200")
+        return 200, response
 
-    except HTTPException:
-        raise
+    except WorkerPoolSaturated as e:
+        logger.warning(f"Rejecting pronunciation scoring: {str(e)}")
+        metrics.assessments.inc("503")
+        return 503, ErrorResponse(
+            success=False,
+            message="Server busy, please retry",
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Error in pronunciation scoring: {str(e)}", exc_info=True)
-        return JSONResponse(
-            status_code=500,
-            content=ErrorResponse(
-                success=False,
-                message="Internal server error",
-                detail=str(e)
-            ).dict()
+        metrics.assessments.inc("500")
+        return 500, ErrorResponse(
+            success=False,
+            message="Internal server error",
+            detail=str(e)
         )
 
 
+def _resolve_reference(text: Optional[str], exercise_id: Optional[str]) -> Tuple[str, Optional[Drill]]:
+    """Reference text and drill of a request, rejecting unusable combinations with 400"""
+    try:
+        return resolve_reference(text, exercise_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _append_capped(buffer: bytearray, chunk: bytes) -> None:
+    """Append an upload chunk, rejecting the request once it exceeds MAX_UPLOAD_BYTES"""
+    if len(buffer) + len(chunk) > settings.MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=_too_large_detail())
+    buffer += chunk
+
+
+def _too_large_detail() -> str:
+    return f"Audio exceeds the {settings.MAX_UPLOAD_BYTES} byte upload limit"
+
+
+def _format_from_filename(filename: Optional[str]) -> str:
+    """Guess the audio format from an uploaded file name"""
+    if filename and "." in filename:
+        return filename.rsplit(".", 1)[1].lower()
+    return "webm"
+
+
 @router.get("/api/test")
 async def test_endpoint():
     """Simple test endpoint"""
@@ -90,5 +315,14 @@ async def test_endpoint():
         "status": "ok",
         "message": "Pronunciation API is running",
         "azure_configured": pronunciation_service.azure_service.configured,
-        "allosaurus_loaded": pronunciation_service.phoneme_service.loaded
+        "allosaurus_loaded": pronunciation_service.phoneme_service.available,
+        "phoneme_backend": pronunciation_service.phoneme_service.backend,
+        "cache": pronunciation_service.cache.get_stats(),
+        "phonemes": await asyncio.get_running_loop().run_in_executor(
+            None, pronunciation_service.phoneme_service.get_stats
+        ),
+        "recognizer_pool": (
+            pronunciation_service.azure_service.recognizer_pool.get_stats()
+            if pronunciation_service.azure_service.recognizer_pool is not None else None
+        )
     }
@@ -0,0 +1,192 @@
+"""WebSocket endpoint for live pronunciation assessment"""
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from typing import Optional
+import asyncio
+import json
+import logging
+
+from app.core.azure_streaming import StreamingAssessmentSession, STREAM_FORMATS
+from app.core.config import settings
+from app.api.serialization import dumps, score_response_encoder
+from app.services.drill_corpus import resolve_reference
+from app.services.pronunciation_service import pronunciation_service
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Bytes per second of 16kHz mono 16-bit PCM
+PCM_BYTES_PER_SECOND = 16000 * 2
+
+# Caps concurrent sessions (each holds an Azure recognition); created on first use
+_session_slots: Optional[asyncio.Semaphore] = None
+
+
+@router.websocket("/ws/score")
+async def stream_pronunciation(websocket: WebSocket):
+    """
+    Score pronunciation while the learner is still speaking
+
+    Protocol:
+    1. Client sends {"type": "start", "text": "...", "audio_format": "pcm"}
+       (audio_format: pcm = 16kHz mono 16-bit PCM, ogg_opus, webm_opus;
+       "exercise_id" can name a drill in place of, or alongside, "text")
+    2. Server replies {"type": "ready"}
+    3. Client sends audio chunks as binary messages while recording
+    4. Server pushes {"type": "partial"} and {"type": "interim"} events
+       with word-level scores as Azure finishes each segment, or
+       {"type": "canceled"} if Azure gives up early
+    5. Client sends {"type": "stop"} when recording ends
+    6. Server sends {"type": "result", ...} in the /api/score response shape
+       (or {"type": "error", ...}) and closes the socket
+
+    A session may last STREAMING_MAX_SECONDS from "ready" to "stop", with
+    at most STREAMING_IDLE_TIMEOUT_SECONDS between messages; past either
+    the recognition is stopped and the socket closed. At most
+    STREAMING_MAX_SESSIONS sessions run at once per worker.
+    """
+    global _session_slots
+    if _session_slots is None:
+        _session_slots = asyncio.Semaphore(settings.STREAMING_MAX_SESSIONS)
+
+    await websocket.accept()
+    if _session_slots.locked():
+        logger.warning(f"Rejecting streaming session: {settings.STREAMING_MAX_SESSIONS} already running")
+        await _send_error_and_close(websocket, "Too many streaming sessions, try again later", code=1013)
+        return
+
+    async with _session_slots:
+        await _run_session(websocket)
+
+
+async def _run_session(websocket: WebSocket) -> None:
+    """Handle one accepted /ws/score connection (see stream_pronunciation)"""
+    try:
+        start = await asyncio.wait_for(
+            websocket.receive_json(),
+            timeout=settings.STREAMING_START_TIMEOUT_SECONDS
+        )
+    except (asyncio.TimeoutError, ValueError):
+        await _send_error_and_close(websocket, "Expected a start message")
+        return
+    except WebSocketDisconnect:
+        return
+
+    text = start.get("text") if isinstance(start, dict) else None
+    exercise_id = start.get("exercise_id") if isinstance(start, dict) else None
+    audio_format = start.get("audio_format", "pcm") if isinstance(start, dict) else None
+    if not (text or exercise_id) or start.get("type") != "start":
+        await _send_error_and_close(websocket, 'Start message must be {"type": "start", "text": "..."}')
+        return
+    for field, value in (("text", text), ("exercise_id", exercise_id), ("audio_format", audio_format)):
+        if value is not None and not isinstance(value, str):
+            await _send_error_and_close(websocket, f'Start message field "{field}" must be a string')
+            return
+    try:
+        text, drill = resolve_reference(text, exercise_id)
+    except ValueError as e:
+        await _send_error_and_close(websocket, str(e))
+        return
+    if audio_format not in STREAM_FORMATS:
+        await _send_error_and_close(
+            websocket,
+            f"Unsupported audio_format '{audio_format}'. Use one of: {', '.join(STREAM_FORMATS)}"
+        )
+        return
+
+    max_bytes = (
+        settings.STREAMING_MAX_SECONDS * PCM_BYTES_PER_SECOND
+        if audio_format == "pcm" else settings.MAX_UPLOAD_BYTES
+    )
+
+    session = StreamingAssessmentSession(
+        pronunciation_service.azure_service,
+        reference_text=text,
+        audio_format=audio_format,
+        enable_miscue=drill.enable_miscue if drill is not None else True,
+        expected_phonemes=drill.expected_phonemes if drill is not None else None
+    )
+    forwarder = None
+    try:
+        session.start()
+        await websocket.send_json({"type": "ready"})
+        forwarder = asyncio.ensure_future(_forward_events(websocket, session))
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.STREAMING_MAX_SECONDS
+        while True:
+            remaining = deadline - loop.time()
+            try:
+                message = await asyncio.wait_for(
+                    websocket.receive(),
+                    timeout=min(remaining, settings.STREAMING_IDLE_TIMEOUT_SECONDS)
+                )
+            except asyncio.TimeoutError:
+                # session.close() in finally stops the recognition
+                if remaining <= settings.STREAMING_IDLE_TIMEOUT_SECONDS:
+                    reason = f"Stream exceeds {settings.STREAMING_MAX_SECONDS}s"
+                else:
+                    reason = f"No audio for {settings.STREAMING_IDLE_TIMEOUT_SECONDS:g}s"
+                logger.info(f"Closing streaming session: {reason}")
+                await _send_error_and_close(websocket, reason, code=1008)
+                return
+            if message["type"] == "websocket.disconnect":
+                logger.info("Streaming client disconnected before stop")
+                return
+
+            chunk = message.get("bytes")
+            if chunk is not None:
+                if session.bytes_received + len(chunk) > max_bytes:
+                    await _send_error_and_close(websocket, "Audio stream exceeds the size limit", code=1009)
+                    return
+                session.write(chunk)
+                continue
+
+            try:
+                control = json.loads(message.get("text") or "{}")
+            except ValueError:
+                control = {}
+            if isinstance(control, dict) and control.get("type") == "stop":
+                break
+
+        logger.info(f"Streaming session received {session.bytes_received} bytes of {audio_format}")
+        result = await session.finish(timeout=settings.STREAMING_FINAL_TIMEOUT_SECONDS)
+
+        # Deliver interim events that arrived before the final result
+        forwarder.cancel()
+        await asyncio.sleep(0)
+        while not session.events.empty():
+            await websocket.send_json(session.events.get_nowait())
+
+        if not result.get("success", False):
+            await _send_error_and_close(websocket, result.get("message", "Assessment failed"), result.get("detail"))
+            return
+
+        response = score_response_encoder.to_dict(pronunciation_service.combine_results(result, drill=drill))
+        await websocket.send_text(dumps({"type": "result", **response}).decode("utf-8"))
+        await websocket.close()
+
+    except WebSocketDisconnect:
+        logger.info("Streaming client disconnected")
+    except Exception as e:
+        logger.error(f"Error in streaming assessment: {str(e)}", exc_info=True)
+        await _send_error_and_close(websocket, "Internal server error", str(e), code=1011)
+    finally:
+        if forwarder is not None:
+            forwarder.cancel()
+        session.close()
+
+
+async def _forward_events(websocket: WebSocket, session: StreamingAssessmentSession) -> None:
+    """Send recognition events to the client as they arrive"""
+    while True:
+        event = await session.events.get()
+        await websocket.send_json(event)
+
+
+async def _send_error_and_close(websocket: WebSocket, message: str, detail: Optional[str] = None, code: int = 1000) -> None:
+    try:
+        await websocket.send_json({"type": "error", "message": message, "detail": detail})
+        await websocket.close(code=code)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
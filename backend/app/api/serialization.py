@@ -0,0 +1,109 @@
+"""
+Response serialization without building response models
+
+The scoring pipeline produces plain dicts. Turning one into a
+PronunciationScoreResponse, then letting FastAPI validate that model
+against response_model and encode it with the json module, copies and
+checks every word and phoneme twice. A ResponseEncoder is compiled once
+from a response model's fields and turns the dict straight into the
+model's JSON shape (same fields, order, defaults and number types, extra
+keys dropped), which is then written with orjson.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union, get_args, get_origin
+
+import orjson
+from pydantic import BaseModel
+from pydantic.fields import FieldInfo
+
+from app.models.schemas import PronunciationScoreResponse
+
+Converter = Callable[[Any], Any]
+
+_MISSING = object()
+
+
+def _as_float(value: Any) -> float:
+    return value if type(value) is float else float(value)
+
+
+def _as_int(value: Any) -> int:
+    return value if type(value) is int else int(value)
+
+
+def _as_str(value: Any) -> str:
+    if not isinstance(value, str):
+        raise TypeError(f"Expected a string, got {type(value).__name__}")
+    return value
+
+
+def _compile(annotation: Any) -> Optional[Converter]:
+    """Converter for one field type, or None if values pass through unchanged"""
+    origin = get_origin(annotation)
+    if origin is Union:
+        options = [option for option in get_args(annotation) if option is not type(None)]
+        inner = _compile(options[0]) if len(options) == 1 else None
+        if inner is None:
+            return None
+        return lambda value: None if value is None else inner(value)
+    if origin in (list, List):
+        item = _compile(get_args(annotation)[0])
+        if item is None:
+            return list
+        return lambda value: [item(entry) for entry in value]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return ResponseEncoder(annotation).to_dict
+    if annotation is float:
+        return _as_float
+    if annotation is int:
+        return _as_int
+    if annotation is str:
+        return _as_str
+    return None
+
+
+class ResponseEncoder:
+    """Dict -> JSON of a response model, compiled from the model's fields"""
+
+    def __init__(self, model: Type[BaseModel]):
+        """
+        Args:
+            model: Pydantic response model; nested models are compiled too
+        """
+        self.model = model
+        self._fields: List[Tuple[str, Optional[Converter], FieldInfo]] = [
+            (name, _compile(field.annotation), field)
+            for name, field in model.model_fields.items()
+        ]
+
+    def to_dict(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        The model's JSON shape of data
+
+        Raises:
+            ValueError: If a required field is missing
+            TypeError: If a value has the wrong type
+        """
+        output = {}
+        for name, convert, field in self._fields:
+            value = data.get(name, _MISSING)
+            if value is _MISSING:
+                if field.is_required():
+                    raise ValueError(f"{self.model.__name__}.{name} is required")
+                value = field.get_default(call_default_factory=True)
+            elif convert is not None:
+                value = convert(value)
+            output[name] = value
+        return output
+
+    def encode(self, data: Dict[str, Any]) -> bytes:
+        """to_dict() as JSON bytes"""
+        return dumps(self.to_dict(data))
+
+
+def dumps(content: Any) -> bytes:
+    """orjson with the options of FastAPI's ORJSONResponse"""
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+# Global instance
+score_response_encoder = ResponseEncoder(PronunciationScoreResponse)
@@ -1,18 +1,31 @@
 """Azure Speech Services integration for pronunciation assessment"""
-import azure.cognitiveservices.speech as speechsdk
-from typing import Dict, Any, Optional
-import json
+from typing import Dict, Any, Mapping, Optional, Tuple
+from collections import OrderedDict
+import asyncio
 import logging
-import tempfile
-import os
-import subprocess
+import threading
+
+import orjson
 
 from app.core.config import settings
-# Import phoneme_mapper inside functions to catch import errors
-# from app.utils.phoneme_mapper import azure_word_to_ipa, get_expected_ipa
+from app.core.fake_speech import FakeSpeechProvider
+from app.core.metrics import metrics
+from app.core.recognizer_pool import PooledRecognizer, RecognizerPool
+from app.core.startup import ComponentUnavailable, LazyModule
+from app.models.assessment import WordResult
+from app.models.audio import AudioBuffer
+from app.models.phonemes import phoneme_inventory
+from app.utils.lexicon import lexicon, LexiconError
+from app.utils.phoneme_mapper import get_expected_ipa, get_expected_ipa_for_words, text_to_ipa_estimate
+
+# Imported on first use (see warm()), not with the app
+speechsdk = LazyModule("azure.cognitiveservices.speech")
 
 logger = logging.getLogger(__name__)
 
+# Sample rate of pooled recognizers (the rate the audio decoder produces)
+POOL_SAMPLE_RATE = 16000
+
 
 class AzureSpeechService:
     """Wrapper for Azure Speech Services pronunciation assessment"""
@@ -22,226 +35,477 @@ class AzureSpeechService:
         self.speech_key = settings.AZURE_SPEECH_KEY
         self.speech_region = settings.AZURE_SPEECH_REGION
 
+        # Everything besides audio, reference text and miscue setting that changes the scores
+        self.assessment_fingerprint = f"{self.speech_region}|HundredMark|Phoneme"
+
+        # Local stand-in for benchmarks and load tests (takes precedence over Azure and mock mode)
+        self.fake_provider: Optional[FakeSpeechProvider] = None
+        if settings.SPEECH_PROVIDER == "fake":
+            self.fake_provider = FakeSpeechProvider(settings.FAKE_SPEECH_LATENCY_MS, settings.FAKE_SPEECH_JITTER_MS)
+            self.assessment_fingerprint = f"fake|{self.assessment_fingerprint}"
+            logger.warning("Using the fake speech provider (SPEECH_PROVIDER=fake)")
+
         if not self.speech_key or self.speech_key == "your_azure_speech_key_here":
             logger.warning("Azure Speech key not configured. Running in mock mode.")
             self.configured = False
         else:
             self.configured = True
-            self.speech_config = speechsdk.SpeechConfig(
-                subscription=self.speech_key,
-                region=self.speech_region
+        self._speech_config: "Optional[speechsdk.SpeechConfig]" = None
+
+        # Reusable SDK objects: stream formats per sample rate and
+        # assessment configs per reference text
+        self._audio_formats: Dict[int, speechsdk.audio.AudioStreamFormat] = {}
+        self._pronunciation_configs: "OrderedDict[Tuple[str, bool], speechsdk.PronunciationAssessmentConfig]" = OrderedDict()
+        self._config_lock = threading.Lock()
+
+        # Recognitions whose caller gave up waiting, kept alive until the SDK
+        # reports completion (recognizer -> its SDK future)
+        self._abandoned: Dict["speechsdk.SpeechRecognizer", "speechsdk.ResultFuture"] = {}
+
+        # Pre-connected recognizers to skip the per-request TLS/WebSocket handshake
+        self.recognizer_pool: Optional[RecognizerPool] = None
+        if self.configured and settings.AZURE_RECOGNIZER_POOL_SIZE > 0:
+            self.recognizer_pool = RecognizerPool(
+                factory=self._new_pooled_recognizer,
+                size=settings.AZURE_RECOGNIZER_POOL_SIZE,
+                idle_seconds=settings.AZURE_RECOGNIZER_POOL_IDLE_SECONDS
             )
 
+    @property
+    def mock_mode(self) -> bool:
+        """Whether assessments are random mock results (no Azure key, no fake provider)"""
+        return self.fake_provider is None and not self.configured
+
+    @property
+    def speech_config(self) -> "speechsdk.SpeechConfig":
+        """Shared SpeechConfig, created (importing the SDK) on first use"""
+        if self._speech_config is None:
+            with self._config_lock:
+                if self._speech_config is None:
+                    self._speech_config = speechsdk.SpeechConfig(
+                        subscription=self.speech_key,
+                        region=self.speech_region
+                    )
+        return self._speech_config
+
+    def warm(self) -> str:
+        """
+        Import the SDK, build the SpeechConfig and start pre-connecting
+        recognizers, instead of on the first request
+
+        Returns:
+            Which backend answers assessments
+
+        Raises:
+            ComponentUnavailable: If the SDK cannot be loaded
+        """
+        try:
+            speechsdk.load()
+        except ImportError as e:
+            raise ComponentUnavailable(f"Speech SDK not importable: {str(e)}")
+        if self.fake_provider is not None:
+            return "fake speech provider"
+        if not self.configured:
+            return "mock mode, no Azure key"
+        region = self.speech_config.get_property(speechsdk.PropertyId.SpeechServiceConnection_Region)
+        if self.recognizer_pool is not None:
+            self.recognizer_pool.start()
+            return f"{region}, pre-connecting {self.recognizer_pool.size} recognizers"
+        return region
+
     def assess_pronunciation(
         self,
-        audio_data: bytes,
+        audio: AudioBuffer,
         reference_text: str,
-        audio_format: str = "wav"
+        enable_miscue: bool = True,
+        expected_ipa: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Assess pronunciation using Azure Speech Services
 
         Args:
-            audio_data: Audio file bytes
+            audio: Decoded 16kHz mono PCM audio
             reference_text: Expected text to pronounce
-            audio_format: Audio format (wav, webm, mp3)
+            enable_miscue: Score omitted and inserted words
+            expected_ipa: Precompiled expected IPA (skips the per-word lookup)
 
         Returns:
             Dictionary with pronunciation assessment results
         """
+        if self.fake_provider is not None:
+            with metrics.stage("azure"):
+                result = self.fake_provider.recognize(audio, reference_text)
+            return self._handle_result(result, reference_text, expected_ipa)
         if not self.configured:
             return self._mock_assessment(reference_text)
 
+        pooled = None
         try:
-            # Convert to WAV if needed
-            wav_data = audio_data
-            if audio_format != "wav":
-                logger.info(f"Converting {audio_format} to WAV for Azure processing")
-                wav_data = self._convert_to_wav(audio_data, audio_format)
-                if not wav_data or len(wav_data) == 0:
-                    logger.error(f"Audio conversion produced empty data. Input was {len(audio_data)} bytes of {audio_format}")
-                    return {
-                        "success": False,
-                        "message": f"Failed to convert {audio_format} to WAV. Audio conversion produced no data.",
-                        "detail": f"Input: {len(audio_data)} bytes, Output: {len(wav_data) if wav_data else 0} bytes",
-                        "recognized_text": "",
-                        "overall_score": 0.0
-                    }
-                logger.info(f"Conversion successful: {len(wav_data)} bytes of WAV data")
-
-            # Configure audio format (16kHz, 16-bit, mono PCM WAV)
-            audio_format_obj = speechsdk.audio.AudioStreamFormat(
-                samples_per_second=16000,
-                bits_per_sample=16,
-                channels=1
-            )
+            speech_recognizer, pooled = self._create_recognizer(audio, reference_text, enable_miscue)
 
-            # Create pronunciation assessment config
-            pronunciation_config = speechsdk.PronunciationAssessmentConfig(
-                reference_text=reference_text,
-                grading_system=speechsdk.PronunciationAssessmentGradingSystem.HundredMark,
-                granularity=speechsdk.PronunciationAssessmentGranularity.Phoneme,
-                enable_miscue=True
-            )
+            # Perform recognition
+            with metrics.stage("azure"):
+                result = speech_recognizer.recognize_once()
+            return self._handle_result(result, reference_text, expected_ipa)
 
-            # Create audio stream from bytes
-            stream = speechsdk.audio.PushAudioInputStream(audio_format_obj)
-            audio_config = speechsdk.audio.AudioConfig(stream=stream)
+        except Exception as e:
+            logger.error(f"Error in pronunciation assessment: {str(e)}")
+            return self._error_result(e)
+        finally:
+            if pooled is not None:
+                self.recognizer_pool.release(pooled)
 
-            # Create speech recognizer
-            speech_recognizer = speechsdk.SpeechRecognizer(
-                speech_config=self.speech_config,
-                audio_config=audio_config
-            )
+    async def assess_pronunciation_async(
+        self,
+        audio: AudioBuffer,
+        reference_text: str,
+        enable_miscue: bool = True,
+        expected_ipa: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Assess pronunciation without holding a thread for the Azure round trip
+
+        Starts recognition with recognize_once_async() and resolves an asyncio
+        future from the recognizer's recognized/canceled events, which the SDK
+        fires on its own threads.
 
+        Args:
+            audio: Decoded 16kHz mono PCM audio
+            reference_text: Expected text to pronounce
+            enable_miscue: Score omitted and inserted words
+            expected_ipa: Precompiled expected IPA (skips the per-word lookup)
+
+        Returns:
+            Dictionary with pronunciation assessment results (same shape as
+            assess_pronunciation)
+        """
+        if self.fake_provider is not None:
+            with metrics.stage("azure"):
+                result = await self.fake_provider.recognize_async(audio, reference_text)
+            await self._ensure_lexicon(expected_ipa)
+            return self._handle_result(result, reference_text, expected_ipa)
+        if not self.configured:
+            return self._mock_assessment(reference_text)
+
+        loop = asyncio.get_running_loop()
+        done: asyncio.Future = loop.create_future()
+        speech_recognizer = None
+        pooled = None
+        # Guards completed/abandoned, which the SDK's threads and the loop both touch
+        state_lock = threading.Lock()
+        started = False
+        completed = False
+        abandoned = False
+
+        def resolve(result: "speechsdk.SpeechRecognitionResult") -> None:
+            if not done.done():
+                done.set_result(result)
+
+        def on_event(evt: "speechsdk.SpeechRecognitionEventArgs") -> None:
+            nonlocal completed
+            with state_lock:
+                if completed:
+                    return
+                completed = True
+                release_now = abandoned
+            if release_now:
+                # The caller stopped waiting; the recognition has only now finished
+                self._abandoned.pop(speech_recognizer, None)
+                self._release_recognizer(speech_recognizer, pooled)
+            else:
+                loop.call_soon_threadsafe(resolve, evt.result)
+
+        try:
+            speech_recognizer, pooled = self._create_recognizer(audio, reference_text, enable_miscue)
+            speech_recognizer.recognized.connect(on_event)
+            speech_recognizer.canceled.connect(on_event)
+
+            # Keep a reference to the SDK future so it is not collected mid-flight
+            with metrics.stage("azure"):
+                recognition = speech_recognizer.recognize_once_async()
+                started = True
+                result = await done
+            del recognition
+
+            await self._ensure_lexicon(expected_ipa)
+            return self._handle_result(result, reference_text, expected_ipa)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in async pronunciation assessment: {str(e)}")
+            return self._error_result(e)
+        finally:
+            if speech_recognizer is not None:
+                with state_lock:
+                    # Still recognizing (client disconnect, timeout): on_event
+                    # releases the recognizer once the SDK reports completion
+                    abandoned = started and not completed
+                    if abandoned:
+                        self._abandoned[speech_recognizer] = recognition
+                if not abandoned:
+                    self._release_recognizer(speech_recognizer, pooled)
+
+    def _release_recognizer(
+        self,
+        speech_recognizer: "speechsdk.SpeechRecognizer",
+        pooled: "Optional[PooledRecognizer]"
+    ) -> None:
+        """Drop event handlers and hand a pooled recognizer back after its recognition completed"""
+        speech_recognizer.recognized.disconnect_all()
+        speech_recognizer.canceled.disconnect_all()
+        if pooled is not None:
+            self.recognizer_pool.release(pooled)
+
+    def _create_recognizer(
+        self,
+        audio: AudioBuffer,
+        reference_text: str,
+        enable_miscue: bool = True
+    ) -> "Tuple[speechsdk.SpeechRecognizer, Optional[PooledRecognizer]]":
+        """
+        Create a recognizer with pronunciation assessment fed from the decoded audio
+
+        Returns:
+            Tuple of (recognizer, pool entry it came from or None); the pool
+            entry must be released once recognition has completed
+        """
+        pooled = None
+        if audio.sample_rate == POOL_SAMPLE_RATE and self.recognizer_pool is not None:
+            pooled = self.recognizer_pool.acquire()
+
+        if pooled is not None:
+            speech_recognizer, stream = pooled.recognizer, pooled.stream
+        else:
+            speech_recognizer, stream = self._new_recognizer(self._audio_format(audio.sample_rate))
+
+        try:
             # Apply pronunciation assessment config
-            pronunciation_config.apply_to(speech_recognizer)
+            self._pronunciation_config(reference_text, enable_miscue).apply_to(speech_recognizer)
 
             # Write audio data to stream
-            stream.write(wav_data)
+            stream.write(audio.pcm)
             stream.close()
+        except Exception:
+            if pooled is not None:
+                self.recognizer_pool.release(pooled)
+            raise
 
-            # Perform recognition
-            result = speech_recognizer.recognize_once()
-
-            if result.reason == speechsdk.ResultReason.RecognizedSpeech:
-                return self._parse_azure_result(result, reference_text)
-            elif result.reason == speechsdk.ResultReason.NoMatch:
-                logger.warning("No speech recognized in audio")
-                no_match_details = speechsdk.NoMatchDetails(result)
-                logger.warning(f"NoMatch reason: {no_match_details.reason}")
-                return {
-                    "success": False,
-                    "message": "No speech detected in audio",
-                    "recognized_text": "",
-                    "overall_score": 0.0
-                }
-            elif result.reason == speechsdk.ResultReason.Canceled:
-                cancellation = speechsdk.CancellationDetails(result)
-                logger.error(f"Speech recognition CANCELED: {cancellation.reason}")
-                logger.error(f"Error details: {cancellation.error_details}")
-                logger.error(f"Error code: {cancellation.error_code if hasattr(cancellation, 'error_code') else 'N/A'}")
-
-                # Provide more specific error messages
-                error_msg = str(cancellation.error_details)
-                if "BadRequest" in error_msg or "400" in error_msg:
-                    error_msg = f"Audio format error: {error_msg}. Try recording in a different format."
-                elif "Unauthorized" in error_msg or "401" in error_msg:
-                    error_msg = "Azure authentication failed. Check API keys."
-
-                return {
-                    "success": False,
-                    "message": f"Azure error ({cancellation.reason}): {error_msg}",
-                    "detail": str(cancellation.error_details),
-                    "recognized_text": "",
-                    "overall_score": 0.0
-                }
-            else:
-                logger.error(f"Speech recognition failed: {result.reason}")
-                return {
-                    "success": False,
-                    "message": "Speech recognition failed",
-                    "recognized_text": "",
-                    "overall_score": 0.0
-                }
+        return speech_recognizer, pooled
+
+    def create_streaming_recognizer(
+        self,
+        audio_format_obj: "speechsdk.audio.AudioStreamFormat",
+        reference_text: str,
+        enable_miscue: bool = True
+    ) -> "Tuple[speechsdk.SpeechRecognizer, speechsdk.audio.PushAudioInputStream]":
+        """
+        Create a recognizer with pronunciation assessment and an open push stream
+
+        The caller writes audio to the stream and closes it when done.
+
+        Returns:
+            Tuple of (recognizer, push stream)
+        """
+        speech_recognizer, stream = self._new_recognizer(audio_format_obj)
+        self._pronunciation_config(reference_text, enable_miscue).apply_to(speech_recognizer)
+        return speech_recognizer, stream
+
+    def _new_recognizer(
+        self,
+        audio_format_obj: "speechsdk.audio.AudioStreamFormat"
+    ) -> "Tuple[speechsdk.SpeechRecognizer, speechsdk.audio.PushAudioInputStream]":
+        """Create a recognizer reading from a new push stream (no assessment config yet)"""
+        # Create audio stream
+        stream = speechsdk.audio.PushAudioInputStream(audio_format_obj)
+        audio_config = speechsdk.audio.AudioConfig(stream=stream)
+
+        # Create speech recognizer
+        speech_recognizer = speechsdk.SpeechRecognizer(
+            speech_config=self.speech_config,
+            audio_config=audio_config
+        )
+        return speech_recognizer, stream
+
+    def _new_pooled_recognizer(
+        self
+    ) -> "Tuple[speechsdk.SpeechRecognizer, speechsdk.audio.PushAudioInputStream]":
+        """Recognizer factory for the pool (16kHz mono PCM)"""
+        return self._new_recognizer(self._audio_format(POOL_SAMPLE_RATE))
+
+    def _audio_format(self, sample_rate: int) -> "speechsdk.audio.AudioStreamFormat":
+        """Cached 16-bit mono PCM stream format for a sample rate"""
+        audio_format_obj = self._audio_formats.get(sample_rate)
+        if audio_format_obj is None:
+            audio_format_obj = speechsdk.audio.AudioStreamFormat(
+                samples_per_second=sample_rate,
+                bits_per_sample=16,
+                channels=1
+            )
+            self._audio_formats[sample_rate] = audio_format_obj
+        return audio_format_obj
+
+    def _pronunciation_config(
+        self,
+        reference_text: str,
+        enable_miscue: bool = True
+    ) -> "speechsdk.PronunciationAssessmentConfig":
+        """Cached pronunciation assessment config for a reference text"""
+        key = (reference_text, enable_miscue)
+        with self._config_lock:
+            pronunciation_config = self._pronunciation_configs.get(key)
+            if pronunciation_config is not None:
+                self._pronunciation_configs.move_to_end(key)
+                return pronunciation_config
+
+        # Create pronunciation assessment config
+        pronunciation_config = speechsdk.PronunciationAssessmentConfig(
+            reference_text=reference_text,
+            grading_system=speechsdk.PronunciationAssessmentGradingSystem.HundredMark,
+            granularity=speechsdk.PronunciationAssessmentGranularity.Phoneme,
+            enable_miscue=enable_miscue
+        )
+
+        with self._config_lock:
+            self._pronunciation_configs[key] = pronunciation_config
+            while len(self._pronunciation_configs) > settings.AZURE_PA_CONFIG_CACHE_SIZE:
+                self._pronunciation_configs.popitem(last=False)
+        return pronunciation_config
+
+    def _handle_result(
+        self,
+        result: "speechsdk.SpeechRecognitionResult",
+        reference_text: str,
+        expected_ipa: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Turn a recognition result into the assessment result dictionary"""
+        if result.reason == speechsdk.ResultReason.RecognizedSpeech:
+            metrics.azure_results.inc("RecognizedSpeech", "")
+            with metrics.stage("azure_parse"):
+                return self._parse_azure_result(result, reference_text, expected_ipa)
+        elif result.reason == speechsdk.ResultReason.NoMatch:
+            metrics.azure_results.inc("NoMatch", "")
+            logger.warning("No speech recognized in audio")
+            no_match_details = speechsdk.NoMatchDetails(result)
+            logger.warning(f"NoMatch reason: {no_match_details.reason}")
+            return {
+                "success": False,
+                "message": "No speech detected in audio",
+                "recognized_text": "",
+                "overall_score": 0.0
+            }
+        elif result.reason == speechsdk.ResultReason.Canceled:
+            cancellation = speechsdk.CancellationDetails(result)
+            metrics.azure_results.inc("Canceled", cancellation.code.name)
+            logger.error(f"Speech recognition CANCELED: {cancellation.reason}")
+            logger.error(f"Error details: {cancellation.error_details}")
+            logger.error(f"Error code: {cancellation.error_code if hasattr(cancellation, 'error_code') else 'N/A'}")
+
+            # Provide more specific error messages
+            error_msg = str(cancellation.error_details)
+            if "BadRequest" in error_msg or "400" in error_msg:
+                error_msg = f"Audio format error: {error_msg}. Try recording in a different format."
+            elif "Unauthorized" in error_msg or "401" in error_msg:
+                error_msg = "Azure authentication failed. Check API keys."
 
-        except Exception as e:
-            logger.error(f"Error in pronunciation assessment: {str(e)}")
             return {
                 "success": False,
-                "message": f"Assessment error: {str(e)}",
+                "message": f"Azure error ({cancellation.reason}): {error_msg}",
+                "detail": str(cancellation.error_details),
                 "recognized_text": "",
                 "overall_score": 0.0
             }
+        else:
+            metrics.azure_results.inc(getattr(result.reason, "name", str(result.reason)), "")
+            logger.error(f"Speech recognition failed: {result.reason}")
+            return {
+                "success": False,
+                "message": "Speech recognition failed",
+                "recognized_text": "",
+                "overall_score": 0.0
+            }
+
+    async def _ensure_lexicon(self, expected_ipa: Optional[str]) -> None:
+        """
+        Open the pronunciation lexicon off the event loop before parsing
+
+        Without precompiled expected IPA, _parse_azure_result looks words up
+        in the lexicon, whose first use opens (or builds) it.
+        """
+        if expected_ipa is not None or lexicon.loaded:
+            return
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, lexicon.load)
+        except LexiconError:
+            # The lookups log it and fall back to estimated IPA
+            pass
+
+    def _error_result(self, error: Exception) -> Dict[str, Any]:
+        """Result dictionary for an unexpected assessment error"""
+        return {
+            "success": False,
+            "message": f"Assessment error: {str(error)}",
+            "recognized_text": "",
+            "overall_score": 0.0
+        }
 
     def _parse_azure_result(
         self,
-        result: speechsdk.SpeechRecognitionResult,
-        reference_text: str
+        result: "speechsdk.SpeechRecognitionResult",
+        reference_text: str,
+        precompiled_expected_ipa: Optional[str] = None,
+        expected_phonemes: Optional[Mapping[str, Tuple[int, ...]]] = None
     ) -> Dict[str, Any]:
-        """Parse Azure pronunciation assessment result"""
-        logger.info(f"=== PARSING AZURE RESULT FOR: '{reference_text}' ===")
+        """
+        Parse Azure pronunciation assessment result
+
+        The JSON payload is parsed once (orjson) and only NBest[0]'s scores
+        and words are read; the SDK's PronunciationAssessmentResult would
+        parse it again and build objects for every word. With
+        precompiled_expected_ipa (a known drill) the expected IPA is not
+        looked up word by word; with expected_phonemes (a drill's words, for
+        results covering only part of its text) only words missing from it
+        are looked up.
+        """
         try:
-            # Test import first
-            try:
-                from app.utils.phoneme_mapper import azure_word_to_ipa, get_expected_ipa
-                logger.info("✅ Successfully imported phoneme_mapper functions")
-            except ImportError as ie:
-                logger.error(f"❌ FAILED to import phoneme_mapper: {ie}", exc_info=True)
-                raise
-
-            # Get pronunciation assessment result
-            pronunciation_result = speechsdk.PronunciationAssessmentResult(result)
-
-            # Parse JSON details for phoneme-level data
-            result_json = json.loads(result.properties.get(
+            best = orjson.loads(result.properties.get(
                 speechsdk.PropertyId.SpeechServiceResponse_JsonResult
-            ))
+            ))["NBest"][0]
+            scores = best["PronunciationAssessment"]
+
+            # Phonemes become interned IDs; IPA comes from the inventory
+            words_data = [WordResult.from_azure(word_data) for word_data in best.get("Words", ())]
+            actual_ipa = " ".join([word.ipa for word in words_data]) or None
+
+            if precompiled_expected_ipa is not None:
+                expected_ipa = precompiled_expected_ipa
+            elif expected_phonemes is not None:
+                ipa_parts = []
+                for word in words_data:
+                    ids = expected_phonemes.get(word.word.lower())
+                    ipa = phoneme_inventory.to_ipa(ids) if ids else get_expected_ipa(word.word)
+                    if ipa:
+                        ipa_parts.append(ipa)
+                expected_ipa = " ".join(ipa_parts) or None
+            else:
+                expected_ipa = " ".join([
+                    ipa for ipa in get_expected_ipa_for_words([word.word for word in words_data]) if ipa
+                ]) or text_to_ipa_estimate(reference_text) or None
 
-            words_data = []
-            actual_ipa_parts = []
-            expected_ipa_parts = []
-
-            if "NBest" in result_json and len(result_json["NBest"]) > 0:
-                words_list = result_json["NBest"][0].get("Words", [])
-                logger.info(f"Found {len(words_list)} words in Azure response")
-
-                for word_data in words_list:
-                    word = word_data.get("Word", "")
-                    phonemes = []
-                    azure_phonemes = []
-
-                    for phoneme_data in word_data.get("Phonemes", []):
-                        azure_phoneme = phoneme_data.get("Phoneme", "")
-                        azure_phonemes.append(azure_phoneme)
-
-                        phonemes.append({
-                            "phoneme": azure_phoneme,
-                            "accuracy": phoneme_data.get("Score", 0.0),
-                            "error_type": self._classify_phoneme_error(
-                                phoneme_data.get("Score", 0.0)
-                            )
-                        })
-
-                    # Convert Azure phonemes to IPA
-                    logger.info(f"Converting Azure phonemes for '{word}': {azure_phonemes}")
-                    word_ipa = azure_word_to_ipa(azure_phonemes)
-                    logger.info(f"  → IPA result: '{word_ipa}'")
-                    actual_ipa_parts.append(word_ipa)
-
-                    # Get expected IPA for this word
-                    word_expected_ipa = get_expected_ipa(word)
-                    logger.info(f"Expected IPA for '{word}': {word_expected_ipa}")
-                    if word_expected_ipa:
-                        expected_ipa_parts.append(word_expected_ipa)
-
-                    words_data.append({
-                        "word": word,
-                        "accuracy": word_data.get("PronunciationAssessment", {}).get("AccuracyScore", 0.0),
-                        "error_type": word_data.get("PronunciationAssessment", {}).get("ErrorType", "None"),
-                        "phonemes": phonemes,
-                        "ipa": word_ipa
-                    })
-
-            # Combine IPA for full transcription
-            actual_ipa = " ".join(actual_ipa_parts) if actual_ipa_parts else None
-            expected_ipa = " ".join(expected_ipa_parts) if expected_ipa_parts else get_expected_ipa(reference_text)
-
-            logger.info(f"Final actual_ipa: '{actual_ipa}'")
-            logger.info(f"Final expected_ipa: '{expected_ipa}'")
+            logger.debug("Parsed %d words for %r: actual_ipa=%r expected_ipa=%r", len(words_data), reference_text, actual_ipa, expected_ipa)
 
             # Fallback: if Azure didn't provide phonemes, use expected IPA as approximation
             if not actual_ipa or actual_ipa.strip() == "":
-                logger.warning(f"Azure didn't return phoneme data for '{reference_text}', using expected IPA")
+                logger.warning("Azure didn't return phoneme data for %r, using expected IPA", reference_text)
                 actual_ipa = expected_ipa
 
             result_dict = {
                 "success": True,
-                "overall_score": pronunciation_result.accuracy_score,
-                "accuracy_score": pronunciation_result.accuracy_score,
-                "fluency_score": pronunciation_result.fluency_score,
-                "completeness_score": pronunciation_result.completeness_score,
-                "pronunciation_score": pronunciation_result.pronunciation_score,
+                "overall_score": scores["AccuracyScore"],
+                "accuracy_score": scores["AccuracyScore"],
+                "fluency_score": scores["FluencyScore"],
+                "completeness_score": scores["CompletenessScore"],
+                "pronunciation_score": scores["PronScore"],
                 "recognized_text": result.text,
                 "expected_text": reference_text,
                 "ipa_transcription": actual_ipa,
@@ -249,11 +513,10 @@ class AzureSpeechService:
                 "words": words_data,
                 "message": "Pronunciation assessed successfully"
             }
-            logger.info(f"✅ Returning IPA result: ipa_transcription={actual_ipa}, expected_ipa={expected_ipa}")
             return result_dict
 
         except Exception as e:
-            logger.error(f"❌ ERROR parsing Azure result: {str(e)}", exc_info=True)
+            logger.error(f"Error parsing Azure result: {str(e)}", exc_info=True)
             # Still return IPA fields (null) so frontend knows to not show fake data
             return {
                 "success": True,
@@ -267,89 +530,6 @@ class AzureSpeechService:
                 "message": f"Partial assessment (parsing error: {str(e)})"
             }
 
-    def _classify_phoneme_error(self, score: float) -> Optional[str]:
-        """Classify phoneme error based on score"""
-        if score >= 80:
-            return None
-        elif score >= 60:
-            return "Mispronunciation"
-        else:
-            return "Omission"
-
-    def _convert_to_wav(self, audio_data: bytes, audio_format: str) -> Optional[bytes]:
-        """Convert audio to WAV format using ffmpeg"""
-        try:
-            # Check if ffmpeg is available
-            try:
-                check_result = subprocess.run(
-                    ["ffmpeg", "-version"],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    timeout=5
-                )
-                if check_result.returncode != 0:
-                    logger.error("ffmpeg not found or not working")
-                    return None
-            except FileNotFoundError:
-                logger.error("ffmpeg command not found in system PATH")
-                return None
-            except Exception as e:
-                logger.error(f"Error checking ffmpeg: {str(e)}")
-                return None
-
-            # Save input to temp file
-            with tempfile.NamedTemporaryFile(suffix=f".{audio_format}", delete=False) as temp_input:
-                temp_input.write(audio_data)
-                input_path = temp_input.name
-
-            output_path = input_path.rsplit(".", 1)[0] + ".wav"
-
-            logger.info(f"Converting {audio_format} ({len(audio_data)} bytes) from {input_path} to {output_path}")
-
-            try:
-                # Use ffmpeg to convert to WAV (mono, 16kHz, 16-bit PCM)
-                cmd = [
-                    "ffmpeg",
-                    "-i", input_path,
-                    "-ar", "16000",  # Sample rate: 16kHz
-                    "-ac", "1",      # Channels: mono
-                    "-c:a", "pcm_s16le",  # Codec: 16-bit PCM
-                    "-y",            # Overwrite output
-                    output_path
-                ]
-
-                # Run ffmpeg (suppress output)
-                result = subprocess.run(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    timeout=30
-                )
-
-                if result.returncode == 0 and os.path.exists(output_path):
-                    # Read WAV data
-                    with open(output_path, "rb") as f:
-                        wav_data = f.read()
-                    logger.info(f"Successfully converted {audio_format} to WAV ({len(wav_data)} bytes)")
-                    return wav_data
-                else:
-                    stderr_output = result.stderr.decode() if result.stderr else "No stderr output"
-                    logger.error(f"ffmpeg conversion failed (returncode={result.returncode}): {stderr_output}")
-                    logger.error(f"ffmpeg stdout: {result.stdout.decode() if result.stdout else 'No stdout'}")
-                    logger.error(f"Output path exists: {os.path.exists(output_path)}")
-                    return None
-
-            finally:
-                # Clean up temp files
-                if os.path.exists(input_path):
-                    os.unlink(input_path)
-                if os.path.exists(output_path):
-                    os.unlink(output_path)
-
-        except Exception as e:
-            logger.error(f"Error converting audio: {str(e)}")
-            return None
-
     def _mock_assessment(self, reference_text: str) -> Dict[str, Any]:
         """Return mock assessment for testing without Azure credentials"""
         import random
@@ -360,12 +540,11 @@ class AzureSpeechService:
         words_data = []
         for word in words:
             word_score = base_score + random.uniform(-10, 10)
-            words_data.append({
-                "word": word,
-                "accuracy": max(0, min(100, word_score)),
-                "error_type": "None" if word_score > 70 else "Mispronunciation",
-                "phonemes": []
-            })
+            words_data.append(WordResult(
+                word=word,
+                accuracy=max(0, min(100, word_score)),
+                error_type="None" if word_score > 70 else "Mispronunciation"
+            ))
 
         return {
             "success": True,
@@ -0,0 +1,246 @@
+"""Streaming pronunciation assessment with Azure continuous recognition"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from app.core.azure_speech import AzureSpeechService
+from app.core.startup import LazyModule
+from app.models.assessment import WordResult, words_to_dicts
+
+speechsdk = LazyModule("azure.cognitiveservices.speech")
+
+logger = logging.getLogger(__name__)
+
+# Client audio formats and the Azure compressed container they map to
+# (None means raw 16kHz mono 16-bit PCM)
+STREAM_FORMATS = {
+    "pcm": None,
+    "ogg_opus": "OGG_OPUS",
+    "webm_opus": "ANY",
+}
+
+
+class StreamingAssessmentSession:
+    """
+    One live pronunciation assessment fed chunk by chunk
+
+    Audio chunks are pushed straight into a PushAudioInputStream while
+    Azure runs continuous recognition with pronunciation assessment. Each
+    recognized segment is scored as soon as Azure returns it; events are
+    delivered to an asyncio queue that the WebSocket handler drains.
+
+    Events put on the queue:
+        {"type": "partial", "text": ...}   text recognized so far
+        {"type": "interim", ...}           word scores for a finished segment
+        {"type": "canceled", "message": ...}  Azure canceled recognition; the
+                                              client should stop sending audio
+    """
+
+    def __init__(
+        self,
+        service: AzureSpeechService,
+        reference_text: str,
+        audio_format: str = "pcm",
+        enable_miscue: bool = True,
+        expected_phonemes: Optional[Mapping[str, Tuple[int, ...]]] = None
+    ):
+        """
+        Args:
+            service: Configured Azure speech service
+            reference_text: Expected text to pronounce
+            audio_format: One of STREAM_FORMATS
+            enable_miscue: Score omitted and inserted words
+            expected_phonemes: Precompiled lowercase word -> expected phoneme
+                IDs of a drill, so segments use the drill's expected IPA
+        """
+        if audio_format not in STREAM_FORMATS:
+            raise ValueError(
+                f"Unsupported streaming audio format '{audio_format}'. "
+                f"Use one of: {', '.join(STREAM_FORMATS)}"
+            )
+
+        self.service = service
+        self.reference_text = reference_text
+        self.audio_format = audio_format
+        self.enable_miscue = enable_miscue
+        self.expected_phonemes = expected_phonemes
+        self.events: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        self.bytes_received = 0
+
+        self._loop = asyncio.get_running_loop()
+        self._segments: List[Dict[str, Any]] = []
+        self._error: Optional[Dict[str, Any]] = None
+        self._stopped: asyncio.Future = self._loop.create_future()
+        self._recognizer: Optional[speechsdk.SpeechRecognizer] = None
+        self._stream: Optional[speechsdk.audio.PushAudioInputStream] = None
+        self._mock_chunks = 0
+
+    def start(self) -> None:
+        """Open the Azure session and start continuous recognition"""
+        if not self.service.configured:
+            return
+
+        container = STREAM_FORMATS[self.audio_format]
+        if container is None:
+            audio_format_obj = speechsdk.audio.AudioStreamFormat(
+                samples_per_second=16000,
+                bits_per_sample=16,
+                channels=1
+            )
+        else:
+            audio_format_obj = speechsdk.audio.AudioStreamFormat(
+                compressed_stream_format=getattr(speechsdk.AudioStreamContainerFormat, container)
+            )
+
+        self._recognizer, self._stream = self.service.create_streaming_recognizer(
+            audio_format_obj,
+            self.reference_text,
+            self.enable_miscue
+        )
+        self._recognizer.recognizing.connect(self._on_recognizing)
+        self._recognizer.recognized.connect(self._on_recognized)
+        self._recognizer.canceled.connect(self._on_canceled)
+        self._recognizer.session_stopped.connect(self._on_session_stopped)
+        self._recognizer.start_continuous_recognition_async()
+
+    def write(self, chunk: bytes) -> None:
+        """Push a chunk of audio to Azure"""
+        self.bytes_received += len(chunk)
+        if self._stream is not None:
+            self._stream.write(chunk)
+        else:
+            self._mock_chunks += 1
+
+    async def finish(self, timeout: float) -> Dict[str, Any]:
+        """
+        Signal end of audio and wait for the final result
+
+        Args:
+            timeout: Seconds to wait for Azure to finish the last segment
+
+        Returns:
+            Assessment result in the same shape as AzureSpeechService.assess_pronunciation
+        """
+        if self._recognizer is None:
+            return self.service._mock_assessment(self.reference_text)
+
+        self._stream.close()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._stopped), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Streaming session did not stop within {timeout}s, using segments so far")
+        finally:
+            self.close()
+
+        if self._error is not None and not self._segments:
+            return self._error
+        if not self._segments:
+            return {
+                "success": False,
+                "message": "No speech detected in audio",
+                "recognized_text": "",
+                "overall_score": 0.0
+            }
+        return self._aggregate()
+
+    def close(self) -> None:
+        """Stop recognition and release SDK callbacks"""
+        if self._recognizer is None:
+            return
+        recognizer, self._recognizer = self._recognizer, None
+        recognizer.stop_continuous_recognition_async()
+        for signal in (recognizer.recognizing, recognizer.recognized,
+                       recognizer.canceled, recognizer.session_stopped):
+            signal.disconnect_all()
+
+    # SDK callbacks (run on Azure SDK threads)
+
+    def _on_recognizing(self, evt: "speechsdk.SpeechRecognitionEventArgs") -> None:
+        self._emit({"type": "partial", "text": evt.result.text})
+
+    def _on_recognized(self, evt: "speechsdk.SpeechRecognitionEventArgs") -> None:
+        if evt.result.reason != speechsdk.ResultReason.RecognizedSpeech:
+            return
+        # A segment covers part of the reference text, so a drill's expected
+        # IPA is taken word by word rather than whole
+        segment = self.service._parse_azure_result(
+            evt.result,
+            self.reference_text,
+            expected_phonemes=self.expected_phonemes
+        )
+        self._loop.call_soon_threadsafe(self._segments.append, segment)
+        self._emit({
+            "type": "interim",
+            "recognized_text": segment.get("recognized_text", ""),
+            "accuracy_score": segment.get("accuracy_score"),
+            "words": words_to_dicts(segment.get("words", []))
+        })
+
+    def _on_canceled(self, evt: "speechsdk.SpeechRecognitionCanceledEventArgs") -> None:
+        details = evt.cancellation_details
+        if details.reason == speechsdk.CancellationReason.EndOfStream:
+            return
+        error = {
+            "success": False,
+            "message": f"Azure error ({details.reason}): {details.error_details}",
+            "detail": str(details.error_details),
+            "recognized_text": "",
+            "overall_score": 0.0
+        }
+        self._loop.call_soon_threadsafe(self._set_error, error)
+        self._emit({"type": "canceled", "message": error["message"], "detail": error["detail"]})
+
+    def _on_session_stopped(self, evt: "speechsdk.SessionEventArgs") -> None:
+        self._loop.call_soon_threadsafe(self._resolve_stopped)
+
+    def _emit(self, event: Dict[str, Any]) -> None:
+        self._loop.call_soon_threadsafe(self.events.put_nowait, event)
+
+    def _set_error(self, error: Dict[str, Any]) -> None:
+        self._error = error
+        self._resolve_stopped()
+
+    def _resolve_stopped(self) -> None:
+        if not self._stopped.done():
+            self._stopped.set_result(None)
+
+    def _aggregate(self) -> Dict[str, Any]:
+        """Combine per-segment results into one assessment"""
+        words: List[WordResult] = []
+        for segment in self._segments:
+            words.extend(segment.get("words", []))
+
+        def weighted(field: str) -> Optional[float]:
+            total, weight = 0.0, 0
+            for segment in self._segments:
+                value = segment.get(field)
+                if value is None:
+                    continue
+                segment_weight = max(len(segment.get("words", [])), 1)
+                total += value * segment_weight
+                weight += segment_weight
+            return total / weight if weight else None
+
+        # Completeness is relative to the whole reference, not to one segment
+        reference_words = len(self.reference_text.split())
+        spoken = sum(1 for word in words if word.error_type in ("None", "Mispronunciation"))
+        completeness = min(100.0, 100.0 * spoken / reference_words) if reference_words else weighted("completeness_score")
+
+        accuracy = weighted("accuracy_score")
+        ipa_parts = [segment["ipa_transcription"] for segment in self._segments if segment.get("ipa_transcription")]
+        expected_parts = [segment["expected_ipa"] for segment in self._segments if segment.get("expected_ipa")]
+
+        return {
+            "success": True,
+            "overall_score": accuracy,
+            "accuracy_score": accuracy,
+            "fluency_score": weighted("fluency_score"),
+            "completeness_score": completeness,
+            "pronunciation_score": weighted("pronunciation_score"),
+            "recognized_text": " ".join(segment.get("recognized_text", "") for segment in self._segments).strip(),
+            "expected_text": self.reference_text,
+            "ipa_transcription": " ".join(ipa_parts) if ipa_parts else None,
+            "expected_ipa": " ".join(expected_parts) if expected_parts else None,
+            "words": words,
+            "message": "Pronunciation assessed successfully"
+        }
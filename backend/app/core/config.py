@@ -1,6 +1,6 @@
 """Application configuration"""
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
@@ -9,11 +9,115 @@ class Settings(BaseSettings):
     # Azure Speech Services
     AZURE_SPEECH_KEY: str = ""
     AZURE_SPEECH_REGION: str = "eastus"
+    # Await recognition via SDK events instead of blocking a worker thread
+    AZURE_ASYNC_RECOGNITION: bool = True
+    # Warm recognizers with pre-opened connections (0 disables pooling)
+    AZURE_RECOGNIZER_POOL_SIZE: int = 4
+    AZURE_RECOGNIZER_POOL_IDLE_SECONDS: float = 120.0
+    # Cached PronunciationAssessmentConfig objects, keyed by reference text
+    AZURE_PA_CONFIG_CACHE_SIZE: int = 512
+    # "azure", or "fake" for the local stand-in used by benchmarks (app/core/fake_speech.py)
+    SPEECH_PROVIDER: str = "azure"
+    FAKE_SPEECH_LATENCY_MS: float = 300.0
+    FAKE_SPEECH_JITTER_MS: float = 100.0
 
     # Server configuration
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8001
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:19006,http://localhost:8081,https://matuskalis.com,https://www.matuskalis.com"
+    # Warm the Speech SDK, ffmpeg, lexicon, drills and Allosaurus at startup:
+    # "background" (in a thread; /health/ready waits for it), "blocking" or "off"
+    STARTUP_WARMUP: str = "background"
+
+    # Upload limits for /api/score endpoints
+    MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE: int = 64 * 1024
+
+    # Batch scoring (/api/score/batch)
+    BATCH_MAX_ITEMS: int = 20
+    BATCH_CONCURRENCY: int = 4
+
+    # WebSocket streaming assessment (/ws/score)
+    STREAMING_MAX_SECONDS: int = 60
+    STREAMING_START_TIMEOUT_SECONDS: float = 10.0
+    STREAMING_IDLE_TIMEOUT_SECONDS: float = 10.0
+    STREAMING_FINAL_TIMEOUT_SECONDS: float = 10.0
+    STREAMING_MAX_SESSIONS: int = 32
+
+    # Worker pool for blocking stages (Azure, ffmpeg, Allosaurus)
+    WORKER_POOL_SIZE: int = 32
+    WORKER_QUEUE_LIMIT: int = 128
+
+    # Maximum concurrent ffmpeg decode processes
+    DECODE_MAX_CONCURRENT: int = 8
+
+    # Per-stage timeouts in seconds
+    TRANSCODE_TIMEOUT_SECONDS: float = 30.0
+    AZURE_TIMEOUT_SECONDS: float = 30.0
+    PHONEME_TIMEOUT_SECONDS: float = 20.0
+    # End-to-end budget for one assessment; Azure and Allosaurus run in
+    # parallel and neither may run past it
+    REQUEST_LATENCY_BUDGET_SECONDS: float = 30.0
+
+    # Pre-screening of decoded audio (app/services/audio_screening.py): silence
+    # around the speech is trimmed, recordings without speech or heavily
+    # clipped are rejected before Azure and Allosaurus
+    AUDIO_SCREENING_ENABLED: bool = True
+    AUDIO_SCREEN_FRAME_MS: float = 20.0
+    AUDIO_SCREEN_SPEECH_DBFS: float = -50.0
+    AUDIO_SCREEN_SNR_DB: float = 12.0
+    AUDIO_SCREEN_MIN_SPEECH_MS: float = 100.0
+    AUDIO_SCREEN_PAD_MS: float = 250.0
+    AUDIO_SCREEN_MAX_CLIPPED_RATIO: float = 0.05
+
+    # Allosaurus IPA transcription: "server" shares one model per host through
+    # app.services.phoneme_server, "local" loads it in each worker, "off" disables it
+    PHONEME_BACKEND: str = "server"
+    PHONEME_SERVER_SOCKET: str = "/tmp/speaksharp-phonemes.sock"
+    PHONEME_SERVER_AUTOSTART: bool = True
+    PHONEME_SERVER_START_TIMEOUT_SECONDS: float = 10.0
+    # Micro-batching of concurrent Allosaurus requests into one forward pass
+    PHONEME_BATCH_WINDOW_MS: float = 10.0
+    PHONEME_BATCH_MAX_SIZE: int = 8
+
+    # Compiled pronunciation lexicon (empty uses the bundled CMUdict build)
+    LEXICON_PATH: str = ""
+    # Memoized expected IPA per word (dictionary or spelling estimate)
+    EXPECTED_IPA_CACHE_SIZE: int = 20000
+
+    # Precompiled drill corpus (empty uses app/data/drills.json)
+    DRILL_CORPUS_PATH: str = ""
+
+    # Assessment result cache (empty ASSESSMENT_CACHE_DIR keeps it in memory only)
+    ASSESSMENT_CACHE_ENABLED: bool = True
+    ASSESSMENT_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    ASSESSMENT_CACHE_TTL_SECONDS: float = 3600.0
+    # Results missing Allosaurus IPA that a later request may get (0 disables caching them)
+    ASSESSMENT_CACHE_PARTIAL_TTL_SECONDS: float = 60.0
+    ASSESSMENT_CACHE_DIR: str = ""
+
+    # Prometheus metrics at /metrics
+    METRICS_ENABLED: bool = True
+
+    # On-demand request profiling (see app.core.profiling); a request is profiled
+    # when it sends PROFILING_TOKEN as X-Profile or ?profile=, or by sample rate
+    PROFILING_ENABLED: bool = False
+    PROFILING_TOKEN: str = ""
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_SAMPLE_INTERVAL_MS: float = 5.0
+    PROFILING_DIR: str = "/tmp/speaksharp-profiles"
+    PROFILING_MAX_PROFILES: int = 20
+
+    # Logging: JSON (or "text") records written by a background thread; empty
+    # LOG_LEVEL means INFO with DEBUG on and WARNING otherwise
+    LOG_FORMAT: str = "json"
+    LOG_LEVEL: str = ""
+    LOG_QUEUE_SIZE: int = 10000
+    # Share of requests whose records below WARNING are kept, per stage
+    # ("azure_parse=0.01,decode=0.1,*=1"; empty keeps all)
+    LOG_SAMPLE_RATES: str = ""
+    # X-Log-Level raises one request's detail when X-Log-Token matches (empty disables)
+    LOG_ESCALATION_TOKEN: str = ""
 
     # Environment
     ENVIRONMENT: str = "development"
@@ -24,6 +128,16 @@ class Settings(BaseSettings):
         """Parse CORS origins from comma-separated string"""
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
 
+    @property
+    def log_sample_rates(self) -> Dict[str, float]:
+        """Parse LOG_SAMPLE_RATES into stage -> rate"""
+        rates = {}
+        for entry in self.LOG_SAMPLE_RATES.split(","):
+            stage, _, rate = entry.partition("=")
+            if stage.strip() and rate.strip():
+                rates[stage.strip()] = float(rate)
+        return rates
+
     class Config:
         env_file = ".env"
         case_sensitive = True
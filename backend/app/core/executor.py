@@ -0,0 +1,131 @@
+"""Bounded worker pool for blocking pipeline stages"""
+import asyncio
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerPoolSaturated(Exception):
+    """Raised when the worker pool queue is full and a job is rejected"""
+
+
+class StageTimeout(Exception):
+    """Raised when a pipeline stage exceeds its time limit"""
+
+    def __init__(self, stage: str, timeout: float):
+        super().__init__(f"Stage '{stage}' timed out after {timeout:.1f}s")
+        self.stage = stage
+        self.timeout = timeout
+
+
+class StageExecutor:
+    """
+    Runs blocking pipeline stages (Azure recognition, ffmpeg, Allosaurus)
+    on a dedicated thread pool so the event loop stays responsive.
+
+    The pool has a fixed number of threads and a limit on how many jobs
+    may be running or waiting at once. Jobs beyond that limit are rejected
+    immediately instead of piling up behind a slow backend.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        """
+        Args:
+            max_workers: Number of worker threads
+            max_pending: Maximum jobs running or queued before rejecting
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs currently running or queued"""
+        return self._pending
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="stage-worker"
+            )
+        return self._executor
+
+    async def run(
+        self,
+        stage: str,
+        func: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+        **kwargs: Any
+    ) -> Any:
+        """
+        Run a blocking function on the worker pool
+
+        Args:
+            stage: Stage name used in logs and errors
+            func: Blocking callable
+            timeout: Seconds to wait for the result (None waits forever)
+
+        Returns:
+            The callable's return value
+
+        Raises:
+            WorkerPoolSaturated: If the pool queue is full
+            StageTimeout: If the stage did not finish within timeout
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                logger.warning(f"Worker pool saturated ({self._pending} pending), rejecting stage '{stage}'")
+                raise WorkerPoolSaturated(f"Server busy, too many assessments in progress ({self._pending})")
+            self._pending += 1
+
+        loop = asyncio.get_running_loop()
+        # Run in a copy of the caller's context, so request IDs and stages reach the worker
+        context = contextvars.copy_context()
+        try:
+            future = loop.run_in_executor(
+                self._get_executor(),
+                lambda: context.run(func, *args, **kwargs)
+            )
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        # Release the slot when the thread actually finishes, not when the
+        # caller stops waiting, so timed-out jobs still count against the limit.
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Stage '{stage}' timed out after {timeout}s")
+            raise StageTimeout(stage, timeout)
+
+    def _release(self, future: "asyncio.Future") -> None:
+        with self._lock:
+            self._pending -= 1
+        # Mark late failures of abandoned jobs as retrieved
+        if not future.cancelled():
+            future.exception()
+
+    def shutdown(self) -> None:
+        """Stop accepting work and release worker threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Global instance
+stage_executor = StageExecutor(
+    max_workers=settings.WORKER_POOL_SIZE,
+    max_pending=settings.WORKER_QUEUE_LIMIT
+)
@@ -0,0 +1,149 @@
+"""
+Local stand-in for Azure pronunciation assessment
+
+Selected with SPEECH_PROVIDER=fake, for benchmarks and load tests that must
+not depend on the network or an Azure key. It answers after a configurable
+delay with a result in Azure's detailed JSON format (NBest, words,
+syllables, phonemes and their scores), which then goes through the same
+parsing as a real reply. Scores are pseudo-random but deterministic for a
+given audio and reference text.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import time
+from typing import Any, Dict, List
+
+from app.core.startup import LazyModule
+from app.models.audio import AudioBuffer
+from app.models.phonemes import phoneme_inventory
+from app.utils.phoneme_mapper import WORD_PATTERN, get_expected_ipa
+
+speechsdk = LazyModule("azure.cognitiveservices.speech")
+
+# Azure reports offsets and durations in 100ns ticks
+LEADING_SILENCE_TICKS = 5_000_000
+PHONEME_TICKS = 800_000
+
+# Share of phonemes scored as mispronounced
+MISPRONUNCIATION_RATE = 0.08
+
+
+class FakeRecognitionResult:
+    """The parts of speechsdk.SpeechRecognitionResult the service reads"""
+
+    def __init__(self, text: str, json_result: str):
+        self.reason = speechsdk.ResultReason.RecognizedSpeech
+        self.text = text
+        self.properties = {speechsdk.PropertyId.SpeechServiceResponse_JsonResult: json_result}
+
+
+class FakeSpeechProvider:
+    """Answers recognitions with synthetic Azure results after a delay"""
+
+    def __init__(self, latency_ms: float, jitter_ms: float):
+        """
+        Args:
+            latency_ms: Minimum simulated round trip
+            jitter_ms: Extra delay, uniformly distributed in [0, jitter_ms]
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+
+    def _delay(self) -> float:
+        return (self.latency_ms + random.uniform(0, self.jitter_ms)) / 1000
+
+    def recognize(self, audio: AudioBuffer, reference_text: str) -> FakeRecognitionResult:
+        """Blocking recognition, like recognize_once()"""
+        time.sleep(self._delay())
+        return self.result_for(reference_text, _seed(audio, reference_text))
+
+    async def recognize_async(self, audio: AudioBuffer, reference_text: str) -> FakeRecognitionResult:
+        """Recognition that waits without holding a thread, like recognize_once_async()"""
+        await asyncio.sleep(self._delay())
+        return self.result_for(reference_text, _seed(audio, reference_text))
+
+    def result_for(self, reference_text: str, seed: int = 0) -> FakeRecognitionResult:
+        """Result object for a reference text, without any delay"""
+        payload = self.payload(reference_text, seed)
+        return FakeRecognitionResult(payload["DisplayText"], json.dumps(payload, ensure_ascii=False))
+
+    def payload(self, reference_text: str, seed: int = 0) -> Dict[str, Any]:
+        """
+        Azure detailed JSON result for reading reference_text
+
+        Args:
+            reference_text: Text the speaker was asked to read
+            seed: Seed for the scores
+
+        Returns:
+            Parsed JSON, as in SpeechServiceResponse_JsonResult
+        """
+        rng = random.Random(seed)
+        offset = LEADING_SILENCE_TICKS
+        words: List[Dict[str, Any]] = []
+        for word in WORD_PATTERN.findall(reference_text):
+            ipa = get_expected_ipa(word, estimate=True) or ""
+            phonemes = []
+            for phone in ipa.split():
+                mispronounced = rng.random() < MISPRONUNCIATION_RATE
+                phonemes.append({
+                    "Phoneme": phoneme_inventory.arpabet[phoneme_inventory.id_of_ipa(phone)],
+                    "PronunciationAssessment": {
+                        "AccuracyScore": float(rng.randint(10, 50) if mispronounced else rng.randint(70, 100))
+                    },
+                    "Offset": offset + len(phonemes) * PHONEME_TICKS,
+                    "Duration": PHONEME_TICKS
+                })
+            accuracy = round(sum(p["PronunciationAssessment"]["AccuracyScore"] for p in phonemes) / len(phonemes)) if phonemes else 0
+            duration = max(1, len(phonemes)) * PHONEME_TICKS
+            words.append({
+                "Word": word.lower(),
+                "Offset": offset,
+                "Duration": duration,
+                "PronunciationAssessment": {
+                    "AccuracyScore": float(accuracy),
+                    "ErrorType": "None" if accuracy >= 60 else "Mispronunciation"
+                },
+                "Syllables": [{
+                    "Syllable": word.lower(),
+                    "PronunciationAssessment": {"AccuracyScore": float(accuracy)},
+                    "Offset": offset,
+                    "Duration": duration
+                }],
+                "Phonemes": phonemes
+            })
+            offset += duration + PHONEME_TICKS
+
+        accuracy = round(sum(w["PronunciationAssessment"]["AccuracyScore"] for w in words) / len(words), 1) if words else 0.0
+        fluency = float(rng.randint(70, 100))
+        lexical = " ".join(w["Word"] for w in words)
+        return {
+            "Id": f"{seed:032x}",
+            "RecognitionStatus": "Success",
+            "Offset": LEADING_SILENCE_TICKS,
+            "Duration": offset - LEADING_SILENCE_TICKS,
+            "Channel": 0,
+            "DisplayText": reference_text,
+            "SNR": round(rng.uniform(20, 40), 2),
+            "NBest": [{
+                "Confidence": round(rng.uniform(0.8, 0.99), 8),
+                "Lexical": lexical,
+                "ITN": lexical,
+                "MaskedITN": lexical,
+                "Display": reference_text,
+                "PronunciationAssessment": {
+                    "AccuracyScore": accuracy,
+                    "FluencyScore": fluency,
+                    "CompletenessScore": 100.0,
+                    "PronScore": round(0.6 * accuracy + 0.4 * fluency, 1)
+                },
+                "Words": words
+            }]
+        }
+
+
+def _seed(audio: AudioBuffer, reference_text: str) -> int:
+    digest = hashlib.blake2b(audio.pcm, digest_size=8, key=reference_text.encode("utf-8")[:64])
+    return int.from_bytes(digest.digest(), "big")
@@ -0,0 +1,246 @@
+"""
+In-process metrics in Prometheus text format
+
+Counters, gauges and histograms with fixed label names, kept in plain
+dicts behind one lock per metric. Recording is a dict lookup, a bisect
+over the bucket bounds and a few additions (about a microsecond); all
+formatting happens when /metrics is scraped. Each worker process has its
+own registry, so scrape every worker (or run one) for complete numbers.
+"""
+import bisect
+import contextvars
+import threading
+import time
+from typing import Dict, List, Sequence, Tuple
+
+# Stage latencies from a cached Azure reply (~ms) to a slow recognition (~10s)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+AUDIO_BYTES_BUCKETS = (16_000, 64_000, 128_000, 256_000, 512_000, 1_000_000, 2_000_000, 5_000_000, 10_000_000)
+AUDIO_SECONDS_BUCKETS = (0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+# Innermost stage being timed in this context (tags log records)
+current_stage: contextvars.ContextVar = contextvars.ContextVar("stage", default=None)
+
+
+class _Metric:
+    """Shared label handling and text rendering"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _labels(self, values: LabelValues, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{self._labels(labels)} {_number(value)}" for labels, value in items]
+
+
+class Gauge(_Metric):
+    """Current value per label set"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def dec(self, *label_values: str, amount: float = 1.0) -> None:
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{self._labels(labels)} {_number(value)}" for labels, value in items]
+
+
+class Histogram(_Metric):
+    """Bucketed observations per label set (cumulative on render)"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket..., count above the last bound], sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = ([0] * (len(self.buckets) + 1), [0.0])
+                self._values[label_values] = entry
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((labels, (list(counts), total[0])) for labels, (counts, total) in self._values.items())
+        lines = []
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                bucket_labels = self._labels(labels, 'le="' + _number(bound) + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            cumulative += counts[-1]
+            bucket_labels = self._labels(labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{self._labels(labels)} {cumulative}")
+        return lines
+
+
+class StageTimer:
+    """Context manager timing one pipeline stage (see Metrics.stage)"""
+
+    __slots__ = ("metrics", "name", "started", "token")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self.metrics = metrics
+        self.name = name
+        self.started = 0.0
+        self.token = None
+
+    def __enter__(self) -> "StageTimer":
+        self.metrics.stage_in_flight.inc(self.name)
+        self.token = current_stage.set(self.name)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        elapsed = time.perf_counter() - self.started
+        current_stage.reset(self.token)
+        self.metrics.stage_in_flight.dec(self.name)
+        self.metrics.stage_seconds.observe(elapsed, self.name)
+        if exc_type is not None:
+            self.metrics.stage_errors.inc(self.name, exc_type.__name__)
+
+
+class Metrics:
+    """
+    The API's metrics
+
+    Stages: decode, screen, azure (recognition round trip), azure_parse, phonemes,
+    alignment, serialize and assessment (the whole pipeline).
+    """
+
+    def __init__(self):
+        """Create the metric families"""
+        self.stage_seconds = Histogram(
+            "speaksharp_stage_duration_seconds", "Latency of each assessment stage", ("stage",)
+        )
+        self.stage_in_flight = Gauge(
+            "speaksharp_stage_in_flight", "Stage executions currently running", ("stage",)
+        )
+        self.stage_errors = Counter(
+            "speaksharp_stage_errors_total", "Stages that raised, by exception type", ("stage", "error")
+        )
+        self.audio_bytes = Histogram(
+            "speaksharp_audio_upload_bytes", "Size of uploaded audio", ("format",), AUDIO_BYTES_BUCKETS
+        )
+        self.audio_seconds = Histogram(
+            "speaksharp_audio_duration_seconds", "Duration of decoded audio", (), AUDIO_SECONDS_BUCKETS
+        )
+        self.audio_decodes = Counter(
+            "speaksharp_audio_decodes_total",
+            "Decoded uploads by sniffed container and method (passthrough, numpy, ffmpeg)",
+            ("container", "method")
+        )
+        self.audio_rejected = Counter(
+            "speaksharp_audio_rejected_total", "Recordings rejected by pre-screening", ("reason",)
+        )
+        self.audio_trimmed_seconds = Counter(
+            "speaksharp_audio_trimmed_seconds_total", "Silence trimmed off recordings before assessment"
+        )
+        self.azure_results = Counter(
+            "speaksharp_azure_results_total",
+            "Azure recognition outcomes by ResultReason and cancellation code",
+            ("reason", "code")
+        )
+        self.assessments = Counter(
+            "speaksharp_assessments_total", "Assessment requests by HTTP status", ("status",)
+        )
+        self.log_records_dropped = Counter(
+            "speaksharp_log_records_dropped_total", "Log records dropped because the log queue was full"
+        )
+        self.startup_seconds = Gauge(
+            "speaksharp_startup_seconds", "Duration of each startup phase (see /health/ready)", ("phase",)
+        )
+        self._families: List[_Metric] = [
+            self.stage_seconds, self.stage_in_flight, self.stage_errors, self.audio_bytes,
+            self.audio_seconds, self.audio_decodes, self.audio_rejected, self.audio_trimmed_seconds,
+            self.azure_results, self.assessments, self.log_records_dropped, self.startup_seconds
+        ]
+
+    def stage(self, name: str) -> StageTimer:
+        """Time a block as one execution of a stage: with metrics.stage("decode"): ..."""
+        return StageTimer(self, name)
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        for family in self._families:
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+
+def _number(value: float) -> str:
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# Global instance
+metrics = Metrics()
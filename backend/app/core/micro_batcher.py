@@ -0,0 +1,171 @@
+"""Micro-batching of concurrent blocking inference calls"""
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Generic, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class _Pending:
+    """One submitted item waiting for its share of a batch result"""
+
+    __slots__ = ("item", "enqueued_at", "done", "result", "error")
+
+    def __init__(self, item: Any):
+        self.item = item
+        self.enqueued_at = time.monotonic()
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Groups concurrent calls into batches for one inference worker
+
+    Callers block in submit() while a single worker thread collects
+    requests until the oldest one has waited window_seconds or
+    max_batch_size requests are queued, then runs process_batch on all of
+    them at once and hands each caller its own result. Under light load a
+    batch holds one item and costs at most one window of extra latency;
+    under heavy load batches fill up and each forward pass does more work.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[T]], List[R]],
+        max_batch_size: int,
+        window_seconds: float,
+        name: str = "micro-batcher"
+    ):
+        """
+        Args:
+            process_batch: Runs inference on a list of items and returns one
+                result per item, in order
+            max_batch_size: Largest batch handed to process_batch
+            window_seconds: Longest time the oldest queued item waits for
+                others to join its batch
+            name: Worker thread name
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.window_seconds = max(0.0, window_seconds)
+        self.name = name
+        self._queue: "queue.Queue[_Pending]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        self.batches = 0
+        self.items = 0
+        self.failed_batches = 0
+        self.batch_sizes: Dict[int, int] = {}
+        self._queue_waits: Deque[float] = deque(maxlen=1000)
+        self._batch_seconds: Deque[float] = deque(maxlen=1000)
+
+    def submit(self, item: T, timeout: Optional[float] = None) -> R:
+        """
+        Queue an item and wait for its result
+
+        Args:
+            item: Input for process_batch
+            timeout: Seconds to wait (None waits forever)
+
+        Returns:
+            This item's result
+
+        Raises:
+            TimeoutError: If the result did not arrive in time
+            Exception: Whatever process_batch raised for the batch
+        """
+        self._ensure_started()
+        pending = _Pending(item)
+        self._queue.put(pending)
+
+        if not pending.done.wait(timeout):
+            raise TimeoutError(f"{self.name} result not ready after {timeout}s")
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+
+            # The window counts from when the oldest item was queued, so
+            # items that arrived while the previous batch ran do not wait again
+            deadline = batch[0].enqueued_at + self.window_seconds
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        batch.append(self._queue.get(timeout=remaining))
+                    else:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self._process(batch)
+
+    def _process(self, batch: List[_Pending]) -> None:
+        started = time.monotonic()
+        for pending in batch:
+            self._queue_waits.append(started - pending.enqueued_at)
+
+        try:
+            results = self.process_batch([pending.item for pending in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"{self.name} returned {len(results)} results for {len(batch)} items")
+            for pending, result in zip(batch, results):
+                pending.result = result
+        except Exception as e:
+            logger.error(f"{self.name} batch of {len(batch)} failed: {str(e)}")
+            self.failed_batches += 1
+            for pending in batch:
+                pending.error = e
+        finally:
+            self._batch_seconds.append(time.monotonic() - started)
+            self.batches += 1
+            self.items += len(batch)
+            self.batch_sizes[len(batch)] = self.batch_sizes.get(len(batch), 0) + 1
+            for pending in batch:
+                pending.done.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Batch size distribution and queue wait / inference time percentiles (ms)"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "window_ms": round(self.window_seconds * 1000, 3),
+            "queued": self._queue.qsize(),
+            "batches": self.batches,
+            "items": self.items,
+            "failed_batches": self.failed_batches,
+            "mean_batch_size": round(self.items / self.batches, 3) if self.batches else 0.0,
+            "batch_sizes": {str(size): count for size, count in sorted(self.batch_sizes.items())},
+            "queue_wait_ms": _percentiles(self._queue_waits),
+            "batch_ms": _percentiles(self._batch_seconds),
+        }
+
+
+def _percentiles(samples: Deque[float]) -> Dict[str, float]:
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    return {
+        "p50": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        "max": round(ordered[-1] * 1000, 3),
+    }
@@ -0,0 +1,271 @@
+"""
+On-demand CPU and memory profiling of live requests
+
+Off unless PROFILING_ENABLED is set; when it is off the middleware is not
+even installed. When on, a request is profiled if it carries the admin
+token (X-Profile header or ?profile= query parameter) or is picked by
+PROFILING_SAMPLE_RATE. At most one request is profiled at a time per
+worker; others run normally while a profile is in progress.
+
+A profile covers the whole process for the duration of the request:
+    <id>.cpu.txt    sampled stacks of every thread in folded format
+                    ("thread;module:function:line;... count"), readable by
+                    flamegraph.pl and speedscope
+    <id>.alloc.txt  tracemalloc growth by line between request start and end
+    <id>.json       request method, path, status, duration and peak memory
+
+Profiles live in PROFILING_DIR, which keeps the newest
+PROFILING_MAX_PROFILES; /admin/profiles lists and serves them.
+"""
+import asyncio
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_ID_PATTERN = re.compile(r"^[0-9]{13}-[0-9a-f]{6}$")
+PROFILE_SUFFIXES = (".json", ".cpu.txt", ".alloc.txt")
+
+# Lines kept in the allocation report
+ALLOCATION_REPORT_LINES = 50
+
+
+def token_matches(value: Optional[str]) -> bool:
+    """Whether value is the configured PROFILING_TOKEN (never true when unset)"""
+    token = settings.PROFILING_TOKEN
+    return bool(token) and value is not None and hmac.compare_digest(value, token)
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all threads at a fixed interval
+
+    Runs in its own daemon thread and only reads sys._current_frames(), so
+    profiled code is never instrumented or slowed beyond the sampling
+    thread's share of the GIL.
+    """
+
+    def __init__(self, interval_seconds: float):
+        """
+        Args:
+            interval_seconds: Time between samples
+        """
+        self.interval_seconds = interval_seconds
+        self.samples = 0
+        self._stacks: "Counter[str]" = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval_seconds):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self._stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        """Sampled stacks in folded format, most frequent first"""
+        return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+
+class ProfileStore:
+    """Bounded on-disk ring of profiles"""
+
+    def __init__(self, directory: str, max_profiles: int):
+        """
+        Args:
+            directory: Where profiles are written
+            max_profiles: Profiles kept; the oldest are deleted beyond this
+        """
+        self.directory = directory
+        self.max_profiles = max(1, max_profiles)
+        self._lock = threading.Lock()
+
+    def new_id(self) -> str:
+        """Sortable profile id: millisecond timestamp and a random suffix"""
+        return f"{int(time.time() * 1000):013d}-{random.getrandbits(24):06x}"
+
+    def save(self, profile_id: str, meta: Dict[str, Any], cpu: str, allocations: str) -> None:
+        """Write one profile and drop the oldest ones beyond max_profiles"""
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            for suffix, content in ((".cpu.txt", cpu), (".alloc.txt", allocations)):
+                with open(os.path.join(self.directory, profile_id + suffix), "w", encoding="utf-8") as f:
+                    f.write(content)
+            # Metadata last: a profile is listed only once it is complete
+            with open(os.path.join(self.directory, profile_id + ".json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+            for old_id in self._ids()[:-self.max_profiles]:
+                for suffix in PROFILE_SUFFIXES:
+                    try:
+                        os.remove(os.path.join(self.directory, old_id + suffix))
+                    except FileNotFoundError:
+                        pass
+
+    def _ids(self) -> List[str]:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-len(".json")] for name in names if name.endswith(".json"))
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Metadata of stored profiles, newest first"""
+        profiles = []
+        for profile_id in reversed(self._ids()):
+            try:
+                with open(os.path.join(self.directory, profile_id + ".json"), "r", encoding="utf-8") as f:
+                    profiles.append({"id": profile_id, **json.load(f)})
+            except (OSError, ValueError):
+                continue
+        return profiles
+
+    def path(self, profile_id: str, kind: str) -> Optional[str]:
+        """
+        File of a stored profile
+
+        Args:
+            profile_id: Id from list()
+            kind: "cpu" or "alloc"
+
+        Returns:
+            Path, or None if the id, kind or file is not valid
+        """
+        if kind not in ("cpu", "alloc") or not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        path = os.path.join(self.directory, f"{profile_id}.{kind}.txt")
+        return path if os.path.exists(path) else None
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles selected HTTP requests
+
+    Only added to the app when PROFILING_ENABLED is set.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+        self.store = profile_store
+        self._busy = threading.Lock()
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not self._requested(scope) or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 0}
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            profiler = SamplingProfiler(settings.PROFILING_SAMPLE_INTERVAL_MS / 1000)
+            tracing = tracemalloc.is_tracing()
+            if not tracing:
+                tracemalloc.start()
+            elif hasattr(tracemalloc, "reset_peak"):
+                # Python 3.9+; otherwise the peak of an already running trace covers earlier requests too
+                tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot()
+            started = time.perf_counter()
+            profiler.start()
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                profiler.stop()
+                duration = time.perf_counter() - started
+                after = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                if not tracing:
+                    tracemalloc.stop()
+                # Diffing snapshots and writing files stays off the event loop
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self._save, scope, status["code"], duration, peak, profiler, before, after
+                )
+        finally:
+            self._busy.release()
+
+    def _requested(self, scope: Dict[str, Any]) -> bool:
+        """Whether this request asked for (or was sampled for) a profile"""
+        token = settings.PROFILING_TOKEN
+        if token:
+            for name, value in scope.get("headers", ()):
+                if name == PROFILE_HEADER and token_matches(value.decode("latin-1")):
+                    return True
+            query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+            if any(token_matches(value) for value in query.get(PROFILE_QUERY_PARAM, ())):
+                return True
+        rate = settings.PROFILING_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+    def _save(
+        self,
+        scope: Dict[str, Any],
+        status: int,
+        duration: float,
+        peak: int,
+        profiler: SamplingProfiler,
+        before: tracemalloc.Snapshot,
+        after: tracemalloc.Snapshot
+    ) -> None:
+        profile_id = self.store.new_id()
+        growth = after.compare_to(before, "lineno")[:ALLOCATION_REPORT_LINES]
+        meta = {
+            "method": scope.get("method"),
+            "path": scope.get("path"),
+            "status": status,
+            "duration_ms": round(duration * 1000, 3),
+            "cpu_samples": profiler.samples,
+            "peak_traced_bytes": peak
+        }
+        try:
+            self.store.save(
+                profile_id,
+                meta,
+                cpu=profiler.folded(),
+                allocations="".join(f"{stat}\n" for stat in growth)
+            )
+            logger.info(f"Saved profile {profile_id} for {meta['method']} {meta['path']} ({meta['duration_ms']}ms)")
+        except OSError as e:
+            logger.error(f"Could not save profile {profile_id}: {str(e)}")
+
+
+# Global instance
+profile_store = ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_PROFILES)
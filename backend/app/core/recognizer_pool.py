@@ -0,0 +1,279 @@
+"""Pool of pre-connected Azure speech recognizers"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from app.core.startup import LazyModule
+
+speechsdk = LazyModule("azure.cognitiveservices.speech")
+
+logger = logging.getLogger(__name__)
+
+
+class PooledRecognizer:
+    """A recognizer with its push stream and an already opened service connection"""
+
+    __slots__ = ("recognizer", "stream", "connection", "created_at", "connected", "failed")
+
+    def __init__(
+        self,
+        recognizer: "speechsdk.SpeechRecognizer",
+        stream: "speechsdk.audio.PushAudioInputStream",
+        connection: "speechsdk.Connection"
+    ):
+        self.recognizer = recognizer
+        self.stream = stream
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.connected = False
+        self.failed = False
+
+    def discard(self) -> None:
+        """Close the connection and drop event handlers"""
+        try:
+            self.connection.connected.disconnect_all()
+            self.connection.disconnected.disconnect_all()
+            self.connection.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled connection: {str(e)}")
+
+
+class RecognizerPool:
+    """
+    Keeps a few recognizers with open TLS/WebSocket connections to Azure
+
+    A SpeechRecognizer is bound to its audio stream, so each pooled entry is
+    used for exactly one recognition; what the pool saves is the connection
+    handshake, which Connection.open() performs ahead of time. A background
+    thread refills the pool after each checkout and drops entries that were
+    disconnected by the service or sat idle longer than idle_seconds.
+
+    Checked-out entries come back through release() once their recognition
+    has finished; an entry is never handed out again, release() closes its
+    connection.
+
+    When connections fail (Azure unreachable, key rejected), refills back
+    off exponentially from backoff_seconds up to max_backoff_seconds, one
+    connection attempt at a time; the first successful connect resets it.
+    """
+
+    def __init__(
+        self,
+        factory: "Callable[[], Tuple[speechsdk.SpeechRecognizer, speechsdk.audio.PushAudioInputStream]]",
+        size: int,
+        idle_seconds: float,
+        backoff_seconds: float = 1.0,
+        max_backoff_seconds: float = 60.0
+    ):
+        """
+        Args:
+            factory: Creates a recognizer and its push stream (without assessment config)
+            size: Number of warm recognizers to keep
+            idle_seconds: Maximum age of an unused entry
+            backoff_seconds: Delay before reconnecting after the first failure
+            max_backoff_seconds: Longest delay between reconnect attempts
+        """
+        self.factory = factory
+        self.size = size
+        self.idle_seconds = idle_seconds
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        # Consecutive connection failures, and when the next attempt may start
+        self._failures = 0
+        self._retry_at = 0.0
+        self._idle: Deque[PooledRecognizer] = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        self.hits = 0
+        self.misses = 0
+        self.in_use = 0
+        self.released = 0
+        self.created = 0
+        self.expired = 0
+        self.unhealthy = 0
+
+    def start(self) -> None:
+        """Start the background refill thread"""
+        if self.size <= 0 or self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._refill_loop, name="recognizer-pool", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop refilling and close idle connections"""
+        self._running = False
+        self._wakeup.set()
+        with self._lock:
+            entries = list(self._idle)
+            self._idle.clear()
+        for entry in entries:
+            entry.discard()
+
+    def acquire(self) -> Optional[PooledRecognizer]:
+        """
+        Take a recognizer whose connection to Azure is already established
+
+        Returns:
+            A pooled recognizer, or None if none is ready (the caller then
+            creates its own)
+        """
+        if not self._running:
+            return None
+
+        entry = None
+        with self._lock:
+            # Hand out only entries whose connection is up; ones still
+            # connecting stay in the pool, dead or stale ones are dropped
+            for candidate in list(self._idle):
+                if not self._is_healthy(candidate):
+                    self._idle.remove(candidate)
+                    self._drop(candidate)
+                elif candidate.connected:
+                    self._idle.remove(candidate)
+                    entry = candidate
+                    break
+
+        self._wakeup.set()
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        with self._lock:
+            self.in_use += 1
+        return entry
+
+    def release(self, entry: PooledRecognizer) -> None:
+        """
+        Return a checked-out recognizer whose recognition has completed
+
+        Must not be called while the recognizer is still recognizing (e.g.
+        when the caller gave up waiting); release it from its completion
+        event instead.
+        """
+        with self._lock:
+            self.in_use -= 1
+            self.released += 1
+        entry.discard()
+
+    def _is_healthy(self, entry: PooledRecognizer) -> bool:
+        return (
+            not entry.failed
+            and time.monotonic() - entry.created_at < self.idle_seconds
+        )
+
+    def _drop(self, entry: PooledRecognizer) -> None:
+        if entry.failed:
+            self.unhealthy += 1
+        else:
+            self.expired += 1
+        entry.discard()
+
+    def _refill_loop(self) -> None:
+        while self._running:
+            try:
+                self._expire_idle()
+                self._fill()
+            except Exception as e:
+                delay = self._record_failure()
+                logger.error(f"Recognizer pool refill failed, retrying in {delay:.0f}s: {str(e)}")
+            timeout = max(self.idle_seconds / 4, 1.0)
+            with self._lock:
+                if self._failures:
+                    timeout = max(self._retry_at - time.monotonic(), 0.0)
+            self._wakeup.wait(timeout=timeout)
+            self._wakeup.clear()
+
+    def _record_failure(self) -> float:
+        """Count a failed connection and push back the next attempt; returns the delay"""
+        with self._lock:
+            self._failures += 1
+            delay = min(self.backoff_seconds * 2 ** (self._failures - 1), self.max_backoff_seconds)
+            self._retry_at = time.monotonic() + delay
+        return delay
+
+    def _record_success(self) -> None:
+        with self._lock:
+            recovered = self._failures
+            self._failures = 0
+            self._retry_at = 0.0
+        if recovered:
+            # The probe connection is up, refill the rest of the pool
+            logger.info(f"Recognizer pool reconnected after {recovered} failed attempts")
+            self._wakeup.set()
+
+    def _expire_idle(self) -> None:
+        with self._lock:
+            stale = [entry for entry in self._idle if not self._is_healthy(entry)]
+            for entry in stale:
+                self._idle.remove(entry)
+        for entry in stale:
+            self._drop(entry)
+
+    def _fill(self) -> None:
+        while self._running:
+            with self._lock:
+                if len(self._idle) >= self.size:
+                    return
+                failing = self._failures > 0
+                if failing and (time.monotonic() < self._retry_at or any(not e.connected for e in self._idle)):
+                    # Backing off, or the single probe connection is still opening
+                    return
+            entry = self._create()
+            with self._lock:
+                self._idle.append(entry)
+            if failing:
+                return
+
+    def _create(self) -> PooledRecognizer:
+        recognizer, stream = self.factory()
+        connection = speechsdk.Connection.from_recognizer(recognizer)
+        entry = PooledRecognizer(recognizer, stream, connection)
+
+        def on_connected(evt: "speechsdk.ConnectionEventArgs") -> None:
+            entry.connected = True
+            self._record_success()
+
+        def on_disconnected(evt: "speechsdk.ConnectionEventArgs") -> None:
+            # Only a connection that is dropped while waiting in the pool is a
+            # problem; checked-out entries are no longer looked at. The refill
+            # thread is not woken: it reconnects after the backoff delay.
+            entry.failed = True
+            # A connection that never came up failed to connect, even if the
+            # SDK reports it before the entry reached the pool
+            with self._lock:
+                pooled = not entry.connected or entry in self._idle
+            if pooled:
+                delay = self._record_failure()
+                logger.debug(f"Pooled recognizer disconnected, reconnecting in {delay:.0f}s")
+
+        connection.connected.connect(on_connected)
+        connection.disconnected.connect(on_disconnected)
+        connection.open(False)
+        self.created += 1
+        return entry
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool size and checkout counters"""
+        with self._lock:
+            idle = len(self._idle)
+            connected = sum(1 for entry in self._idle if entry.connected)
+        return {
+            "size": self.size,
+            "idle": idle,
+            "connected": connected,
+            "hits": self.hits,
+            "misses": self.misses,
+            "in_use": self.in_use,
+            "released": self.released,
+            "created": self.created,
+            "expired": self.expired,
+            "unhealthy": self.unhealthy,
+            "failures": self._failures
+        }
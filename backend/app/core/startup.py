@@ -0,0 +1,219 @@
+"""
+Cold start: lazy imports, warm-up and readiness
+
+Importing the app loads neither the Azure Speech SDK nor the Allosaurus
+model; every backend is loaded on first use. The startup event can warm
+them up front instead (STARTUP_WARMUP):
+
+    background  Warm in a thread; the server takes connections at once and
+                /health/ready answers 503 until warming has finished
+    blocking    Warm before the server accepts connections
+    off         Nothing up front (e.g. serverless, where a warm-up would
+                only delay the first request)
+
+/health/live only says the process is up. /health/ready reports each
+component's state and the measured startup phases, which are also exported
+as speaksharp_startup_seconds.
+"""
+import importlib
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.core.metrics import metrics
+
+# First import of this module: app.main imports it before anything else
+PROCESS_STARTED = time.monotonic()
+
+COLD = "cold"
+WARMING = "warming"
+READY = "ready"
+UNAVAILABLE = "unavailable"
+DISABLED = "disabled"
+
+WARMUP_MODES = ("background", "blocking", "off")
+
+logger = logging.getLogger(__name__)
+
+
+class ComponentUnavailable(Exception):
+    """Raised by a warm-up function when its component cannot be used"""
+    pass
+
+
+class ComponentDisabled(ComponentUnavailable):
+    """Raised by a warm-up function when its component is not meant to be used"""
+    pass
+
+
+class LazyModule:
+    """
+    A module imported on first attribute access
+
+        speechsdk = LazyModule("azure.cognitiveservices.speech")
+
+    The import time is recorded as the startup phase "import <name>" (by
+    whichever LazyModule of that name imports it first).
+    Annotations naming the module's types have to be strings, or they
+    would import it when the function is defined.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def load(self) -> ModuleType:
+        """Import the module (once) and return it"""
+        module = self._module
+        if module is None:
+            with self._lock:
+                if self._module is None:
+                    imported = self._name in sys.modules
+                    started = time.monotonic()
+                    self._module = importlib.import_module(self._name)
+                    if not imported:
+                        startup.record_phase(f"import {self._name}", time.monotonic() - started)
+                module = self._module
+        return module
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self.load(), attribute)
+
+
+class StartupTracker:
+    """Startup phase timings and the warm-up state of each component"""
+
+    def __init__(self):
+        self.mode = "off"
+        self.phases: Dict[str, float] = {}
+        self.components: Dict[str, Dict[str, Any]] = {}
+        self._warmers: List[Tuple[str, Callable[[], str]]] = []
+        self._started = False
+        self._warming = False
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        """Startup has run and no warm-up is pending or in progress"""
+        return self._started and not self._warming
+
+    def uptime(self) -> float:
+        return time.monotonic() - PROCESS_STARTED
+
+    def record_phase(self, name: str, seconds: float) -> None:
+        self.phases[name] = round(seconds, 4)
+        metrics.startup_seconds.set(seconds, name)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a block as a startup phase: with startup.phase("startup"): ..."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record_phase(name, time.monotonic() - started)
+
+    def register(self, name: str, warm: Callable[[], str]) -> None:
+        """
+        Add a component to warm up
+
+        Args:
+            name: Component name in /health/ready
+            warm: Loads the component and returns a short description;
+                raises ComponentUnavailable if it cannot be used and
+                ComponentDisabled if it is switched off
+        """
+        self._warmers.append((name, warm))
+        self.components[name] = {"state": COLD, "detail": None, "seconds": None}
+
+    def start(self, mode: str) -> None:
+        """
+        Warm the registered components as configured (from the startup event)
+
+        Args:
+            mode: One of background, blocking, off
+        """
+        if mode not in WARMUP_MODES:
+            logger.warning(f"Unknown STARTUP_WARMUP '{mode}', using background")
+            mode = "background"
+        self.mode = mode
+
+        with self._lock:
+            if self._started:
+                return
+            self._warming = mode != "off"
+            self._started = True
+
+        if mode == "blocking":
+            self._warm_all()
+        elif mode == "background":
+            threading.Thread(target=self._warm_all, name="startup-warmup", daemon=True).start()
+        else:
+            self._finish()
+
+    def warm(self, name: str, warm: Callable[[], str]) -> None:
+        """Warm one component and record its state"""
+        component = self.components[name]
+        component["state"] = WARMING
+        started = time.monotonic()
+        try:
+            component["detail"] = warm()
+            component["state"] = READY
+            logger.info(f"✓ {name} ready ({component['detail']})")
+        except ComponentDisabled as e:
+            component["detail"] = str(e)
+            component["state"] = DISABLED
+            logger.info(f"- {name} disabled ({str(e)})")
+        except ComponentUnavailable as e:
+            component["detail"] = str(e)
+            component["state"] = UNAVAILABLE
+            logger.warning(f"✗ {name} NOT available ({str(e)})")
+        except Exception as e:
+            component["detail"] = f"{type(e).__name__}: {str(e)}"
+            component["state"] = UNAVAILABLE
+            logger.error(f"✗ {name} failed to warm up: {str(e)}", exc_info=True)
+        finally:
+            component["seconds"] = round(time.monotonic() - started, 4)
+
+    def _warm_all(self) -> None:
+        with self.phase("warmup"):
+            for name, warm in self._warmers:
+                self.warm(name, warm)
+        self._finish()
+
+    def _finish(self) -> None:
+        self._warming = False
+        self.record_phase("ready", self.uptime())
+        logger.info(f"Ready {self.phases['ready']:.3f}s after import (startup phases: {self.phases})")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Readiness, component states and phase timings for /health/ready"""
+        if not self._started:
+            status = "starting"
+        elif self._warming:
+            status = "warming"
+        elif any(component["state"] == UNAVAILABLE for component in self.components.values()):
+            status = "degraded"
+        else:
+            status = "ready"
+        return {
+            "status": status,
+            "ready": self.ready,
+            "warmup": self.mode,
+            "uptime_seconds": round(self.uptime(), 3),
+            "components": {name: dict(component) for name, component in self.components.items()},
+            "startup_seconds": dict(self.phases)
+        }
+
+
+# Global instance
+startup = StartupTracker()
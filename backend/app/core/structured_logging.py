@@ -0,0 +1,274 @@
+"""
+Structured, non-blocking logging
+
+Records are filtered and tagged on the calling thread, then handed to a
+bounded queue; a background listener thread formats them (JSON or text)
+and writes them to stdout. The request path never formats a message or
+waits on I/O, and when the queue is full records are dropped and counted
+(speaksharp_log_records_dropped_total) instead of blocking.
+
+Every record carries the request ID (X-Request-ID, generated if absent)
+and the pipeline stage it was logged in (see Metrics.stage).
+
+Records below WARNING can be sampled per stage with LOG_SAMPLE_RATES
+("azure_parse=0.01,decode=0.1,*=1"). The decision is made per request and
+stage, so a sampled request keeps all of that stage's lines.
+
+A single request can be logged in more detail than the rest by sending
+X-Log-Level (e.g. DEBUG) with X-Log-Token equal to LOG_ESCALATION_TOKEN.
+While such a request runs, loggers are opened up to its level and the
+extra records of other requests are dropped by the filter.
+"""
+import contextvars
+import hmac
+import json
+import logging
+import logging.handlers
+import queue
+import re
+import sys
+import threading
+import time
+import uuid
+import zlib
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import current_stage, metrics
+
+REQUEST_ID_HEADER = b"x-request-id"
+LOG_LEVEL_HEADER = b"x-log-level"
+LOG_TOKEN_HEADER = b"x-log-token"
+# Client-supplied request IDs are used only if they look like one
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+
+# Context of the request being handled (copied into tasks and stage workers);
+# the stage is metrics.current_stage, set by Metrics.stage
+request_id_var: contextvars.ContextVar = contextvars.ContextVar("request_id", default=None)
+escalation_var: contextvars.ContextVar = contextvars.ContextVar("log_escalation", default=None)
+
+# LogRecord attributes that are not structured extra fields
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message", "asctime", "request_id", "stage"
+}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; fields passed with extra= are included"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        stage = getattr(record, "stage", None)
+        if stage is not None:
+            entry["stage"] = stage
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Tags records with the request context and applies escalation and sampling
+
+    Runs on the logging thread's caller, so it must stay cheap.
+    """
+
+    def __init__(self, base_level: int, sample_rates: Dict[str, float]):
+        """
+        Args:
+            base_level: Level logged for every request
+            sample_rates: Stage (or "*") -> share of requests whose records
+                below WARNING are kept
+        """
+        super().__init__()
+        self.base_level = base_level
+        self.sample_rates = sample_rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        request_id = request_id_var.get()
+        stage = current_stage.get()
+        record.request_id = request_id or "-"
+        record.stage = stage
+
+        escalation = escalation_var.get()
+        if escalation is not None:
+            return record.levelno >= escalation
+        if record.levelno < self.base_level:
+            return False
+        if record.levelno >= logging.WARNING or not self.sample_rates:
+            return True
+
+        rate = self.sample_rates.get(stage or "", self.sample_rates.get("*"))
+        if rate is None or rate >= 1.0:
+            return True
+        if request_id is None:
+            return False
+        return zlib.crc32(f"{request_id}:{stage}".encode()) / 0x100000000 < rate
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks, and leaves JSON/text formatting to the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments now: the caller may mutate them before the
+        # listener gets to the record (which is why the stdlib prepare
+        # formats up front). Records without arguments need no work.
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.log_records_dropped.inc()
+
+
+class StructuredLogging:
+    """Installs the queue-backed handler and tracks per-request escalations"""
+
+    def __init__(self):
+        self.base_level = logging.WARNING
+        self.filter: Optional[ContextFilter] = None
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._escalations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def configure(self) -> None:
+        """Replace the root logger's handlers with the queue (idempotent)"""
+        if self._listener is not None:
+            return
+        level_name = settings.LOG_LEVEL or ("INFO" if settings.DEBUG else "WARNING")
+        self.base_level = logging.getLevelName(level_name.upper())
+        if not isinstance(self.base_level, int):
+            self.base_level = logging.WARNING
+
+        output = logging.StreamHandler(sys.stdout)
+        if settings.LOG_FORMAT == "text":
+            output.setFormatter(logging.Formatter(TEXT_FORMAT))
+        else:
+            output.setFormatter(JsonFormatter())
+
+        records: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+        handler = DroppingQueueHandler(records)
+        self.filter = ContextFilter(self.base_level, settings.log_sample_rates)
+        handler.addFilter(self.filter)
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(handler)
+        root.setLevel(self.base_level)
+
+        self._listener = logging.handlers.QueueListener(records, output)
+        self._listener.start()
+
+    def shutdown(self) -> None:
+        """Write out queued records and stop the listener thread"""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    def escalation_level(self, headers: List[Any]) -> Optional[int]:
+        """
+        Log level requested by X-Log-Level, if X-Log-Token is valid
+
+        Args:
+            headers: ASGI (name, value) header pairs
+
+        Returns:
+            Level below the base level, or None
+        """
+        token = settings.LOG_ESCALATION_TOKEN
+        if not token:
+            return None
+        level_name = supplied = None
+        for name, value in headers:
+            if name == LOG_LEVEL_HEADER:
+                level_name = value.decode("latin-1").strip().upper()
+            elif name == LOG_TOKEN_HEADER:
+                supplied = value.decode("latin-1")
+        if level_name is None or supplied is None or not hmac.compare_digest(supplied, token):
+            return None
+        level = logging.getLevelName(level_name)
+        if not isinstance(level, int) or level >= self.base_level:
+            return None
+        return level
+
+    def begin_escalation(self, level: int) -> None:
+        with self._lock:
+            self._escalations[level] = self._escalations.get(level, 0) + 1
+            self._apply_level()
+
+    def end_escalation(self, level: int) -> None:
+        with self._lock:
+            self._escalations[level] -= 1
+            if not self._escalations[level]:
+                del self._escalations[level]
+            self._apply_level()
+
+    def _apply_level(self) -> None:
+        # Logger.setLevel clears the cached isEnabledFor results of every logger
+        logging.getLogger().setLevel(min([self.base_level, *self._escalations]))
+
+
+class RequestContextMiddleware:
+    """
+    ASGI middleware that gives each request its ID and escalation level
+
+    The ID comes from X-Request-ID when present and valid, otherwise it is
+    generated; HTTP responses echo it back in X-Request-ID.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        headers = scope.get("headers", [])
+        request_id = None
+        for name, value in headers:
+            if name == REQUEST_ID_HEADER:
+                candidate = value.decode("latin-1")
+                if REQUEST_ID_PATTERN.match(candidate):
+                    request_id = candidate
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex[:16]
+        level = structured_logging.escalation_level(headers)
+
+        async def send_with_request_id(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (REQUEST_ID_HEADER, request_id.encode("latin-1"))]
+            await send(message)
+
+        request_token = request_id_var.set(request_id)
+        escalation_token = escalation_var.set(level)
+        if level is not None:
+            structured_logging.begin_escalation(level)
+        try:
+            await self.app(scope, receive, send_with_request_id if scope["type"] == "http" else send)
+        finally:
+            if level is not None:
+                structured_logging.end_escalation(level)
+            escalation_var.reset(escalation_token)
+            request_id_var.reset(request_token)
+
+
+# Global instance
+structured_logging = StructuredLogging()
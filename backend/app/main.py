@@ -1,21 +1,19 @@
 """Main FastAPI application for SpeakSharp pronunciation assessment"""
+# First, so the import phase is timed from here
+from app.core.startup import ComponentDisabled, ComponentUnavailable, startup
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import logging
-import sys
 
 from app.core.config import settings
-from app.api.routes import health, pronunciation
+from app.core.structured_logging import RequestContextMiddleware, structured_logging
+from app.api.routes import health, metrics, profiles, pronunciation, streaming
 from app import __version__
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO if settings.DEBUG else logging.WARNING,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+# Configure logging (JSON records written to stdout by a background thread)
+structured_logging.configure()
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +24,7 @@ app = FastAPI(
     version=__version__,
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS
@@ -35,37 +34,91 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
 
+# Request profiling is opt-in; when off the middleware is not installed at all
+if settings.PROFILING_ENABLED:
+    from app.core.profiling import ProfilingMiddleware
+    app.add_middleware(ProfilingMiddleware)
+
+# Outermost: request IDs and log escalation for everything below
+app.add_middleware(RequestContextMiddleware)
+
 # Include routers
 app.include_router(health.router, tags=["Health"])
 app.include_router(pronunciation.router, tags=["Pronunciation"])
+app.include_router(streaming.router, tags=["Streaming"])
+app.include_router(metrics.router, tags=["Metrics"])
+app.include_router(profiles.router, tags=["Admin"])
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Run on application startup"""
-    logger.info("=" * 60)
-    logger.info(f"SpeakSharp API v{__version__} starting...")
-    logger.info(f"Environment: {settings.ENVIRONMENT}")
-    logger.info(f"Debug mode: {settings.DEBUG}")
-    logger.info(f"CORS origins: {settings.cors_origins_list}")
-
-    # Check Azure configuration
+def _warm_azure() -> str:
     from app.core.azure_speech import azure_speech_service
-    if azure_speech_service.configured:
-        logger.info("✓ Azure Speech Services configured")
-    else:
-        logger.warning("✗ Azure Speech Services NOT configured (using mock mode)")
+    return azure_speech_service.warm()
+
+
+def _warm_ffmpeg() -> str:
+    # Locate ffmpeg once for the in-memory audio decoder
+    from app.services.audio_decoder import audio_decoder
+    if not audio_decoder.probe():
+        raise ComponentUnavailable("only WAV and raw PCM uploads can be decoded")
+    return audio_decoder.ffmpeg_path
+
+
+def _warm_lexicon() -> str:
+    from app.utils.lexicon import lexicon, LexiconError
+    try:
+        return f"{lexicon.load()} words"
+    except LexiconError as e:
+        raise ComponentUnavailable(str(e))
+
+
+def _warm_drills() -> str:
+    # Precompiled drills, so exercise_id requests skip text processing
+    from app.services.drill_corpus import drill_corpus, DrillCorpusError
+    try:
+        return f"{drill_corpus.load()} exercises"
+    except DrillCorpusError as e:
+        raise ComponentUnavailable(str(e))
 
-    # Check Allosaurus
+
+def _warm_allosaurus() -> str:
+    from app.services.phoneme_server import PhonemeModelUnavailable
     from app.services.phoneme_service import phoneme_service
-    if phoneme_service.loaded:
-        logger.info("✓ Allosaurus phoneme detection loaded")
-    else:
-        logger.warning("✗ Allosaurus NOT loaded (IPA transcription unavailable)")
+    if phoneme_service.backend == "off":
+        raise ComponentDisabled("PHONEME_BACKEND=off")
+    if not phoneme_service.available:
+        raise ComponentDisabled("Allosaurus is not installed")
+    try:
+        phoneme_service.warm()
+    except PhonemeModelUnavailable as e:
+        raise ComponentUnavailable(f"IPA transcription unavailable: {str(e)}")
+    return f"{phoneme_service.backend} backend"
+
+
+# Warmed in this order by the startup event (STARTUP_WARMUP), otherwise on first use
+startup.register("azure", _warm_azure)
+startup.register("ffmpeg", _warm_ffmpeg)
+startup.register("lexicon", _warm_lexicon)
+startup.register("drills", _warm_drills)
+startup.register("allosaurus", _warm_allosaurus)
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Run on application startup"""
+    with startup.phase("startup"):
+        structured_logging.configure()
+        logger.info("=" * 60)
+        logger.info(f"SpeakSharp API v{__version__} starting...")
+        logger.info(f"Environment: {settings.ENVIRONMENT}")
+        logger.info(f"Debug mode: {settings.DEBUG}")
+        logger.info(f"CORS origins: {settings.cors_origins_list}")
+        logger.info(f"Warm-up: {settings.STARTUP_WARMUP} (app imported in {startup.phases['import']:.3f}s)")
+        logger.info("=" * 60)
 
-    logger.info("=" * 60)
+        startup.start(settings.STARTUP_WARMUP)
 
 
 @app.on_event("shutdown")
@@ -73,6 +126,15 @@ async def shutdown_event():
     """Run on application shutdown"""
     logger.info("SpeakSharp API shutting down...")
 
+    from app.core.executor import stage_executor
+    stage_executor.shutdown()
+
+    from app.core.azure_speech import azure_speech_service
+    if azure_speech_service.recognizer_pool is not None:
+        azure_speech_service.recognizer_pool.stop()
+
+    structured_logging.shutdown()
+
 
 @app.get("/")
 async def root():
@@ -85,6 +147,9 @@ async def root():
     }
 
 
+startup.record_phase("import", startup.uptime())
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
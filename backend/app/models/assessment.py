@@ -0,0 +1,98 @@
+"""Internal word-level assessment results"""
+from array import array
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.models.phonemes import phoneme_inventory
+
+
+def classify_phoneme_error(score: float) -> Optional[str]:
+    """Classify phoneme error based on score"""
+    if score >= 80:
+        return None
+    elif score >= 60:
+        return "Mispronunciation"
+    else:
+        return "Omission"
+
+
+class WordResult:
+    """
+    One assessed word with its phonemes stored as parallel arrays
+
+    Phonemes are interned IDs (see PhonemeInventory) and their scores a
+    float array, so a word costs a few objects however many phonemes it
+    has. The pipeline passes WordResult objects around and converts them
+    to the public JSON shape once, with to_dict().
+    """
+
+    __slots__ = ("word", "accuracy", "error_type", "phoneme_ids", "phoneme_scores")
+
+    def __init__(
+        self,
+        word: str,
+        accuracy: float,
+        error_type: str = "None",
+        phoneme_ids: Optional[array] = None,
+        phoneme_scores: Optional[array] = None
+    ):
+        """
+        Args:
+            word: Word text
+            accuracy: Word accuracy score (0-100)
+            error_type: Azure error type (None, Mispronunciation, Omission, Insertion)
+            phoneme_ids: Interned phoneme IDs (array of "H")
+            phoneme_scores: Accuracy per phoneme (array of "d")
+        """
+        self.word = word
+        self.accuracy = accuracy
+        self.error_type = error_type
+        self.phoneme_ids = phoneme_ids if phoneme_ids is not None else array("H")
+        self.phoneme_scores = phoneme_scores if phoneme_scores is not None else array("d")
+
+    @classmethod
+    def from_azure(cls, word_data: Dict[str, Any]) -> "WordResult":
+        """Build from one entry of Azure's NBest[0].Words"""
+        assessment = word_data.get("PronunciationAssessment", {})
+        phoneme_ids = array("H")
+        phoneme_scores = array("d")
+        id_of = phoneme_inventory.id_of
+        for phoneme_data in word_data.get("Phonemes", ()):
+            phoneme_ids.append(id_of(phoneme_data.get("Phoneme", "")))
+            # Azure nests the phoneme score like the word score
+            score = phoneme_data.get("PronunciationAssessment", {}).get("AccuracyScore")
+            phoneme_scores.append(score if score is not None else phoneme_data.get("Score", 0.0))
+        return cls(
+            word=word_data.get("Word", ""),
+            accuracy=assessment.get("AccuracyScore", 0.0),
+            error_type=assessment.get("ErrorType", "None"),
+            phoneme_ids=phoneme_ids,
+            phoneme_scores=phoneme_scores
+        )
+
+    @property
+    def ipa(self) -> str:
+        """Space-separated IPA of the pronounced phonemes"""
+        return phoneme_inventory.to_ipa(self.phoneme_ids)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Public JSON shape (WordScore)"""
+        arpabet = phoneme_inventory.arpabet
+        return {
+            "word": self.word,
+            "accuracy": self.accuracy,
+            "error_type": self.error_type,
+            "phonemes": [
+                {
+                    "phoneme": arpabet[phoneme_id],
+                    "accuracy": score,
+                    "error_type": classify_phoneme_error(score)
+                }
+                for phoneme_id, score in zip(self.phoneme_ids, self.phoneme_scores)
+            ],
+            "ipa": self.ipa
+        }
+
+
+def words_to_dicts(words: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Convert WordResult objects to the public shape (dicts pass through)"""
+    return [word.to_dict() if isinstance(word, WordResult) else word for word in words]
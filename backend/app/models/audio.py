@@ -0,0 +1,46 @@
+"""Decoded audio shared by the assessment pipeline"""
+import io
+import wave
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class AudioBuffer:
+    """
+    Immutable decoded audio (mono, 16-bit little-endian PCM)
+
+    Produced once per request by the audio decoder and passed to Azure,
+    Allosaurus and any later analysis stage, so none of them transcode
+    or touch disk on their own.
+    """
+    pcm: bytes
+    sample_rate: int = 16000
+
+    CHANNELS = 1
+    SAMPLE_WIDTH = 2  # bytes (16-bit)
+
+    @property
+    def samples(self) -> memoryview:
+        """Zero-copy view of the PCM as signed 16-bit samples"""
+        return memoryview(self.pcm).cast("h")
+
+    @property
+    def num_samples(self) -> int:
+        """Number of samples"""
+        return len(self.pcm) // self.SAMPLE_WIDTH
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds"""
+        return self.num_samples / self.sample_rate
+
+    def to_wav(self) -> io.BytesIO:
+        """Wrap the PCM in an in-memory WAV file"""
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav_file:
+            wav_file.setnchannels(self.CHANNELS)
+            wav_file.setsampwidth(self.SAMPLE_WIDTH)
+            wav_file.setframerate(self.sample_rate)
+            wav_file.writeframes(self.pcm)
+        buffer.seek(0)
+        return buffer
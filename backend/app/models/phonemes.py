@@ -0,0 +1,134 @@
+"""Interned phoneme inventory"""
+import logging
+import threading
+from array import array
+from typing import Dict, Iterable, List
+
+from app.utils.phoneme_mapper import AZURE_TO_IPA
+
+logger = logging.getLogger(__name__)
+
+
+class PhonemeInventory:
+    """
+    Small-int IDs for phoneme symbols, with their IPA precomputed
+
+    Every Azure phoneme symbol is interned once; after that, parsing a
+    result is a dict lookup per phoneme and IPA strings are shared instead
+    of being rebuilt. Spelling variants ("TH", "ih1") resolve to the ID of
+    their base symbol. Symbols outside AZURE_TO_IPA get a new ID whose IPA
+    is the symbol itself, like azure_to_ipa, until the inventory holds
+    MAX_PHONEMES; later ones share unknown_id, so malformed input cannot
+    grow the inventory (or the aligner's cost matrix) without bound.
+    """
+
+    # Bound on interned spellings, so garbage input cannot grow the table forever
+    MAX_ALIASES = 4096
+    # Bound on distinct phonemes (Azure's ~40 plus Allosaurus' universal set fit easily)
+    MAX_PHONEMES = 512
+    # Symbol and IPA of the shared ID for phonemes past MAX_PHONEMES
+    UNKNOWN = "?"
+
+    def __init__(self, mapping: Dict[str, str]):
+        """
+        Args:
+            mapping: Base ARPABET symbol -> IPA
+        """
+        self.arpabet: List[str] = []
+        self.ipa: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._full_logged = False
+        for symbol, ipa in mapping.items():
+            self._add(symbol, ipa)
+        self.unknown_id = self._add(self.UNKNOWN, self.UNKNOWN)
+        self._ipa_ids: Dict[str, int] = {ipa: phoneme_id for phoneme_id, ipa in enumerate(self.ipa)}
+
+    def _add(self, symbol: str, ipa: str) -> int:
+        phoneme_id = len(self.arpabet)
+        self.arpabet.append(symbol)
+        self.ipa.append(ipa)
+        self._ids[symbol] = phoneme_id
+        return phoneme_id
+
+    def _new_id(self, symbol: str, ipa: str) -> int:
+        """ID for a phoneme not seen before (unknown_id once the inventory is full)"""
+        if len(self.arpabet) >= self.MAX_PHONEMES:
+            if not self._full_logged:
+                self._full_logged = True
+                logger.warning(f"Phoneme inventory is full ({self.MAX_PHONEMES}); new symbols such as {symbol!r} map to {self.UNKNOWN!r}")
+            return self.unknown_id
+        phoneme_id = len(self.arpabet)
+        self.arpabet.append(symbol)
+        self.ipa.append(ipa)
+        return phoneme_id
+
+    def __len__(self) -> int:
+        return len(self.arpabet)
+
+    def id_of(self, symbol: str) -> int:
+        """
+        Get the ID of a phoneme symbol, interning it if new
+
+        Args:
+            symbol: Phoneme as returned by Azure (e.g. "th")
+        """
+        phoneme_id = self._ids.get(symbol)
+        if phoneme_id is not None:
+            return phoneme_id
+
+        with self._lock:
+            phoneme_id = self._ids.get(symbol)
+            if phoneme_id is not None:
+                return phoneme_id
+
+            # Same normalization as azure_to_ipa: case, whitespace, stress digits
+            base = "".join(c for c in symbol.lower().strip() if not c.isdigit())
+            phoneme_id = self._ids.get(base)
+            if phoneme_id is None:
+                phoneme_id = self._new_id(base, symbol)
+                if phoneme_id != self.unknown_id:
+                    self._ids[base] = phoneme_id
+            if len(self._ids) < self.MAX_ALIASES:
+                self._ids[symbol] = phoneme_id
+            return phoneme_id
+
+    def ids_of(self, symbols: Iterable[str]) -> array:
+        """Intern a sequence of symbols into a compact ID array"""
+        return array("H", [self.id_of(symbol) for symbol in symbols])
+
+    def id_of_ipa(self, ipa: str) -> int:
+        """
+        Get the ID of an IPA phone (e.g. from the lexicon or Allosaurus)
+
+        IPA symbols have their own namespace: "r" here is the trill, not
+        ARPABET "r". Phones outside AZURE_TO_IPA get a new ID (unknown_id
+        once the inventory is full).
+
+        Args:
+            ipa: IPA phone (e.g. "θ")
+        """
+        phoneme_id = self._ipa_ids.get(ipa)
+        if phoneme_id is not None:
+            return phoneme_id
+
+        with self._lock:
+            phoneme_id = self._ipa_ids.get(ipa)
+            if phoneme_id is None:
+                phoneme_id = self._new_id(ipa, ipa)
+                if len(self._ipa_ids) < self.MAX_ALIASES:
+                    self._ipa_ids[ipa] = phoneme_id
+            return phoneme_id
+
+    def ids_of_ipa(self, ipa: str) -> array:
+        """Intern space-separated IPA into a compact ID array"""
+        return array("H", [self.id_of_ipa(phone) for phone in ipa.split()])
+
+    def to_ipa(self, phoneme_ids: Iterable[int]) -> str:
+        """Space-separated IPA for a sequence of IDs"""
+        ipa = self.ipa
+        return " ".join([ipa[phoneme_id] for phoneme_id in phoneme_ids])
+
+
+# Global instance
+phoneme_inventory = PhonemeInventory(AZURE_TO_IPA)
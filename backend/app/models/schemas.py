@@ -1,6 +1,6 @@
 """Pydantic models for API request/response validation"""
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 from enum import Enum
 
 
@@ -13,7 +13,8 @@ class ItemType(str, Enum):
 
 class PronunciationScoreRequest(BaseModel):
     """Request model for pronunciation scoring"""
-    text: str = Field(..., description="Expected text to pronounce")
+    text: Optional[str] = Field(None, description="Expected text to pronounce")
+    exercise_id: Optional[str] = Field(None, description="Drill id (e.g. ex-1), in place of or alongside text")
     audio_data: str = Field(..., description="Base64-encoded audio data")
     item_type: str = Field(default="word", description="Type of item (word/phrase/sentence)")
     audio_format: str = Field(default="webm", description="Audio format (webm, wav, mp3)")
@@ -58,6 +59,16 @@ class PronunciationScoreResponse(BaseModel):
     message: str = "Pronunciation assessed successfully"
 
 
+class BatchScoreRequest(BaseModel):
+    """Request model for scoring several recordings at once"""
+    items: List[PronunciationScoreRequest] = Field(..., description="Recordings to score")
+    stream: bool = Field(default=False, description="Stream results as NDJSON instead of one JSON body")
+    order: Literal["input", "completion"] = Field(
+        default="input",
+        description="Streamed result order: input order or as each item finishes"
+    )
+
+
 class HealthResponse(BaseModel):
     """Health check response"""
     status: str
@@ -66,8 +77,46 @@ class HealthResponse(BaseModel):
     allosaurus_loaded: bool
 
 
+class LivenessResponse(BaseModel):
+    """Liveness probe response"""
+    status: str
+    uptime_seconds: float
+
+
+class ComponentStatus(BaseModel):
+    """Warm-up state of one backend"""
+    state: str = Field(..., description="cold, warming, ready, unavailable or disabled")
+    detail: Optional[str] = None
+    seconds: Optional[float] = Field(None, description="Time spent warming it up")
+
+
+class ReadinessResponse(BaseModel):
+    """Readiness probe response"""
+    status: str = Field(..., description="starting, warming, ready or degraded")
+    ready: bool
+    warmup: str = Field(..., description="STARTUP_WARMUP mode")
+    uptime_seconds: float
+    components: Dict[str, ComponentStatus]
+    startup_seconds: Dict[str, float] = Field(..., description="Duration of each startup phase")
+
+
 class ErrorResponse(BaseModel):
     """Error response model"""
     success: bool = False
     message: str
     detail: Optional[str] = None
+
+
+class BatchItemResult(BaseModel):
+    """Result for one item of a batch"""
+    index: int = Field(..., description="Position of the item in the request")
+    success: bool
+    result: Optional[PronunciationScoreResponse] = None
+    error: Optional[ErrorResponse] = None
+
+
+class BatchScoreResponse(BaseModel):
+    """Response model for batch scoring"""
+    results: List[BatchItemResult] = Field(default_factory=list, description="Results in input order")
+    succeeded: int
+    failed: int
@@ -0,0 +1,250 @@
+"""Content-addressed cache for pronunciation assessment results"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import orjson
+
+from app.core.config import settings
+from app.models.audio import AudioBuffer
+
+logger = logging.getLogger(__name__)
+
+
+class AssessmentCache:
+    """
+    LRU cache of successful assessments keyed by the decoded audio
+
+    Entries are keyed by a hash of the PCM, the reference text and the
+    assessment settings, so a retried recording or a double submit is
+    answered without another Azure call. The in-memory tier is bounded by
+    a byte budget and a TTL; an optional on-disk tier keeps results across
+    restarts. Concurrent requests for the same key share one computation.
+    Partial results (e.g. missing IPA because Allosaurus timed out) are
+    kept in memory only, for partial_ttl_seconds, so a later retry can
+    produce the complete result.
+
+    Results are held serialized (orjson), so every caller gets its own
+    copy and nothing a caller changes leaks into the cache or into other
+    callers' responses.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl_seconds: float,
+        disk_dir: Optional[str] = None,
+        partial_ttl_seconds: float = 0.0
+    ):
+        """
+        Args:
+            max_bytes: Memory budget for cached results (serialized size)
+            ttl_seconds: How long a result stays valid
+            disk_dir: Directory for the on-disk tier (None disables it)
+            partial_ttl_seconds: How long a partial result stays valid
+                (0 does not store them)
+        """
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.partial_ttl_seconds = partial_ttl_seconds
+        self.disk_dir = disk_dir
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Future"] = {}
+        self._bytes = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.partial = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(audio: AudioBuffer, reference_text: str, assessment_settings: str) -> str:
+        """
+        Build a cache key from the decoded audio and everything that affects scoring
+
+        Args:
+            audio: Decoded audio
+            reference_text: Expected text
+            assessment_settings: Fingerprint of the scoring configuration
+        """
+        digest = hashlib.sha256()
+        digest.update(audio.pcm)
+        digest.update(f"|{audio.sample_rate}|{reference_text.strip().lower()}|{assessment_settings}".encode("utf-8"))
+        return digest.hexdigest()
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        is_partial: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ) -> Dict[str, Any]:
+        """
+        Return the cached result for key, computing it at most once
+
+        Only successful results are stored. If the same key is already being
+        computed, the caller waits for that computation instead of starting
+        another one.
+
+        Args:
+            key: Cache key from make_key
+            compute: Coroutine factory producing the assessment result
+            is_partial: Tells results that should only be kept for
+                partial_ttl_seconds
+
+        Returns:
+            Assessment result (a deep copy the caller may modify)
+        """
+        cached = self._get_memory(key)
+        if cached is not None:
+            self.hits += 1
+            return orjson.loads(cached)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return orjson.loads(await asyncio.shield(inflight))
+
+        # Run as a separate task so a disconnecting caller does not cancel
+        # the work other callers are waiting on
+        task = asyncio.ensure_future(self._load_or_compute(key, compute, is_partial))
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return orjson.loads(await asyncio.shield(task))
+
+    def _finish(self, key: str, task: "asyncio.Future") -> None:
+        self._inflight.pop(key, None)
+        # Retrieve the error even if every caller stopped waiting
+        if not task.cancelled():
+            task.exception()
+
+    async def _load_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        is_partial: Optional[Callable[[Dict[str, Any]], bool]]
+    ) -> bytes:
+        """Serialized result, from the disk tier or a fresh computation"""
+        if self.disk_dir:
+            loop = asyncio.get_running_loop()
+            stored = await loop.run_in_executor(None, self._read_disk, key)
+            if stored is not None:
+                self.disk_hits += 1
+                self._put_memory(key, stored)
+                return stored
+
+        self.misses += 1
+        result = await compute()
+        encoded = orjson.dumps(result, default=str, option=orjson.OPT_SERIALIZE_NUMPY)
+
+        if not result.get("success", False):
+            return encoded
+        if is_partial is not None and is_partial(result):
+            self.partial += 1
+            if self.partial_ttl_seconds > 0:
+                self._put_memory(key, encoded, self.partial_ttl_seconds)
+        else:
+            self._put_memory(key, encoded)
+            if self.disk_dir:
+                loop = asyncio.get_running_loop()
+                loop.run_in_executor(None, self._write_disk, key, encoded)
+
+        return encoded
+
+    def _get_memory(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, encoded = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self._bytes -= len(encoded)
+            return None
+
+        self._entries.move_to_end(key)
+        return encoded
+
+    def _put_memory(self, key: str, encoded: bytes, ttl_seconds: Optional[float] = None) -> None:
+        if len(encoded) > self.max_bytes:
+            return
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old[1])
+
+        if ttl_seconds is None:
+            ttl_seconds = self.ttl_seconds
+        self._entries[key] = (time.monotonic() + ttl_seconds, encoded)
+        self._bytes += len(encoded)
+
+        while self._bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        path = self._disk_path(key)
+        try:
+            if os.path.getmtime(path) + self.ttl_seconds < time.time():
+                os.unlink(path)
+                return None
+            with open(path, "rb") as f:
+                encoded = f.read()
+            # Validate before the entry is served from memory
+            orjson.loads(encoded)
+            return encoded
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache entry {path}: {str(e)}")
+            return None
+
+    def _write_disk(self, key: str, encoded: bytes) -> None:
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so readers never see a partial file
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(encoded)
+            os.replace(temp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to write cache entry {path}: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.disk_hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "partial": self.partial,
+            "hit_rate": round((lookups - self.misses) / lookups, 4) if lookups else 0.0,
+            "inflight": len(self._inflight)
+        }
+
+
+# Global instance
+assessment_cache = AssessmentCache(
+    max_bytes=settings.ASSESSMENT_CACHE_MAX_BYTES,
+    ttl_seconds=settings.ASSESSMENT_CACHE_TTL_SECONDS,
+    disk_dir=settings.ASSESSMENT_CACHE_DIR or None,
+    partial_ttl_seconds=settings.ASSESSMENT_CACHE_PARTIAL_TTL_SECONDS
+)
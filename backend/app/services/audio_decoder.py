@@ -0,0 +1,220 @@
+"""In-memory audio decoding to 16kHz mono PCM"""
+import asyncio
+import logging
+import shutil
+import subprocess
+import threading
+from typing import Optional, Union
+
+from app.core.config import settings
+from app.core.executor import StageTimeout, stage_executor
+from app.core.metrics import metrics
+from app.models.audio import AudioBuffer
+from app.utils.audio_formats import WavError, parse_wav, sniff_container, wav_to_pcm16
+
+logger = logging.getLogger(__name__)
+
+# Format expected by Azure and Allosaurus
+SAMPLE_RATE = 16000
+CHANNELS = 1
+SAMPLE_WIDTH = 2  # bytes (16-bit)
+
+
+class AudioDecodeError(Exception):
+    """Raised when uploaded audio cannot be decoded"""
+
+
+class AudioDecoder:
+    """
+    Decodes uploaded audio to a 16kHz mono 16-bit PCM AudioBuffer
+
+    The container is sniffed from the upload's magic bytes; the declared
+    format only names headerless "pcm" uploads (16kHz mono 16-bit) and
+    labels errors. PCM and float WAV files are converted in process
+    (app.utils.audio_formats), 16kHz mono 16-bit ones without any
+    conversion. Everything else is streamed through ffmpeg's stdin/stdout
+    pipes, so nothing is written to disk. ffmpeg is located once (see
+    probe) and the number of concurrent ffmpeg processes is capped.
+    """
+
+    def __init__(self, max_concurrent: int, timeout: float):
+        """
+        Args:
+            max_concurrent: Maximum number of ffmpeg processes running at once
+            timeout: Seconds allowed for a single decode
+        """
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        self.ffmpeg_path: Optional[str] = None
+        self.ffmpeg_available = False
+        self._probed = False
+        self._probe_lock = threading.Lock()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def probe(self) -> bool:
+        """
+        Locate ffmpeg and check that it runs (done once, at startup)
+
+        Blocks (runs ffmpeg -version, or waits for another thread's probe);
+        async code uses probe_async.
+
+        Returns:
+            True if ffmpeg is available
+        """
+        if self._probed:
+            return self.ffmpeg_available
+        # The startup warm-up probes on its own thread while requests may
+        # already arrive; they wait for its answer instead of reading a
+        # half-finished probe
+        with self._probe_lock:
+            if not self._probed:
+                self.ffmpeg_available = self._find_ffmpeg()
+                self._probed = True
+        return self.ffmpeg_available
+
+    async def probe_async(self) -> bool:
+        """probe() without blocking the event loop when ffmpeg has not been probed yet"""
+        if self._probed:
+            return self.ffmpeg_available
+        return await asyncio.get_running_loop().run_in_executor(None, self.probe)
+
+    def _find_ffmpeg(self) -> bool:
+        path = shutil.which("ffmpeg")
+        if not path:
+            logger.error("ffmpeg command not found in system PATH")
+            return False
+
+        try:
+            result = subprocess.run(
+                [path, "-version"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                timeout=5
+            )
+        except Exception as e:
+            logger.error(f"Error checking ffmpeg: {str(e)}")
+            return False
+
+        if result.returncode != 0:
+            logger.error("ffmpeg not found or not working")
+            return False
+
+        self.ffmpeg_path = path
+        version = result.stdout.decode(errors="replace").split("\n", 1)[0]
+        logger.info(f"Using {version} at {path}")
+        return True
+
+    async def decode(self, audio_data: Union[bytes, bytearray], audio_format: str) -> AudioBuffer:
+        """
+        Decode audio to 16kHz mono 16-bit PCM
+
+        Args:
+            audio_data: Uploaded audio bytes
+            audio_format: Audio format declared by the client (wav, webm,
+                mp3, pcm); the sniffed container takes precedence
+
+        Returns:
+            Decoded audio buffer
+
+        Raises:
+            AudioDecodeError: If the audio could not be decoded
+            WorkerPoolSaturated: If a WAV needs converting and the stage
+                worker pool is full
+        """
+        container = sniff_container(audio_data, frame_sync=audio_format != "pcm")
+        if container is not None and container != audio_format:
+            logger.debug("Upload declared as %s is %s", audio_format, container)
+
+        if container is None and audio_format == "pcm":
+            metrics.audio_decodes.inc("pcm", "passthrough")
+            whole_samples = len(audio_data) - len(audio_data) % SAMPLE_WIDTH
+            return AudioBuffer(pcm=bytes(audio_data[:whole_samples]), sample_rate=SAMPLE_RATE)
+
+        if container == "wav":
+            try:
+                wav = parse_wav(audio_data)
+            except WavError as e:
+                # RF64, compressed codecs in a WAV (ADPCM, mu-law) and damaged headers
+                logger.debug("Decoding WAV with ffmpeg: %s", e)
+            else:
+                if wav.frame_count == 0:
+                    raise AudioDecodeError(f"WAV file has no audio ({len(audio_data)} bytes in)")
+                if wav.is_pcm16(SAMPLE_RATE, CHANNELS):
+                    metrics.audio_decodes.inc("wav", "passthrough")
+                    pcm_data = wav_to_pcm16(audio_data, wav, SAMPLE_RATE)
+                else:
+                    # Resampling 44.1kHz stereo costs ~1ms per second of audio: off the
+                    # event loop, on the bounded pool shared with the other CPU stages
+                    metrics.audio_decodes.inc("wav", "numpy")
+                    try:
+                        pcm_data = await stage_executor.run(
+                            "decode", wav_to_pcm16, audio_data, wav, SAMPLE_RATE, timeout=self.timeout
+                        )
+                    except StageTimeout:
+                        raise AudioDecodeError(f"Decoding wav timed out after {self.timeout:.0f}s")
+                logger.debug("Decoded %r in process", wav)
+                return AudioBuffer(pcm=pcm_data, sample_rate=SAMPLE_RATE)
+
+        metrics.audio_decodes.inc(container or "unknown", "ffmpeg")
+        pcm_data = await self._decode_with_ffmpeg(audio_data, container or audio_format)
+        return AudioBuffer(pcm=pcm_data, sample_rate=SAMPLE_RATE)
+
+    async def _decode_with_ffmpeg(self, audio_data: bytes, audio_format: str) -> bytes:
+        """Pipe audio through ffmpeg and collect PCM from its stdout"""
+        if not await self.probe_async():
+            raise AudioDecodeError(f"Cannot decode {audio_format}: ffmpeg is not available")
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        cmd = [
+            self.ffmpeg_path,
+            "-hide_banner",
+            "-loglevel", "error",
+            "-i", "pipe:0",
+            "-vn",
+            "-ar", str(SAMPLE_RATE),   # Sample rate: 16kHz
+            "-ac", str(CHANNELS),      # Channels: mono
+            "-f", "s16le",             # Raw 16-bit little-endian PCM
+            "pipe:1"
+        ]
+
+        async with self._semaphore:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(
+                    process.communicate(input=audio_data),
+                    timeout=self.timeout
+                )
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                raise AudioDecodeError(f"Decoding {audio_format} timed out after {self.timeout:.0f}s")
+            except BaseException:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                raise
+
+        if process.returncode != 0:
+            stderr_output = stderr.decode(errors="replace").strip() if stderr else "No stderr output"
+            logger.error(f"ffmpeg decoding failed (returncode={process.returncode}): {stderr_output}")
+            raise AudioDecodeError(f"Failed to decode {audio_format} audio: {stderr_output}")
+
+        if not stdout:
+            raise AudioDecodeError(f"Decoding {audio_format} produced no audio ({len(audio_data)} bytes in)")
+
+        logger.debug("Decoded %s (%d bytes) to %d bytes of PCM", audio_format, len(audio_data), len(stdout))
+        return stdout
+
+
+# Global instance
+audio_decoder = AudioDecoder(
+    max_concurrent=settings.DECODE_MAX_CONCURRENT,
+    timeout=settings.TRANSCODE_TIMEOUT_SECONDS
+)
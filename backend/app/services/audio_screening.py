@@ -0,0 +1,196 @@
+"""Energy-based pre-screening of decoded audio before assessment"""
+import logging
+from typing import Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.audio import AudioBuffer
+
+logger = logging.getLogger(__name__)
+
+# Full scale of 16-bit PCM, and the level counted as clipped
+FULL_SCALE = 32768.0
+CLIP_LEVEL = 32767
+
+# Added to frame energies before the logarithm (all-zero frames)
+ENERGY_EPSILON = 1e-10
+
+
+class ScreeningResult:
+    """Outcome of screening one recording"""
+
+    __slots__ = ("audio", "rejected", "message", "detail", "speech_seconds", "rms_dbfs", "clipped_ratio")
+
+    def __init__(
+        self,
+        audio: AudioBuffer,
+        rejected: Optional[str] = None,
+        message: str = "",
+        detail: str = "",
+        speech_seconds: float = 0.0,
+        rms_dbfs: float = -np.inf,
+        clipped_ratio: float = 0.0
+    ):
+        """
+        Args:
+            audio: The speech span (the whole input if nothing was trimmed)
+            rejected: Reason label (no_speech, clipped) if the recording
+                should not be assessed
+            message: User-facing reason for the rejection
+            detail: Measured levels behind the rejection
+            speech_seconds: Duration of the frames detected as speech
+            rms_dbfs: RMS level of the speech span
+            clipped_ratio: Share of samples in the speech span at full scale
+        """
+        self.audio = audio
+        self.rejected = rejected
+        self.message = message
+        self.detail = detail
+        self.speech_seconds = speech_seconds
+        self.rms_dbfs = rms_dbfs
+        self.clipped_ratio = clipped_ratio
+
+
+class AudioScreener:
+    """
+    Finds the speech in a recording from per-frame energy
+
+    A frame counts as speech when its level is above the noise floor
+    (a low percentile of all frames) by snr_db, and in any case above
+    speech_dbfs. Frames within snr_db * 2 of the loudest frame always
+    count, so a recording that is speech throughout is kept whole. A
+    recording whose loudest frame is less than snr_db above the noise
+    floor (steady noise or hum, nothing standing out) has no speech.
+
+    Leading and trailing silence is trimmed, keeping pad_ms around the
+    speech so soft onsets and final consonants survive; pauses inside
+    the speech are left alone. Recordings with less than min_speech_ms of
+    speech, or whose speech is more than max_clipped_ratio clipped, are
+    rejected before any recognizer sees them.
+    """
+
+    def __init__(
+        self,
+        frame_ms: float = 20.0,
+        speech_dbfs: float = -50.0,
+        snr_db: float = 12.0,
+        noise_percentile: float = 10.0,
+        min_speech_ms: float = 100.0,
+        pad_ms: float = 250.0,
+        max_clipped_ratio: float = 0.05
+    ):
+        """
+        Args:
+            frame_ms: Analysis frame length
+            speech_dbfs: Frames quieter than this are never speech
+            snr_db: Margin above the noise floor for a speech frame
+            noise_percentile: Percentile of frame levels taken as the noise floor
+            min_speech_ms: Least speech for a recording to be assessed
+            pad_ms: Audio kept before the first and after the last speech frame
+            max_clipped_ratio: Largest share of full-scale samples in the
+                speech span (1 disables the check)
+        """
+        self.frame_ms = frame_ms
+        self.speech_dbfs = speech_dbfs
+        self.snr_db = snr_db
+        self.noise_percentile = noise_percentile
+        self.min_speech_ms = min_speech_ms
+        self.pad_ms = pad_ms
+        self.max_clipped_ratio = max_clipped_ratio
+
+    def screen(self, audio: AudioBuffer) -> ScreeningResult:
+        """
+        Detect, measure and cut out the speech in a recording
+
+        Args:
+            audio: Decoded mono 16-bit PCM
+
+        Returns:
+            ScreeningResult; result.audio is a trimmed copy, or audio itself
+            when there is nothing to trim
+        """
+        samples = np.frombuffer(audio.pcm, dtype=np.int16)
+        frame_length = max(1, int(audio.sample_rate * self.frame_ms / 1000))
+        frame_count = len(samples) // frame_length
+        if frame_count == 0:
+            return self._reject(audio, "no_speech", "No speech detected in the recording", f"Only {len(samples)} samples of audio")
+
+        # Mean square per frame (float32: int16 squares would overflow)
+        frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length).astype(np.float32)
+        levels = 10 * np.log10(np.mean(frames * frames, axis=1) / (FULL_SCALE * FULL_SCALE) + ENERGY_EPSILON)
+
+        peak = float(levels.max())
+        noise_floor = float(np.percentile(levels, self.noise_percentile))
+        if peak - noise_floor < self.snr_db:
+            # The threshold below would sink under the floor and accept every frame
+            return self._reject(
+                audio,
+                "no_speech",
+                "No speech detected in the recording",
+                f"Loudest frame {peak:.1f} dBFS is only {peak - noise_floor:.1f} dB "
+                f"above the noise floor ({noise_floor:.1f} dBFS)"
+            )
+        threshold = max(self.speech_dbfs, min(noise_floor + self.snr_db, peak - 2 * self.snr_db))
+        speech = np.flatnonzero(levels >= threshold)
+        speech_seconds = len(speech) * frame_length / audio.sample_rate
+
+        if speech_seconds * 1000 < self.min_speech_ms:
+            return self._reject(
+                audio,
+                "no_speech",
+                "No speech detected in the recording",
+                f"Loudest frame {peak:.1f} dBFS, noise floor {noise_floor:.1f} dBFS, "
+                f"{speech_seconds * 1000:.0f}ms above {threshold:.1f} dBFS"
+            )
+
+        pad = int(audio.sample_rate * self.pad_ms / 1000)
+        start = max(0, int(speech[0]) * frame_length - pad)
+        end = min(len(samples), (int(speech[-1]) + 1) * frame_length + pad)
+        span = samples[start:end]
+
+        rms_dbfs = float(10 * np.log10(np.mean(np.square(span, dtype=np.float32)) / (FULL_SCALE * FULL_SCALE) + ENERGY_EPSILON))
+        clipped_ratio = float(np.count_nonzero((span >= CLIP_LEVEL) | (span <= -CLIP_LEVEL)) / len(span))
+        if clipped_ratio > self.max_clipped_ratio:
+            return self._reject(
+                audio,
+                "clipped",
+                "The recording is too loud (clipped); move further from the microphone",
+                f"{clipped_ratio:.1%} of samples at full scale",
+                speech_seconds=speech_seconds,
+                rms_dbfs=rms_dbfs,
+                clipped_ratio=clipped_ratio
+            )
+
+        trimmed = audio
+        if start > 0 or end < len(samples):
+            trimmed = AudioBuffer(pcm=audio.pcm[start * 2:end * 2], sample_rate=audio.sample_rate)
+            metrics.audio_trimmed_seconds.inc(amount=audio.duration - trimmed.duration)
+
+        logger.debug(
+            "Screened %.2fs of audio: speech %.2fs, kept %.2fs, rms %.1f dBFS, clipped %.2f%%",
+            audio.duration, speech_seconds, trimmed.duration, rms_dbfs, clipped_ratio * 100
+        )
+        return ScreeningResult(
+            trimmed,
+            speech_seconds=speech_seconds,
+            rms_dbfs=rms_dbfs,
+            clipped_ratio=clipped_ratio
+        )
+
+    def _reject(self, audio: AudioBuffer, reason: str, message: str, detail: str, **measurements: float) -> ScreeningResult:
+        metrics.audio_rejected.inc(reason)
+        logger.info("Rejecting %.2fs of audio (%s): %s", audio.duration, reason, detail)
+        return ScreeningResult(audio, rejected=reason, message=message, detail=detail, **measurements)
+
+
+# Global instance
+audio_screener = AudioScreener(
+    frame_ms=settings.AUDIO_SCREEN_FRAME_MS,
+    speech_dbfs=settings.AUDIO_SCREEN_SPEECH_DBFS,
+    snr_db=settings.AUDIO_SCREEN_SNR_DB,
+    min_speech_ms=settings.AUDIO_SCREEN_MIN_SPEECH_MS,
+    pad_ms=settings.AUDIO_SCREEN_PAD_MS,
+    max_clipped_ratio=settings.AUDIO_SCREEN_MAX_CLIPPED_RATIO
+)
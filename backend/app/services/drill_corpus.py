@@ -0,0 +1,340 @@
+"""
+Precompiled drill corpus
+
+Every exercise the frontend can send is defined in
+speaksharp-nextjs/frontend/lib/drillsData.ts (LEARNING_PATH). A build step
+compiles it into app/data/drills.json with everything the backend would
+otherwise derive from the text on each request: the words, their expected
+phoneme IDs, the reference IPA and the assessment settings for the
+exercise. The API loads the artifact once at startup; requests that name
+an exercise_id reuse it instead of processing the text.
+
+The artifact is committed because the backend image is built without the
+frontend sources. Regenerate it after editing the drills:
+
+    python -m app.services.drill_corpus build
+
+Phoneme IDs in the file index its own "phones" table and are mapped to the
+running PhonemeInventory on load, so the file does not depend on the order
+in which symbols were interned.
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.models.phonemes import phoneme_inventory
+from app.utils.phoneme_mapper import WORD_PATTERN, get_expected_ipa, get_expected_ipa_variants
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_SOURCE_PATH = os.path.join(
+    os.path.dirname(BACKEND_DIR), "speaksharp-nextjs", "frontend", "lib", "drillsData.ts"
+)
+DEFAULT_CORPUS_PATH = os.path.join(BACKEND_DIR, "app", "data", "drills.json")
+
+VERSION = 1
+
+# One exercise object literal: { id: 'ex-1', type: 'repeat', word: 'think', ... }
+EXERCISE_PATTERN = re.compile(r"\{\s*id:\s*'[^']*'[^{}]*\bword:\s*'[^{}]*\}")
+FIELD_PATTERN = re.compile(r"(\w+):\s*'((?:[^'\\]|\\.)*)'")
+# Enclosing unit/skill/lesson ids, in source order
+CONTAINER_PATTERN = re.compile(r"\bid:\s*'((?:unit|skill|lesson)-[^']*)'")
+
+# Exercise types scored as running speech (word omissions and insertions count)
+MISCUE_TYPES = frozenset(("sentence",))
+
+
+class DrillCorpusError(Exception):
+    """Raised when the drill corpus is missing or malformed"""
+    pass
+
+
+class Drill:
+    """One precompiled exercise"""
+
+    __slots__ = (
+        "exercise_id", "exercise_type", "difficulty", "text", "ipa",
+        "expected_ipa", "expected_phonemes", "enable_miscue", "lesson_id"
+    )
+
+    def __init__(
+        self,
+        exercise_id: str,
+        exercise_type: str,
+        difficulty: str,
+        text: str,
+        ipa: str,
+        expected_ipa: Optional[str],
+        expected_phonemes: Dict[str, Tuple[int, ...]],
+        enable_miscue: bool,
+        lesson_id: Optional[str] = None
+    ):
+        """
+        Args:
+            exercise_id: Exercise id from drillsData.ts (e.g. "ex-1")
+            exercise_type: repeat, minimal_pair, sentence or listen_choose
+            difficulty: easy, medium or hard
+            text: Reference text (the exercise's word or sentence)
+            ipa: IPA as authored in the drill
+            expected_ipa: Space-separated expected IPA of the whole text
+            expected_phonemes: Lowercase word -> expected phoneme IDs
+            enable_miscue: Whether Azure scores omitted and inserted words
+            lesson_id: Enclosing lesson
+        """
+        self.exercise_id = exercise_id
+        self.exercise_type = exercise_type
+        self.difficulty = difficulty
+        self.text = text
+        self.ipa = ipa
+        self.expected_ipa = expected_ipa
+        self.expected_phonemes = expected_phonemes
+        self.enable_miscue = enable_miscue
+        self.lesson_id = lesson_id
+
+
+class DrillCorpus:
+    """Exercise id -> Drill lookup over the compiled corpus file"""
+
+    def __init__(self, path: str = DEFAULT_CORPUS_PATH):
+        """
+        Args:
+            path: Compiled corpus (JSON)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._drills: Optional[Dict[str, Drill]] = None
+
+    def load(self) -> int:
+        """
+        Read the corpus (once)
+
+        Returns:
+            Number of exercises
+
+        Raises:
+            DrillCorpusError: If the file is missing or malformed
+        """
+        if self._drills is not None:
+            return len(self._drills)
+        with self._lock:
+            if self._drills is None:
+                self._drills = self._read()
+                logger.info(f"Loaded drill corpus {self.path} ({len(self._drills)} exercises)")
+            return len(self._drills)
+
+    def _read(self) -> Dict[str, Drill]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise DrillCorpusError(f"Cannot read drill corpus {self.path}: {str(e)}")
+        if data.get("version") != VERSION:
+            raise DrillCorpusError(f"{self.path} is not a version {VERSION} drill corpus")
+
+        phone_ids = [phoneme_inventory.id_of_ipa(phone) for phone in data["phones"]]
+        drills = {}
+        for exercise in data["exercises"]:
+            drills[exercise["id"]] = Drill(
+                exercise_id=exercise["id"],
+                exercise_type=exercise["type"],
+                difficulty=exercise["difficulty"],
+                text=exercise["text"],
+                ipa=exercise["ipa"],
+                expected_ipa=exercise["expected_ipa"],
+                expected_phonemes={
+                    word: tuple(phone_ids[index] for index in ids)
+                    for word, ids in exercise["words"]
+                },
+                enable_miscue=exercise["assessment"]["enable_miscue"],
+                lesson_id=exercise.get("lesson")
+            )
+        return drills
+
+    def get(self, exercise_id: str) -> Optional[Drill]:
+        """
+        Get an exercise by id
+
+        Returns:
+            The Drill, or None if the id is unknown or the corpus is unavailable
+        """
+        try:
+            self.load()
+        except DrillCorpusError as e:
+            logger.error(f"Drill corpus unavailable: {str(e)}")
+            return None
+        return self._drills.get(exercise_id)
+
+    def __len__(self) -> int:
+        return len(self._drills) if self._drills is not None else 0
+
+
+def resolve_reference(text: Optional[str], exercise_id: Optional[str]) -> Tuple[str, Optional[Drill]]:
+    """
+    Resolve a request's reference text and drill
+
+    Args:
+        text: Reference text from the request, if any
+        exercise_id: Drill id from the request, if any
+
+    Returns:
+        Tuple of (reference text, Drill or None)
+
+    Raises:
+        ValueError: If neither is given, the exercise is unknown and there
+            is no text to fall back on, or text does not match the exercise
+    """
+    if not exercise_id:
+        if not text or not text.strip():
+            raise ValueError("Provide text or exercise_id")
+        return text, None
+
+    drill = drill_corpus.get(exercise_id)
+    if drill is None:
+        if text and text.strip():
+            # Unknown to this build (e.g. a newer frontend): score the text as usual
+            logger.warning(f"Unknown exercise_id '{exercise_id}', using the request text")
+            return text, None
+        raise ValueError(f"Unknown exercise_id '{exercise_id}'")
+
+    if text and _word_key(text) != _word_key(drill.text):
+        raise ValueError(f"Text does not match exercise '{exercise_id}'")
+    return drill.text, drill
+
+
+def _word_key(text: str) -> str:
+    return " ".join(WORD_PATTERN.findall(text)).lower()
+
+
+def parse_drills_source(source_path: str) -> List[Dict[str, str]]:
+    """
+    Extract the exercises from drillsData.ts
+
+    Exercises are the single-line object literals with an id and a word;
+    each gets the id of the lesson it appears in.
+
+    Returns:
+        One dict of the exercise's string fields per exercise, in source order
+    """
+    with open(source_path, "r", encoding="utf-8") as f:
+        source = f.read()
+
+    containers = [(match.start(), match.group(1)) for match in CONTAINER_PATTERN.finditer(source)]
+    exercises = []
+    for match in EXERCISE_PATTERN.finditer(source):
+        fields = {key: value.replace("\\'", "'") for key, value in FIELD_PATTERN.findall(match.group(0))}
+        lessons = [name for start, name in containers if start < match.start() and name.startswith("lesson-")]
+        if lessons:
+            fields["lesson"] = lessons[-1]
+        exercises.append(fields)
+    return exercises
+
+
+def build_drill_corpus(source_path: str, output_path: str) -> int:
+    """
+    Compile drillsData.ts into the corpus file
+
+    Expected pronunciations come from the same lookup the API uses
+    (curated words, lexicon, spelling estimate). The file is written next
+    to output_path and renamed into place.
+
+    Returns:
+        Number of exercises written
+    """
+    exercises = parse_drills_source(source_path)
+    phones: List[str] = []
+    phone_index: Dict[str, int] = {}
+    compiled: List[Dict[str, Any]] = []
+    seen = set()
+
+    for exercise in exercises:
+        exercise_id = exercise["id"]
+        if exercise_id in seen:
+            raise DrillCorpusError(f"Duplicate exercise id {exercise_id} in {source_path}")
+        seen.add(exercise_id)
+
+        text = exercise["word"]
+        text_words = WORD_PATTERN.findall(text)
+        words = []
+        ipa_parts = []
+        for word in text_words:
+            key = word.lower()
+            ipa = get_expected_ipa(key, estimate=True)
+            if len(text_words) == 1:
+                ipa = _authored_variant(key, exercise.get("ipa", "")) or ipa
+            if not ipa:
+                continue
+            ipa_parts.append(ipa)
+            if any(key == existing for existing, _ in words):
+                continue
+            ids = []
+            for phone in ipa.split():
+                if phone not in phone_index:
+                    phone_index[phone] = len(phones)
+                    phones.append(phone)
+                ids.append(phone_index[phone])
+            words.append((key, ids))
+
+        compiled.append({
+            "id": exercise_id,
+            "type": exercise.get("type", "repeat"),
+            "difficulty": exercise.get("difficulty", "easy"),
+            "lesson": exercise.get("lesson"),
+            "text": text,
+            "ipa": exercise.get("ipa", ""),
+            "expected_ipa": " ".join(ipa_parts) or None,
+            "words": words,
+            "assessment": {"enable_miscue": exercise.get("type") in MISCUE_TYPES}
+        })
+
+    # One exercise per line keeps diffs of the committed file readable
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write("{\n")
+        f.write(f' "version": {VERSION},\n')
+        f.write(f' "source": {json.dumps(os.path.relpath(source_path, os.path.dirname(BACKEND_DIR)))},\n')
+        f.write(f' "phones": {json.dumps(phones, ensure_ascii=False)},\n')
+        f.write(' "exercises": [\n')
+        f.write(",\n".join(f"  {json.dumps(exercise, ensure_ascii=False)}" for exercise in compiled))
+        f.write("\n ]\n}\n")
+    os.replace(temp_path, output_path)
+    return len(compiled)
+
+
+def _authored_variant(word: str, authored_ipa: str) -> Optional[str]:
+    """
+    Pick the dictionary pronunciation the drill author meant
+
+    Words like "read" and "lead" have several; the one whose phones match
+    the drill's IPA (ignoring spacing and length marks) wins.
+    """
+    authored = authored_ipa.replace("ː", "").replace(" ", "")
+    for variant in get_expected_ipa_variants(word):
+        if variant.replace(" ", "") == authored:
+            return variant
+    return None
+
+
+# Global instance
+drill_corpus = DrillCorpus(settings.DRILL_CORPUS_PATH or DEFAULT_CORPUS_PATH)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Drill corpus tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="Compile drillsData.ts")
+    build.add_argument("--source", default=DEFAULT_SOURCE_PATH, help="drillsData.ts path")
+    build.add_argument("--output", default=DEFAULT_CORPUS_PATH, help="Compiled corpus path")
+    args = parser.parse_args()
+
+    count = build_drill_corpus(args.source, args.output)
+    print(f"Wrote {args.output}: {count} exercises")
+
+
+if __name__ == "__main__":
+    main()
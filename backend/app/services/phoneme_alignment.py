@@ -0,0 +1,410 @@
+"""
+Expected-vs-actual phoneme alignment for error detection
+
+Each word's expected phonemes (lexicon, then spelling estimate) are aligned
+with the phonemes that were assessed or recognized using a weighted edit
+distance over interned phoneme IDs. Substituting a phone for a similar one
+(same manner of articulation, or a near-equivalent like ə/ʌ) costs less
+than an unrelated one, so the cheapest alignment pairs up the sounds a
+learner actually confused.
+
+All words of a result are aligned in one batch: the DP tables of every
+pair are stacked into one array and filled one expected phoneme (row) at
+a time, vectorized across words and columns. Within a row the insertion
+chain D[i, j] = min(D[i, j - 1] + ins, ...) is resolved with a running
+minimum, so no Python loop runs over columns or words. A whole-transcript
+alignment (paragraphs from Allosaurus) only fills a band around the
+diagonal. The backtrace is Python but only visits len(expected) +
+len(actual) cells per word.
+"""
+import logging
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.assessment import WordResult, classify_phoneme_error
+from app.models.phonemes import phoneme_inventory
+from app.utils.phoneme_mapper import WORD_PATTERN, get_expected_ipa
+
+logger = logging.getLogger(__name__)
+
+INSERTION_COST = 1.0
+DELETION_COST = 1.0
+# Diagonal steps at or below this cost count as a match, not a substitution
+MATCH_COST = 0.25
+NEAR_COST = 0.25
+SAME_CLASS_COST = 0.6
+SUBSTITUTION_COST = 1.0
+# Half-width (in phones) of the diagonal band for whole-transcript alignment
+ALIGNMENT_BAND = 48
+
+# Manner classes (IPA, including symbols Allosaurus emits outside AZURE_TO_IPA)
+PHONE_CLASSES: Dict[str, Tuple[str, ...]] = {
+    "vowel": ("ɑ", "æ", "ʌ", "ɔ", "aʊ", "ə", "aɪ", "ɛ", "ɜ", "eɪ", "ɪ", "i", "oʊ", "ɔɪ", "ʊ", "u", "ɚ",
+              "ɛr", "ɪr", "ɔr", "ʊr", "a", "e", "o", "ɒ", "ɐ", "ɨ", "y"),
+    "stop": ("p", "b", "t", "d", "k", "ɡ", "g", "ʔ", "ɾ"),
+    "fricative": ("f", "v", "θ", "ð", "s", "z", "ʃ", "ʒ", "h", "x"),
+    "affricate": ("tʃ", "dʒ"),
+    "nasal": ("m", "n", "ŋ"),
+    "approximant": ("l", "ɹ", "r", "w", "j"),
+}
+
+# Pairs that are accent or transcription variants rather than errors
+NEAR_PAIRS: Tuple[Tuple[str, str], ...] = (
+    ("ə", "ʌ"), ("ɚ", "ɜ"), ("ɑ", "ɔ"), ("ɑ", "a"), ("ɹ", "r"), ("ɡ", "g"),
+    ("oʊ", "o"), ("eɪ", "e"), ("t", "ɾ"), ("d", "ɾ"),
+)
+
+CONSONANT_CLASSES = ("stop", "fricative", "affricate", "nasal", "approximant")
+
+# Recognized phones that count as the learner's version of a target sound
+TH_PHONES = frozenset(("θ", "ð"))
+R_L_PHONES = frozenset(("ɹ", "r", "l"))
+V_W_PHONES = frozenset(("v", "w"))
+V_W_SUBSTITUTES = frozenset(("v", "w", "b", "f"))
+
+
+class AlignmentOp(NamedTuple):
+    """
+    One step of an alignment
+
+    op is "match", "sub", "del" (expected phone not pronounced) or "ins"
+    (extra phone); expected and actual are indices into the two sequences,
+    -1 where the step has no phone on that side.
+    """
+    op: str
+    expected: int
+    actual: int
+
+
+class PhonemeAligner:
+    """Weighted edit-distance alignment over interned phoneme IDs"""
+
+    def __init__(self):
+        """Initialize aligner (the cost matrix is built on first use)"""
+        self._costs: Optional[np.ndarray] = None
+        self._phone_class: Dict[str, str] = {
+            phone: name for name, phones in PHONE_CLASSES.items() for phone in phones
+        }
+        self._near = {frozenset(pair) for pair in NEAR_PAIRS}
+
+    def _substitution_cost(self, a: str, b: str) -> float:
+        if a == b:
+            return 0.0
+        if frozenset((a, b)) in self._near:
+            return NEAR_COST
+        class_a = self._phone_class.get(a)
+        if class_a is not None and class_a == self._phone_class.get(b):
+            return SAME_CLASS_COST
+        return SUBSTITUTION_COST
+
+    def _cost_matrix(self) -> np.ndarray:
+        """
+        Substitution costs between every pair of IDs, plus a padding row/column
+
+        Extended when the inventory has grown (a new symbol was interned):
+        only the new rows and columns are computed.
+        """
+        previous = self._costs
+        size = len(phoneme_inventory)
+        if previous is not None and previous.shape[0] == size + 1:
+            return previous
+
+        ipa = phoneme_inventory.ipa[:size]
+        known = previous.shape[0] - 1 if previous is not None else 0
+        costs = np.full((size + 1, size + 1), SUBSTITUTION_COST, dtype=np.float32)
+        if previous is not None:
+            costs[:known, :known] = previous[:known, :known]
+        for row in range(known, size):
+            for column, b in enumerate(ipa):
+                costs[row, column] = costs[column, row] = self._substitution_cost(ipa[row], b)
+        # Phonemes past the inventory's cap share one ID; two of them may differ
+        unknown = phoneme_inventory.unknown_id
+        costs[unknown, unknown] = SUBSTITUTION_COST
+        self._costs = costs
+        return costs
+
+    def align(
+        self,
+        expected: Sequence[int],
+        actual: Sequence[int],
+        band: Optional[int] = ALIGNMENT_BAND
+    ) -> List[AlignmentOp]:
+        """
+        Align one pair of phoneme ID sequences
+
+        Args:
+            expected: Expected phoneme IDs
+            actual: Pronounced or recognized phoneme IDs
+            band: Only consider alignments within this many phones of the
+                diagonal (None for the full table)
+
+        Returns:
+            Alignment steps in order
+        """
+        return self.align_batch([(expected, actual)], band=band)[0]
+
+    def align_batch(
+        self,
+        pairs: Sequence[Tuple[Sequence[int], Sequence[int]]],
+        band: Optional[int] = None
+    ) -> List[List[AlignmentOp]]:
+        """
+        Align many (expected, actual) pairs at once
+
+        Args:
+            pairs: Phoneme ID sequences, e.g. one pair per word
+            band: Only fill cells within this many columns of the diagonal of
+                the largest pair (None for the full table). Keeps long
+                transcripts linear in their length; pairs in a banded batch
+                should have similar lengths.
+
+        Returns:
+            One list of alignment steps per pair, in order
+        """
+        if not pairs:
+            return []
+
+        costs = self._cost_matrix()
+        pad = costs.shape[0] - 1
+        batch = len(pairs)
+        rows = max(len(expected) for expected, _ in pairs)
+        columns = max(len(actual) for _, actual in pairs)
+
+        expected_ids = np.full((batch, rows), pad, dtype=np.intp)
+        actual_ids = np.full((batch, columns), pad, dtype=np.intp)
+        for index, (expected, actual) in enumerate(pairs):
+            expected_ids[index, :len(expected)] = np.minimum(np.asarray(expected, dtype=np.intp), pad)
+            actual_ids[index, :len(actual)] = np.minimum(np.asarray(actual, dtype=np.intp), pad)
+
+        # sub[b, i, j]: cost of pairing expected i with actual j in pair b
+        sub = costs[expected_ids[:, :, None], actual_ids[:, None, :]]
+
+        # Consecutive row windows must overlap, however lopsided the lengths
+        if band is None or rows == 0:
+            band = columns
+        else:
+            band = max(band, -(-columns // rows) + 1)
+
+        # Padding cells are filled too; they only feed cells past a pair's
+        # own end, which its backtrace never reads. Cells outside the band
+        # stay infinite.
+        table = np.full((batch, rows + 1, columns + 1), np.inf, dtype=np.float32)
+        insert_offsets = np.arange(columns + 1, dtype=np.float32) * INSERTION_COST
+        table[:, 0, :band + 1] = insert_offsets[:band + 1]
+        for i in range(1, rows + 1):
+            center = i * columns // rows
+            low = max(0, center - band)
+            high = min(columns, center + band) + 1
+            previous = table[:, i - 1, :]
+            best = np.empty((batch, high - low), dtype=np.float32)
+            start = low
+            if low == 0:
+                best[:, 0] = previous[:, 0] + DELETION_COST
+                start = 1
+            np.minimum(
+                previous[:, start:high] + DELETION_COST,
+                previous[:, start - 1:high - 1] + sub[:, i - 1, start - 1:high - 1],
+                out=best[:, start - low:]
+            )
+            # D[i, j] = min over k <= j of best[k] + (j - k) * ins
+            offsets = insert_offsets[low:high]
+            table[:, i, low:high] = np.minimum.accumulate(best - offsets, axis=1) + offsets
+
+        return [
+            self._backtrace(table[index], sub[index], len(expected), len(actual))
+            for index, (expected, actual) in enumerate(pairs)
+        ]
+
+    @staticmethod
+    def _backtrace(table: np.ndarray, sub: np.ndarray, rows: int, columns: int) -> List[AlignmentOp]:
+        ops: List[AlignmentOp] = []
+        i, j = rows, columns
+        while i > 0 or j > 0:
+            current = table[i, j]
+            if i > 0 and j > 0:
+                step = sub[i - 1, j - 1]
+                if abs(current - (table[i - 1, j - 1] + step)) < 1e-4:
+                    i -= 1
+                    j -= 1
+                    ops.append(AlignmentOp("match" if step <= MATCH_COST else "sub", i, j))
+                    continue
+            if i > 0 and abs(current - (table[i - 1, j] + DELETION_COST)) < 1e-4:
+                i -= 1
+                ops.append(AlignmentOp("del", i, -1))
+            else:
+                j -= 1
+                ops.append(AlignmentOp("ins", -1, j))
+        ops.reverse()
+        return ops
+
+    def analyze_error_patterns(
+        self,
+        words: Iterable[Any],
+        expected_text: Optional[str] = None,
+        recognized_ipa: Optional[str] = None,
+        expected_phonemes: Optional[Dict[str, Tuple[int, ...]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Find phoneme errors and aggregate them into error patterns
+
+        Words with assessed phonemes (Azure) are aligned word by word against
+        their expected pronunciation; Azure reports the reference phonemes,
+        so a matched phoneme that scored as an error also counts. Without
+        word phonemes, a recognized IPA transcription (Allosaurus) is aligned
+        against the expected pronunciation of the whole text.
+
+        Args:
+            words: WordResult objects of the assessment
+            expected_text: Reference text
+            recognized_ipa: Space-separated recognized IPA, if any
+            expected_phonemes: Precompiled lowercase word -> expected IDs
+                (a drill); other words are looked up as usual
+
+        Returns:
+            Pattern flags (th_issues, r_l_confusion, v_sounds,
+            final_consonants), specific_phonemes labels and the individual
+            phoneme_errors; empty if there was nothing to align
+        """
+        words = [word for word in words if isinstance(word, WordResult)]
+        if any(word.phoneme_ids for word in words):
+            errors = self._word_errors(words, expected_phonemes or {})
+        elif recognized_ipa and expected_text:
+            errors = self._transcript_errors(expected_text, recognized_ipa, expected_phonemes or {})
+        else:
+            return {}
+
+        patterns: Dict[str, Any] = {
+            "th_issues": False,
+            "r_l_confusion": False,
+            "v_sounds": False,
+            "final_consonants": False,
+            "specific_phonemes": [],
+            "phoneme_errors": []
+        }
+        for word, error_type, expected, actual, word_final in errors:
+            patterns["phoneme_errors"].append({
+                "word": word,
+                "type": error_type,
+                "expected": expected,
+                "actual": actual
+            })
+            if expected is None:
+                continue
+            if expected in TH_PHONES:
+                patterns["th_issues"] = True
+            if expected in R_L_PHONES and (error_type == "mispronunciation" or actual in R_L_PHONES):
+                patterns["r_l_confusion"] = True
+            if expected in V_W_PHONES and (error_type == "mispronunciation" or actual in V_W_SUBSTITUTES):
+                patterns["v_sounds"] = True
+            if word_final and self._phone_class.get(expected) in CONSONANT_CLASSES:
+                patterns["final_consonants"] = True
+
+        if patterns["th_issues"]:
+            patterns["specific_phonemes"].append("TH (θ/ð)")
+        if patterns["r_l_confusion"]:
+            patterns["specific_phonemes"].append("R/L")
+        if patterns["v_sounds"]:
+            patterns["specific_phonemes"].append("V sounds")
+        return patterns
+
+    def _word_errors(
+        self,
+        words: List[WordResult],
+        expected_phonemes: Dict[str, Tuple[int, ...]]
+    ) -> List[Tuple[str, str, Optional[str], Optional[str], bool]]:
+        """Align each assessed word with its expected phonemes"""
+        aligned_words = []
+        pairs = []
+        for word in words:
+            if word.error_type == "Insertion":
+                continue
+            expected = expected_phonemes.get(word.word.lower()) or expected_phoneme_ids(word.word)
+            if expected:
+                aligned_words.append(word)
+                pairs.append((expected, word.phoneme_ids))
+
+        ipa = phoneme_inventory.ipa
+        errors = []
+        for word, (expected, actual), ops in zip(aligned_words, pairs, self.align_batch(pairs)):
+            last = len(expected) - 1
+            for op in ops:
+                if op.op == "match":
+                    if classify_phoneme_error(word.phoneme_scores[op.actual]) is None:
+                        continue
+                    error_type = "mispronunciation"
+                elif op.op == "sub":
+                    error_type = "substitution"
+                elif op.op == "del":
+                    error_type = "deletion"
+                else:
+                    errors.append((word.word, "insertion", None, ipa[actual[op.actual]], False))
+                    continue
+                errors.append((
+                    word.word,
+                    error_type,
+                    ipa[expected[op.expected]],
+                    ipa[actual[op.actual]] if op.actual >= 0 else None,
+                    op.expected == last
+                ))
+        return errors
+
+    def _transcript_errors(
+        self,
+        expected_text: str,
+        recognized_ipa: str,
+        expected_phonemes: Dict[str, Tuple[int, ...]]
+    ) -> List[Tuple[str, str, Optional[str], Optional[str], bool]]:
+        """Align a whole recognized transcription with the expected text"""
+        expected: List[int] = []
+        owners: List[int] = []
+        finals = set()
+        text_words = WORD_PATTERN.findall(expected_text)
+        for index, word in enumerate(text_words):
+            ids = expected_phonemes.get(word.lower()) or expected_phoneme_ids(word)
+            if ids:
+                expected.extend(ids)
+                owners.extend([index] * len(ids))
+                finals.add(len(expected) - 1)
+        # Allosaurus may write affricates with a tie bar (t͡ʃ)
+        actual = phoneme_inventory.ids_of_ipa(recognized_ipa.replace("͡", ""))
+        if not expected or not actual:
+            return []
+
+        ipa = phoneme_inventory.ipa
+        errors = []
+        owner = owners[0]
+        for op in self.align(expected, actual):
+            if op.expected >= 0:
+                owner = owners[op.expected]
+            if op.op == "match":
+                continue
+            if op.op == "ins":
+                errors.append((text_words[owner], "insertion", None, ipa[actual[op.actual]], False))
+                continue
+            errors.append((
+                text_words[owner],
+                "substitution" if op.op == "sub" else "deletion",
+                ipa[expected[op.expected]],
+                ipa[actual[op.actual]] if op.actual >= 0 else None,
+                op.expected in finals
+            ))
+        return errors
+
+
+@lru_cache(maxsize=settings.EXPECTED_IPA_CACHE_SIZE)
+def expected_phoneme_ids(word: str) -> Tuple[int, ...]:
+    """
+    Expected phoneme IDs of a word (lexicon, then spelling estimate)
+
+    Returns:
+        Tuple of IDs, empty if the word has no letters
+    """
+    ipa = get_expected_ipa(word, estimate=True)
+    return tuple(phoneme_inventory.ids_of_ipa(ipa)) if ipa else ()
+
+
+# Global instance
+phoneme_aligner = PhonemeAligner()
@@ -0,0 +1,337 @@
+"""Shared Allosaurus model server reached over a Unix socket
+
+Run one per host (the API workers start it on first use when
+PHONEME_SERVER_AUTOSTART is set):
+
+    python -m app.services.phoneme_server --socket /tmp/speaksharp-phonemes.sock
+
+Wire format (all integers big-endian):
+    request:  sample_rate (uint32), pcm length (uint32), pcm bytes
+              (mono 16-bit little-endian PCM)
+    response: status (uint8), payload length (uint32), UTF-8 payload
+              (the IPA transcription, or an error message)
+
+A request with sample_rate 0 and no PCM asks for the server stats; the
+payload is then a JSON object.
+"""
+import argparse
+import fcntl
+import json
+import logging
+import os
+import socket
+import socketserver
+import struct
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.micro_batcher import MicroBatcher
+from app.models.audio import AudioBuffer
+
+logger = logging.getLogger(__name__)
+
+REQUEST_HEADER = struct.Struct("!II")
+RESPONSE_HEADER = struct.Struct("!BI")
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+STATUS_UNAVAILABLE = 2  # The model cannot be loaded on this host
+
+
+class PhonemeModelUnavailable(Exception):
+    """Allosaurus is not installed or its model failed to load"""
+    pass
+
+
+class AllosaurusModel:
+    """
+    Allosaurus recognizer loaded on first use and shared by all callers
+
+    Concurrent transcriptions are micro-batched: requests arriving within
+    batch_window_seconds of each other are padded to the same length and
+    run through the acoustic model in one forward pass.
+    """
+
+    def __init__(self, batch_window_seconds: float = 0.01, max_batch_size: int = 8):
+        """
+        Args:
+            batch_window_seconds: How long a request waits for others to batch with
+            max_batch_size: Most requests in one forward pass
+        """
+        self.model = None
+        self.load_error: Optional[str] = None
+        self._load_lock = threading.Lock()
+        # Its single worker thread is also the only thread running inference
+        self.batcher: MicroBatcher[AudioBuffer, str] = MicroBatcher(
+            self._transcribe_batch,
+            max_batch_size=max_batch_size,
+            window_seconds=batch_window_seconds,
+            name="allosaurus-batcher"
+        )
+
+    @property
+    def loaded(self) -> bool:
+        return self.model is not None
+
+    def load(self) -> None:
+        """
+        Load the model if it is not loaded yet
+
+        Raises:
+            PhonemeModelUnavailable: If loading failed (now or earlier)
+        """
+        if self.model is not None:
+            return
+        with self._load_lock:
+            if self.model is not None:
+                return
+            if self.load_error is not None:
+                raise PhonemeModelUnavailable(self.load_error)
+            try:
+                from allosaurus.app import read_recognizer
+                logger.info("Loading Allosaurus model...")
+                self.model = read_recognizer()
+                logger.info("Allosaurus model loaded successfully")
+            except Exception as e:
+                self.load_error = f"Failed to load Allosaurus: {str(e)}"
+                raise PhonemeModelUnavailable(self.load_error)
+
+    def transcribe(self, audio: AudioBuffer) -> str:
+        """
+        Transcribe decoded audio to IPA
+
+        Raises:
+            PhonemeModelUnavailable: If the model cannot be loaded
+        """
+        self.load()
+        return self.batcher.submit(audio)
+
+    def _transcribe_batch(self, batch: List[AudioBuffer]) -> List[str]:
+        """Run one padded forward pass for a batch of clips"""
+        import numpy as np
+        import torch
+        from allosaurus.am.utils import move_to_tensor
+        from allosaurus.audio import Audio
+
+        model = self.model
+        # Same steps as Recognizer.recognize, but with a real batch dimension
+        feats = [
+            model.pm.compute(Audio(np.frombuffer(audio.pcm, dtype=np.int16), audio.sample_rate))
+            for audio in batch
+        ]
+        # The acoustic model packs the batch with pack_padded_sequence, which
+        # requires rows sorted longest first; results go back in request order
+        order = sorted(range(len(feats)), key=lambda index: feats[index].shape[0], reverse=True)
+        lengths = np.array([feats[index].shape[0] for index in order], dtype=np.int32)
+        padded = np.zeros((len(feats), int(lengths[0]), feats[0].shape[1]), dtype=feats[0].dtype)
+        for row, index in enumerate(order):
+            padded[row, :lengths[row]] = feats[index]
+
+        tensor_feats, tensor_lengths = move_to_tensor([padded, lengths], model.config.device_id)
+        with torch.no_grad():
+            batch_lprobs = model.am(tensor_feats, tensor_lengths).cpu().numpy()
+
+        results = [""] * len(feats)
+        for row, index in enumerate(order):
+            ipa_transcription = model.lm.compute(batch_lprobs[row, :lengths[row]], "ipa", 1)
+            # Clean up IPA string (remove extra spaces)
+            results[index] = " ".join(ipa_transcription.split())
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Load state and batching stats"""
+        return {
+            "loaded": self.loaded,
+            "load_error": self.load_error,
+            "batching": self.batcher.get_stats()
+        }
+
+
+def transcribe_remote(socket_path: str, audio: AudioBuffer, timeout: float) -> Tuple[int, str]:
+    """
+    Send decoded audio to the model server and wait for the transcription
+
+    Args:
+        socket_path: Unix socket the server listens on
+        audio: Decoded mono PCM audio
+        timeout: Socket timeout in seconds
+
+    Returns:
+        Tuple of (status, payload)
+
+    Raises:
+        OSError: If the server cannot be reached
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(REQUEST_HEADER.pack(audio.sample_rate, len(audio.pcm)))
+        sock.sendall(audio.pcm)
+
+        status, length = RESPONSE_HEADER.unpack(_recv_exact(sock, RESPONSE_HEADER.size))
+        return status, _recv_exact(sock, length).decode("utf-8")
+
+
+def fetch_stats(socket_path: str, timeout: float) -> Dict[str, Any]:
+    """
+    Ask the model server for its stats
+
+    Raises:
+        OSError: If the server cannot be reached
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(REQUEST_HEADER.pack(0, 0))
+
+        _, length = RESPONSE_HEADER.unpack(_recv_exact(sock, RESPONSE_HEADER.size))
+        return json.loads(_recv_exact(sock, length).decode("utf-8"))
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:], size - received)
+        if count == 0:
+            raise ConnectionError("Phoneme server closed the connection")
+        received += count
+    return bytes(buffer)
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        server: "PhonemeModelServer" = self.server
+        try:
+            header = _recv_exact(self.request, REQUEST_HEADER.size)
+        except (ConnectionError, OSError):
+            # Liveness probe from a client starting the server
+            return
+
+        try:
+            sample_rate, length = REQUEST_HEADER.unpack(header)
+            if sample_rate == 0:
+                self._respond(STATUS_OK, json.dumps(server.model.get_stats()))
+                return
+            if length > server.max_request_bytes:
+                self._respond(STATUS_ERROR, f"Audio exceeds {server.max_request_bytes} bytes")
+                return
+            audio = AudioBuffer(pcm=_recv_exact(self.request, length), sample_rate=sample_rate)
+        except (ConnectionError, struct.error, OSError) as e:
+            logger.warning(f"Dropping malformed phoneme request: {str(e)}")
+            return
+
+        try:
+            self._respond(STATUS_OK, server.model.transcribe(audio))
+        except PhonemeModelUnavailable as e:
+            self._respond(STATUS_UNAVAILABLE, str(e))
+        except Exception as e:
+            logger.error(f"Error in phoneme detection: {str(e)}")
+            self._respond(STATUS_ERROR, str(e))
+
+    def _respond(self, status: int, payload: str) -> None:
+        encoded = payload.encode("utf-8")
+        try:
+            self.request.sendall(RESPONSE_HEADER.pack(status, len(encoded)) + encoded)
+        except OSError as e:
+            logger.warning(f"Phoneme client went away: {str(e)}")
+
+
+class PhonemeModelServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serves Allosaurus transcriptions to every API worker on the host"""
+
+    daemon_threads = True
+    # Every API worker thread may connect at once
+    request_queue_size = 256
+
+    def __init__(self, socket_path: str, max_request_bytes: int, model: AllosaurusModel):
+        """
+        Args:
+            socket_path: Unix socket path to listen on
+            max_request_bytes: Largest PCM payload accepted
+            model: Shared (lazily loaded) model
+        """
+        self.model = model
+        self.max_request_bytes = max_request_bytes
+        super().__init__(socket_path, _RequestHandler)
+
+
+def acquire_server_lock(socket_path: str) -> Optional[int]:
+    """
+    Take the per-socket lock that makes sure only one server runs
+
+    Returns:
+        The locked file descriptor (keep it open while serving), or None
+        if another server already holds the lock
+    """
+    fd = os.open(f"{socket_path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def serve(socket_path: str, max_request_bytes: int, model: AllosaurusModel, preload: bool = False) -> int:
+    """
+    Run the model server until interrupted
+
+    Returns:
+        Process exit code
+    """
+    lock_fd = acquire_server_lock(socket_path)
+    if lock_fd is None:
+        logger.info(f"Phoneme server already running on {socket_path}")
+        return 0
+
+    # We hold the lock, so any existing socket file is left over from a dead server
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    server = PhonemeModelServer(socket_path, max_request_bytes, model)
+    os.chmod(socket_path, 0o660)
+    logger.info(f"Phoneme server listening on {socket_path}")
+
+    if preload:
+        try:
+            server.model.load()
+        except PhonemeModelUnavailable as e:
+            logger.warning(f"{str(e)}. IPA transcription will be unavailable.")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        os.close(lock_fd)
+    return 0
+
+
+def main() -> None:
+    from app.core.config import settings
+
+    parser = argparse.ArgumentParser(description="Shared Allosaurus model server")
+    parser.add_argument("--socket", default=settings.PHONEME_SERVER_SOCKET, help="Unix socket path")
+    parser.add_argument("--preload", action="store_true", help="Load the model at startup instead of on first request")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    model = AllosaurusModel(
+        batch_window_seconds=settings.PHONEME_BATCH_WINDOW_MS / 1000,
+        max_batch_size=settings.PHONEME_BATCH_MAX_SIZE
+    )
+    sys.exit(serve(args.socket, settings.MAX_UPLOAD_BYTES * 4, model, preload=args.preload))
+
+
+if __name__ == "__main__":
+    main()
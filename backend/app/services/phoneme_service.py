@@ -1,166 +1,205 @@
 """Allosaurus phoneme detection service for IPA transcription"""
+import importlib.util
 import logging
-import tempfile
 import os
-from typing import Optional
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.audio import AudioBuffer
+from app.services.phoneme_server import (
+    AllosaurusModel,
+    PhonemeModelUnavailable,
+    STATUS_OK,
+    STATUS_UNAVAILABLE,
+    fetch_stats,
+    transcribe_remote,
+)
 
 logger = logging.getLogger(__name__)
 
+# Directory containing the app package, for starting the model server
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-class PhonemeDetectionService:
-    """Service for detecting phonemes using Allosaurus"""
-
-    def __init__(self):
-        """Initialize Allosaurus model"""
-        self.model = None
-        self.loaded = False
 
-        try:
-            from allosaurus.app import read_recognizer
-            logger.info("Loading Allosaurus model...")
-            self.model = read_recognizer()
-            self.loaded = True
-            logger.info("Allosaurus model loaded successfully")
-        except Exception as e:
-            logger.warning(f"Failed to load Allosaurus: {str(e)}. IPA transcription will be unavailable.")
-            self.loaded = False
+class PhonemeDetectionService:
+    """
+    Service for detecting phonemes using Allosaurus
+
+    Backends:
+        server: transcribe in the shared per-host model server
+                (app.services.phoneme_server), started on first use
+        local:  load the model in this process on first use
+        off:    no IPA transcription
+    Nothing is loaded at import time.
+    """
+
+    def __init__(
+        self,
+        backend: str = "server",
+        socket_path: str = "",
+        autostart: bool = True,
+        timeout: float = 20.0,
+        start_timeout: float = 10.0,
+        batch_window_seconds: float = 0.01,
+        max_batch_size: int = 8
+    ):
+        """
+        Args:
+            backend: One of server, local, off
+            socket_path: Unix socket of the model server
+            autostart: Start the model server if it is not running
+            timeout: Socket timeout for one transcription
+            start_timeout: How long to wait for a started server to listen
+            batch_window_seconds: Micro-batching window (local backend; the
+                server reads its own settings)
+            max_batch_size: Most clips per forward pass (local backend)
+        """
+        if backend not in ("server", "local", "off"):
+            raise ValueError(f"Unknown phoneme backend '{backend}'. Use server, local or off")
+
+        self.backend = backend
+        self.socket_path = socket_path
+        self.autostart = autostart
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self.model = (
+            AllosaurusModel(batch_window_seconds=batch_window_seconds, max_batch_size=max_batch_size)
+            if backend == "local" else None
+        )
+        self._start_lock = threading.Lock()
+
+        # Whether IPA transcription can be attempted; cleared once the model
+        # turns out to be unloadable so later requests skip it
+        self.available = backend != "off" and importlib.util.find_spec("allosaurus") is not None
+        if backend != "off" and not self.available:
+            logger.warning("Allosaurus is not installed. IPA transcription will be unavailable.")
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the model is loaded in this process (local backend only)"""
+        return self.model is not None and self.model.loaded
+
+    def warm(self) -> None:
+        """
+        Load the model (local backend) or start the model server, instead of
+        on the first request
 
-    def detect_phonemes(self, audio_data: bytes, audio_format: str = "wav") -> Optional[str]:
+        Raises:
+            PhonemeModelUnavailable: If transcription is off, not installed or
+                the model cannot be loaded
+        """
+        if self.backend == "off":
+            raise PhonemeModelUnavailable("Disabled (PHONEME_BACKEND=off)")
+        if not self.available:
+            raise PhonemeModelUnavailable("Allosaurus is not installed")
+        if self.backend == "local":
+            self.model.load()
+        elif not self._server_listening():
+            if not self.autostart:
+                raise PhonemeModelUnavailable(f"Phoneme server not running on {self.socket_path}")
+            self._start_server()
+
+    def detect_phonemes(self, audio: AudioBuffer) -> Optional[str]:
         """
         Detect phonemes from audio using Allosaurus
 
         Args:
-            audio_data: Audio file bytes
-            audio_format: Audio format (wav, webm, mp3)
+            audio: Decoded mono PCM audio
 
         Returns:
             IPA transcription string or None if failed
         """
-        if not self.loaded:
-            logger.warning("Allosaurus not loaded, skipping phoneme detection")
+        if not self.available:
+            logger.warning("Allosaurus not available, skipping phoneme detection")
             return None
 
         try:
-            # Save audio to temporary file
-            with tempfile.NamedTemporaryFile(
-                suffix=f".{audio_format}",
-                delete=False
-            ) as temp_audio:
-                temp_audio.write(audio_data)
-                temp_audio_path = temp_audio.name
-
-            try:
-                # If not WAV, convert to WAV first
-                if audio_format != "wav":
-                    converted_path = self._convert_to_wav(temp_audio_path)
-                    if converted_path:
-                        os.unlink(temp_audio_path)
-                        temp_audio_path = converted_path
-
-                # Run Allosaurus recognition
-                ipa_transcription = self.model.recognize(temp_audio_path)
-
-                # Clean up IPA string (remove extra spaces)
-                ipa_transcription = " ".join(ipa_transcription.split())
-
-                return ipa_transcription
-
-            finally:
-                # Clean up temp file
-                if os.path.exists(temp_audio_path):
-                    os.unlink(temp_audio_path)
-
+            with metrics.stage("phonemes"):
+                if self.backend == "local":
+                    return self.model.transcribe(audio)
+                return self._detect_remote(audio)
+
+        except PhonemeModelUnavailable as e:
+            logger.warning(f"{str(e)}. IPA transcription will be unavailable.")
+            self.available = False
+            return None
         except Exception as e:
             logger.error(f"Error in phoneme detection: {str(e)}")
             return None
 
-    def _convert_to_wav(self, input_path: str) -> Optional[str]:
-        """Convert audio file to WAV format using ffmpeg"""
+    def _detect_remote(self, audio: AudioBuffer) -> Optional[str]:
         try:
-            import subprocess
-
-            # Output path
-            output_path = input_path.rsplit(".", 1)[0] + ".wav"
-
-            # Use ffmpeg to convert to WAV (mono, 16kHz, 16-bit PCM)
-            cmd = [
-                "ffmpeg",
-                "-i", input_path,
-                "-ar", "16000",  # Sample rate: 16kHz
-                "-ac", "1",      # Channels: mono
-                "-c:a", "pcm_s16le",  # Codec: 16-bit PCM
-                "-y",            # Overwrite output
-                output_path
-            ]
-
-            # Run ffmpeg (suppress output)
-            result = subprocess.run(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                timeout=30
-            )
-
-            if result.returncode == 0 and os.path.exists(output_path):
-                logger.info(f"Successfully converted audio to WAV: {output_path}")
-                return output_path
-            else:
-                logger.error(f"ffmpeg conversion failed: {result.stderr.decode()}")
-                return None
-
-        except Exception as e:
-            logger.error(f"Error converting audio to WAV: {str(e)}")
+            status, payload = transcribe_remote(self.socket_path, audio, self.timeout)
+        except (FileNotFoundError, ConnectionRefusedError):
+            if not self.autostart:
+                raise
+            self._start_server()
+            status, payload = transcribe_remote(self.socket_path, audio, self.timeout)
+
+        if status == STATUS_UNAVAILABLE:
+            raise PhonemeModelUnavailable(payload)
+        if status != STATUS_OK:
+            logger.error(f"Phoneme server error: {payload}")
             return None
+        return payload
+
+    def _start_server(self) -> None:
+        """Start the model server and wait until it accepts connections"""
+        with self._start_lock:
+            if self._server_listening():
+                return
+
+            logger.info(f"Starting phoneme server on {self.socket_path}")
+            # Detached so it outlives this worker and serves the others too;
+            # if another worker won the race the new process exits at once
+            subprocess.Popen(
+                [sys.executable, "-m", "app.services.phoneme_server", "--socket", self.socket_path],
+                cwd=BACKEND_DIR,
+                stdin=subprocess.DEVNULL,
+                start_new_session=True
+            )
 
-    def analyze_pronunciation_patterns(self, ipa_transcription: str) -> dict:
-        """
-        Analyze IPA transcription for common pronunciation patterns
-
-        Args:
-            ipa_transcription: IPA phonetic transcription
+            deadline = time.monotonic() + self.start_timeout
+            while time.monotonic() < deadline:
+                if self._server_listening():
+                    return
+                time.sleep(0.1)
+            raise TimeoutError(f"Phoneme server did not start within {self.start_timeout}s")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Backend, model load state and micro-batching stats"""
+        stats: Dict[str, Any] = {"backend": self.backend, "available": self.available}
+        if self.backend == "local":
+            stats.update(self.model.get_stats())
+        elif self.backend == "server" and self.available:
+            try:
+                stats.update(fetch_stats(self.socket_path, timeout=1.0))
+            except OSError:
+                stats["server"] = "not running"
+        return stats
 
-        Returns:
-            Dictionary with detected patterns
-        """
-        patterns = {
-            "th_issues": False,
-            "r_l_confusion": False,
-            "v_sounds": False,
-            "final_consonants": False,
-            "specific_phonemes": []
-        }
-
-        if not ipa_transcription:
-            return patterns
-
-        # Check for TH sound substitutions
-        if "θ" not in ipa_transcription and "ð" not in ipa_transcription:
-            # Look for likely substitutions (t, d, s, z)
-            if any(phone in ipa_transcription for phone in ["t", "d", "s", "z"]):
-                patterns["th_issues"] = True
-                patterns["specific_phonemes"].append("TH (θ/ð)")
-
-        # Check for R/L confusion
-        # This is harder to detect without reference, but we can flag if both appear
-        if "r" in ipa_transcription and "l" in ipa_transcription:
-            patterns["r_l_confusion"] = True
-            patterns["specific_phonemes"].append("R/L")
-
-        # Check for V sounds
-        if "v" in ipa_transcription or "w" in ipa_transcription or "b" in ipa_transcription:
-            patterns["v_sounds"] = True
-            patterns["specific_phonemes"].append("V sounds")
-
-        # Check for final consonant patterns
-        # This would require more sophisticated analysis
-        words = ipa_transcription.split()
-        for word in words:
-            if len(word) > 0 and word[-1] in "ptkbdgfvsʃʒmnŋlr":
-                patterns["final_consonants"] = True
-                break
-
-        return patterns
+    def _server_listening(self) -> bool:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            try:
+                sock.connect(self.socket_path)
+                return True
+            except OSError:
+                return False
 
 
 # Global instance
-phoneme_service = PhonemeDetectionService()
+phoneme_service = PhonemeDetectionService(
+    backend=settings.PHONEME_BACKEND,
+    socket_path=settings.PHONEME_SERVER_SOCKET,
+    autostart=settings.PHONEME_SERVER_AUTOSTART,
+    timeout=settings.PHONEME_TIMEOUT_SECONDS,
+    start_timeout=settings.PHONEME_SERVER_START_TIMEOUT_SECONDS,
+    batch_window_seconds=settings.PHONEME_BATCH_WINDOW_MS / 1000,
+    max_batch_size=settings.PHONEME_BATCH_MAX_SIZE
+)
@@ -1,12 +1,27 @@
 """Pronunciation assessment service combining Azure and Allosaurus"""
+import asyncio
 import logging
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Optional
 
 from app.core.azure_speech import azure_speech_service
+from app.core.config import settings
+from app.core.executor import stage_executor, StageTimeout, WorkerPoolSaturated
+from app.core.metrics import metrics
+from app.models.assessment import words_to_dicts
+from app.models.audio import AudioBuffer
+from app.services.assessment_cache import assessment_cache
+from app.services.audio_screening import audio_screener
+from app.services.audio_decoder import audio_decoder, AudioDecodeError
+from app.services.drill_corpus import Drill
+from app.services.phoneme_alignment import phoneme_aligner
 from app.services.phoneme_service import phoneme_service
 
 logger = logging.getLogger(__name__)
 
+# Upload formats reported under their own metrics label (others count as "other")
+METRIC_AUDIO_FORMATS = frozenset(("wav", "webm", "mp3", "ogg", "m4a", "mp4"))
+
 
 class PronunciationService:
     """Main service for pronunciation assessment"""
@@ -15,87 +30,112 @@ class PronunciationService:
         """Initialize pronunciation service"""
         self.azure_service = azure_speech_service
         self.phoneme_service = phoneme_service
+        self.aligner = phoneme_aligner
+        self.audio_decoder = audio_decoder
+        self.audio_screener = audio_screener
+        self.executor = stage_executor
+        self.cache = assessment_cache
 
     async def assess_pronunciation(
         self,
         audio_data: bytes,
         reference_text: str,
-        audio_format: str = "wav"
+        audio_format: str = "wav",
+        drill: Optional[Drill] = None
     ) -> Dict[str, Any]:
         """
         Comprehensive pronunciation assessment
 
         Combines:
+        0. A single in-memory decode of the upload to 16kHz mono PCM, then
+           pre-screening that rejects recordings without speech and trims
+           the silence around it
         1. Azure Speech Services for accurate scoring
-        2. Allosaurus for IPA phonetic transcription
-        3. Custom pattern analysis for error detection
+        2. Allosaurus for IPA phonetic transcription (in parallel with Azure)
+        3. Expected-vs-actual phoneme alignment for error detection
+
+        All stages share one REQUEST_LATENCY_BUDGET_SECONDS deadline.
 
         Args:
             audio_data: Audio file bytes
             reference_text: Expected text to be pronounced
             audio_format: Audio format (wav, webm, mp3)
+            drill: Precompiled exercise for reference_text, if the client
+                named one (skips deriving expected phonemes from the text)
 
         Returns:
             Complete assessment results
-        """
-        try:
-            # Step 1: Get Azure pronunciation assessment
-            logger.info(f"Assessing pronunciation for text: {reference_text}")
-            azure_result = self.azure_service.assess_pronunciation(
-                audio_data=audio_data,
-                reference_text=reference_text,
-                audio_format=audio_format
-            )
 
-            if not azure_result.get("success", False):
-                return azure_result
-
-            # Step 2: Get IPA transcription from Allosaurus (only as fallback)
-            logger.info("Detecting phonemes with Allosaurus")
-            allosaurus_ipa = self.phoneme_service.detect_phonemes(
-                audio_data=audio_data,
-                audio_format=audio_format
-            )
+        Raises:
+            WorkerPoolSaturated: If the worker pool cannot accept the Azure stage
+        """
+        format_label = audio_format if audio_format in METRIC_AUDIO_FORMATS else "other"
+        metrics.audio_bytes.observe(len(audio_data), format_label)
+        with metrics.stage("assessment"):
+            return await self._assess_upload(audio_data, reference_text, audio_format, drill)
 
-            # Step 3: Use Azure IPA (already converted from phonemes), fallback to Allosaurus
-            # IMPORTANT: Azure IPA is more accurate because it's based on pronunciation assessment
-            azure_ipa = azure_result.get("ipa_transcription")
-            final_ipa = azure_ipa if azure_ipa else allosaurus_ipa
-
-            logger.info(f"IPA source: {'Azure (phoneme-based)' if azure_ipa else 'Allosaurus (audio-based)'}")
-
-            # Step 4: Analyze pronunciation patterns
-            error_patterns = {}
-            if final_ipa:
-                error_patterns = self.phoneme_service.analyze_pronunciation_patterns(
-                    final_ipa
-                )
-
-            # Step 5: Combine results (don't overwrite Azure's IPA!)
-            result = {
-                **azure_result,
-                # Keep Azure's IPA, only add Allosaurus if Azure didn't provide it
-                "ipa_transcription": final_ipa,
-                "allosaurus_ipa": allosaurus_ipa,  # Keep for debugging
-                "error_patterns": error_patterns
-            }
+    async def _assess_upload(
+        self,
+        audio_data: bytes,
+        reference_text: str,
+        audio_format: str,
+        drill: Optional[Drill]
+    ) -> Dict[str, Any]:
+        """Decode the upload and assess it (see assess_pronunciation)"""
+        deadline = time.monotonic() + settings.REQUEST_LATENCY_BUDGET_SECONDS
+        try:
+            # Step 1: Decode the upload once; every later stage shares this buffer
+            try:
+                with metrics.stage("decode"):
+                    audio = await self.audio_decoder.decode(audio_data, audio_format)
+                metrics.audio_seconds.observe(audio.duration)
+            except AudioDecodeError as e:
+                logger.error(f"Audio decoding failed: {str(e)}")
+                return {
+                    "success": False,
+                    "message": f"Failed to decode {audio_format} audio",
+                    "detail": str(e),
+                    "overall_score": 0.0,
+                    "recognized_text": "",
+                    "expected_text": reference_text
+                }
 
-            # Add focus areas based on patterns
-            focus_areas = []
-            if error_patterns.get("th_issues"):
-                focus_areas.append("TH sounds (θ/ð)")
-            if error_patterns.get("r_l_confusion"):
-                focus_areas.append("R/L discrimination")
-            if error_patterns.get("v_sounds"):
-                focus_areas.append("V/W/B sounds")
-            if error_patterns.get("final_consonants"):
-                focus_areas.append("Final consonants")
+            # Step 2: Only the speech goes on; silent or clipped recordings stop here
+            if settings.AUDIO_SCREENING_ENABLED:
+                # ~5ms per minute of audio, so kept off the event loop
+                with metrics.stage("screen"):
+                    screening = await self.executor.run("screen", self.audio_screener.screen, audio)
+                if screening.rejected is not None:
+                    return {
+                        "success": False,
+                        "message": screening.message,
+                        "detail": screening.detail,
+                        "overall_score": 0.0,
+                        "recognized_text": "",
+                        "expected_text": reference_text
+                    }
+                audio = screening.audio
 
-            result["focus_areas"] = focus_areas
+            # Step 3: Score the audio, reusing a cached result for identical submissions
+            # (mock scores are random, so there is nothing to reuse)
+            if not settings.ASSESSMENT_CACHE_ENABLED or self.azure_service.mock_mode:
+                return await self._assess_audio(audio, reference_text, deadline, drill)
 
-            logger.info(f"Assessment complete. Overall score: {result.get('overall_score', 0)}")
+            key = self.cache.make_key(audio, reference_text, self._assessment_fingerprint(drill))
+            # With Allosaurus up, a result without IPA means its job timed out
+            # or was shed; a retry may get the IPA, so it is kept only briefly
+            allosaurus = self.phoneme_service.available
+            result = await self.cache.get_or_compute(
+                key,
+                lambda: self._assess_audio(audio, reference_text, deadline, drill),
+                is_partial=lambda result: allosaurus and not result.get("ipa_transcription")
+            )
+            # The key ignores case and surrounding spaces; echo this caller's text
+            result["expected_text"] = reference_text
             return result
 
+        except WorkerPoolSaturated:
+            raise
         except Exception as e:
             logger.error(f"Error in pronunciation assessment: {str(e)}")
             return {
@@ -106,49 +146,202 @@ class PronunciationService:
                 "expected_text": reference_text
             }
 
-    def analyze_words_for_patterns(self, words_data: list) -> Dict[str, Any]:
+    async def _assess_audio(
+        self,
+        audio: AudioBuffer,
+        reference_text: str,
+        deadline: float,
+        drill: Optional[Drill] = None
+    ) -> Dict[str, Any]:
+        """
+        Run the scoring stages on decoded audio
+
+        Azure and Allosaurus start together on the same buffer. Allosaurus
+        IPA is only a fallback, so its job is abandoned as soon as Azure
+        returns IPA of its own, and a late Allosaurus result is left out of
+        the response rather than delaying it past the deadline.
+
+        Args:
+            audio: Decoded audio
+            reference_text: Expected text
+            deadline: time.monotonic() by which the result is due
+            drill: Precompiled exercise, if any
+
+        Raises:
+            WorkerPoolSaturated: If the worker pool cannot accept the Azure stage
+        """
+        logger.debug("Assessing pronunciation for text: %r (%.2fs of audio)", reference_text, audio.duration)
+
+        phoneme_task = None
+        if self.phoneme_service.available:
+            phoneme_task = asyncio.ensure_future(self._run_phonemes(audio, deadline))
+
+        try:
+            # Step 1: Get Azure pronunciation assessment
+            try:
+                azure_result = await self._run_azure(audio, reference_text, deadline, drill)
+            except StageTimeout as e:
+                return {
+                    "success": False,
+                    "message": "Azure assessment timed out",
+                    "detail": str(e),
+                    "overall_score": 0.0,
+                    "recognized_text": "",
+                    "expected_text": reference_text
+                }
+
+            if not azure_result.get("success", False):
+                return azure_result
+
+            # Step 2: Allosaurus IPA, only needed if Azure did not provide any
+            allosaurus_ipa = None
+            if phoneme_task is not None:
+                if azure_result.get("ipa_transcription"):
+                    logger.debug("Azure returned IPA, dropping the Allosaurus job")
+                else:
+                    allosaurus_ipa = await phoneme_task
+
+            return self.combine_results(azure_result, allosaurus_ipa, drill)
+
+        finally:
+            if phoneme_task is not None and not phoneme_task.done():
+                phoneme_task.cancel()
+
+    async def _run_phonemes(self, audio: AudioBuffer, deadline: float) -> Optional[str]:
+        """Run Allosaurus within its timeout and what is left of the request budget"""
+        timeout = min(settings.PHONEME_TIMEOUT_SECONDS, deadline - time.monotonic())
+        if timeout <= 0:
+            return None
+
+        logger.debug("Detecting phonemes with Allosaurus")
+        try:
+            return await self.executor.run(
+                "phonemes",
+                self.phoneme_service.detect_phonemes,
+                audio,
+                timeout=timeout
+            )
+        except (StageTimeout, WorkerPoolSaturated) as e:
+            logger.warning(f"Skipping Allosaurus phoneme detection: {str(e)}")
+            return None
+
+    def combine_results(
+        self,
+        azure_result: Dict[str, Any],
+        allosaurus_ipa: Optional[str] = None,
+        drill: Optional[Drill] = None
+    ) -> Dict[str, Any]:
         """
-        Analyze word-level data for common error patterns
+        Merge a successful Azure result with Allosaurus IPA and pattern analysis
 
         Args:
-            words_data: List of word assessment results from Azure
+            azure_result: Successful result from the Azure stage
+            allosaurus_ipa: Allosaurus transcription, if any
+            drill: Precompiled exercise, if any
 
         Returns:
-            Dictionary of detected patterns
+            Complete assessment results
         """
-        patterns = {
-            "th_words": [],
-            "r_l_words": [],
-            "v_words": [],
-            "final_consonant_words": []
+        # Use Azure IPA (already converted from phonemes), fallback to Allosaurus
+        # IMPORTANT: Azure IPA is more accurate because it's based on pronunciation assessment
+        azure_ipa = azure_result.get("ipa_transcription")
+        final_ipa = azure_ipa if azure_ipa else allosaurus_ipa
+
+        logger.debug("IPA source: %s", "Azure (phoneme-based)" if azure_ipa else "Allosaurus (audio-based)")
+
+        # Align expected and pronounced phonemes and aggregate the errors
+        with metrics.stage("alignment"):
+            error_patterns = self.aligner.analyze_error_patterns(
+                azure_result.get("words", []),
+                expected_text=azure_result.get("expected_text"),
+                recognized_ipa=allosaurus_ipa,
+                expected_phonemes=drill.expected_phonemes if drill is not None else None
+            )
+
+        # Combine results (don't overwrite Azure's IPA!); word results are
+        # converted to their public shape here, once
+        result = {
+            **azure_result,
+            "words": words_to_dicts(azure_result.get("words", [])),
+            # Keep Azure's IPA, only add Allosaurus if Azure didn't provide it
+            "ipa_transcription": final_ipa,
+            "allosaurus_ipa": allosaurus_ipa,  # Keep for debugging
+            "error_patterns": error_patterns
         }
 
-        for word_info in words_data:
-            word = word_info.get("word", "").lower()
-            error_type = word_info.get("error_type", "None")
-            accuracy = word_info.get("accuracy", 100)
+        # Add focus areas based on patterns
+        focus_areas = []
+        if error_patterns.get("th_issues"):
+            focus_areas.append("TH sounds (θ/ð)")
+        if error_patterns.get("r_l_confusion"):
+            focus_areas.append("R/L discrimination")
+        if error_patterns.get("v_sounds"):
+            focus_areas.append("V/W/B sounds")
+        if error_patterns.get("final_consonants"):
+            focus_areas.append("Final consonants")
 
-            # Only consider words with errors
-            if error_type == "None" and accuracy > 80:
-                continue
+        result["focus_areas"] = focus_areas
 
-            # Check for TH sounds
-            if "th" in word:
-                patterns["th_words"].append(word)
+        logger.info("Assessment complete. Overall score: %s", result.get("overall_score", 0))
+        return result
 
-            # Check for R/L
-            if "r" in word or "l" in word:
-                patterns["r_l_words"].append(word)
+    def _assessment_fingerprint(self, drill: Optional[Drill] = None) -> str:
+        """Settings that change the result for the same audio and text"""
+        enable_miscue = drill.enable_miscue if drill is not None else True
+        miscue = "miscue" if enable_miscue else "no-miscue"
+        allosaurus = "allosaurus" if self.phoneme_service.available else "no-allosaurus"
+        # A drill's authored pronunciation (read /riːd/ vs /rɛd/) changes the
+        # expected phonemes and so the error analysis; the expected IPA also
+        # tells apart corpus rebuilds that kept the exercise id
+        expected = f"{drill.exercise_id}:{drill.expected_ipa or ''}" if drill is not None else "lexicon"
+        return f"{self.azure_service.assessment_fingerprint}|{miscue}|{allosaurus}|{expected}"
 
-            # Check for V sounds
-            if any(char in word for char in ["v", "w", "b"]):
-                patterns["v_words"].append(word)
+    async def _run_azure(
+        self,
+        audio: AudioBuffer,
+        reference_text: str,
+        deadline: float,
+        drill: Optional[Drill] = None
+    ) -> Dict[str, Any]:
+        """
+        Run the Azure stage
 
-            # Check for final consonants
-            if word and word[-1] in "bdfghjklmnpqrstvwxyz":
-                patterns["final_consonant_words"].append(word)
+        With AZURE_ASYNC_RECOGNITION recognition is awaited on the event loop;
+        otherwise the blocking SDK call runs on the worker pool. The stage
+        gets AZURE_TIMEOUT_SECONDS or whatever is left of the request budget,
+        whichever is shorter. A drill supplies the miscue setting and the
+        expected IPA.
 
-        return patterns
+        Raises:
+            StageTimeout: If recognition exceeded its time limit
+            WorkerPoolSaturated: If the worker pool cannot accept the stage
+        """
+        timeout = min(settings.AZURE_TIMEOUT_SECONDS, deadline - time.monotonic())
+        if timeout <= 0:
+            raise StageTimeout("azure", 0.0)
+
+        enable_miscue = drill.enable_miscue if drill is not None else True
+        expected_ipa = drill.expected_ipa if drill is not None else None
+
+        if not settings.AZURE_ASYNC_RECOGNITION:
+            return await self.executor.run(
+                "azure",
+                self.azure_service.assess_pronunciation,
+                audio,
+                reference_text,
+                enable_miscue,
+                expected_ipa,
+                timeout=timeout
+            )
+
+        try:
+            return await asyncio.wait_for(
+                self.azure_service.assess_pronunciation_async(audio, reference_text, enable_miscue, expected_ipa),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"Stage 'azure' timed out after {timeout:.1f}s")
+            raise StageTimeout("azure", timeout)
 
 
 # Global instance
@@ -0,0 +1,273 @@
+"""
+Container sniffing, WAV parsing and PCM conversion without ffmpeg
+
+sniff_container() names an upload's container from its magic bytes, so
+the decoder does not depend on the audio_format the client declared.
+parse_wav() walks the RIFF chunks in place (no copy of the audio) and
+wav_to_pcm16() turns any PCM or float WAV into 16-bit mono at the target
+rate with NumPy: channels are averaged and the rate is changed by a
+windowed-sinc polyphase resampler.
+"""
+import struct
+from functools import lru_cache
+from math import gcd
+from typing import Optional, Union
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+RIFF_HEADER = struct.Struct("<4sI4s")
+CHUNK_HEADER = struct.Struct("<4sI")
+# Format tag, channels, sample rate, byte rate, block align, bits per sample
+FMT_CHUNK = struct.Struct("<HHIIHH")
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+# Offset of the SubFormat GUID (whose first two bytes are the real format tag)
+EXTENSIBLE_SUBFORMAT_OFFSET = 24
+
+# Chunk sizes written by encoders that did not know the length up front
+UNKNOWN_CHUNK_SIZES = (0, 0xFFFFFFFF)
+
+# Resampler: zero crossings of the sinc on each side, and its Kaiser window
+RESAMPLE_ZERO_CROSSINGS = 10
+RESAMPLE_KAISER_BETA = 7.0
+
+
+class WavError(ValueError):
+    """Raised when a WAV file is malformed or not PCM/float"""
+    pass
+
+
+def sniff_container(data: BytesLike, frame_sync: bool = True) -> Optional[str]:
+    """
+    Container of an upload, from its magic bytes
+
+    Args:
+        data: Upload bytes
+        frame_sync: Also match bare MPEG audio / ADTS frame headers; these
+            are only 11-12 bits, so headerless PCM can start with one
+
+    Returns:
+        wav, webm (also Matroska), ogg, flac, mp4 (also m4a), mp3, aac,
+        aiff, or None if unrecognized
+    """
+    head = bytes(data[:12])
+    if head[:4] in (b"RIFF", b"RF64") and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:4] == b"\x1aE\xdf\xa3":
+        return "webm"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[4:8] == b"ftyp":
+        return "mp4"
+    if head[:4] == b"FORM" and head[8:12] in (b"AIFF", b"AIFC"):
+        return "aiff"
+    if head[:3] == b"ID3":
+        return "mp3"
+    if frame_sync and len(head) >= 2 and head[0] == 0xFF:
+        # ADTS (AAC) frames have layer bits 00, MPEG audio frames do not
+        if head[1] & 0xF6 == 0xF0:
+            return "aac"
+        if head[1] & 0xE0 == 0xE0:
+            return "mp3"
+    return None
+
+
+class WavFormat:
+    """Format and location of the samples in a WAV file"""
+
+    __slots__ = ("format_tag", "channels", "sample_rate", "bits_per_sample", "block_align", "data_offset", "data_length")
+
+    def __init__(
+        self,
+        format_tag: int,
+        channels: int,
+        sample_rate: int,
+        bits_per_sample: int,
+        block_align: int,
+        data_offset: int,
+        data_length: int
+    ):
+        self.format_tag = format_tag
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.bits_per_sample = bits_per_sample
+        self.block_align = block_align
+        self.data_offset = data_offset
+        # Whole frames only
+        self.data_length = data_length - data_length % block_align
+
+    @property
+    def frame_count(self) -> int:
+        return self.data_length // self.block_align
+
+    def is_pcm16(self, sample_rate: int, channels: int = 1) -> bool:
+        """Whether the samples already are 16-bit PCM at this rate and channel count"""
+        return (self.format_tag == WAVE_FORMAT_PCM and self.bits_per_sample == 16
+                and self.sample_rate == sample_rate and self.channels == channels)
+
+    def __repr__(self) -> str:
+        kind = "float" if self.format_tag == WAVE_FORMAT_IEEE_FLOAT else "pcm"
+        return f"WavFormat({kind}{self.bits_per_sample}, {self.channels}ch, {self.sample_rate}Hz, {self.frame_count} frames)"
+
+
+def parse_wav(data: BytesLike) -> WavFormat:
+    """
+    Read the fmt and data chunks of a RIFF/WAVE file in place
+
+    A data chunk whose size is missing (0 or 0xFFFFFFFF, as written by
+    streaming encoders) or runs past the end of the upload extends to the
+    end of the upload.
+
+    Raises:
+        WavError: If the file is malformed, or its samples are not integer
+            PCM (8/16/24/32-bit) or float (32/64-bit)
+    """
+    if len(data) < RIFF_HEADER.size:
+        raise WavError("Too short for a WAV header")
+    riff, _, wave_id = RIFF_HEADER.unpack_from(data, 0)
+    if riff != b"RIFF" or wave_id != b"WAVE":
+        raise WavError("Not a RIFF/WAVE file")
+
+    fmt = None
+    offset = RIFF_HEADER.size
+    while offset + CHUNK_HEADER.size <= len(data):
+        chunk_id, size = CHUNK_HEADER.unpack_from(data, offset)
+        body = offset + CHUNK_HEADER.size
+        if chunk_id == b"fmt ":
+            if size < FMT_CHUNK.size or body + size > len(data):
+                raise WavError("Truncated fmt chunk")
+            fmt = FMT_CHUNK.unpack_from(data, body)
+            if fmt[0] == WAVE_FORMAT_EXTENSIBLE:
+                if size < EXTENSIBLE_SUBFORMAT_OFFSET + 2:
+                    raise WavError("Truncated WAVE_FORMAT_EXTENSIBLE fmt chunk")
+                subformat, = struct.unpack_from("<H", data, body + EXTENSIBLE_SUBFORMAT_OFFSET)
+                fmt = (subformat,) + fmt[1:]
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise WavError("data chunk before fmt chunk")
+            if size in UNKNOWN_CHUNK_SIZES or body + size > len(data):
+                size = len(data) - body
+            return _wav_format(fmt, body, size)
+        # Chunks are padded to an even size
+        offset = body + size + (size & 1)
+    raise WavError("No data chunk")
+
+
+def _wav_format(fmt: tuple, data_offset: int, data_length: int) -> WavFormat:
+    format_tag, channels, sample_rate, _, block_align, bits = fmt
+    supported = (
+        (format_tag == WAVE_FORMAT_PCM and bits in (8, 16, 24, 32))
+        or (format_tag == WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64))
+    )
+    if not supported:
+        raise WavError(f"Unsupported WAV encoding (format tag {format_tag:#06x}, {bits}-bit)")
+    if channels < 1 or sample_rate < 1 or block_align != channels * bits // 8:
+        raise WavError(f"Inconsistent WAV header ({channels} channels, {sample_rate}Hz, block align {block_align})")
+    return WavFormat(format_tag, channels, sample_rate, bits, block_align, data_offset, data_length)
+
+
+def wav_samples(data: BytesLike, wav: WavFormat) -> np.ndarray:
+    """
+    Samples of a parsed WAV file as float32 in 16-bit units (-32768..32767)
+
+    Returns:
+        Array of shape (frames, channels)
+    """
+    count = wav.frame_count * wav.channels
+    offset = wav.data_offset
+    bits = wav.bits_per_sample
+    if wav.format_tag == WAVE_FORMAT_IEEE_FLOAT:
+        dtype = "<f4" if bits == 32 else "<f8"
+        samples = np.frombuffer(data, dtype=dtype, count=count, offset=offset).astype(np.float32) * 32768.0
+    elif bits == 8:
+        samples = (np.frombuffer(data, dtype=np.uint8, count=count, offset=offset).astype(np.float32) - 128.0) * 256.0
+    elif bits == 16:
+        samples = np.frombuffer(data, dtype="<i2", count=count, offset=offset).astype(np.float32)
+    elif bits == 24:
+        raw = np.frombuffer(data, dtype=np.uint8, count=count * 3, offset=offset).reshape(count, 3).astype(np.int32)
+        # Assemble little-endian 24-bit values, then sign-extend through the top byte
+        values = (raw[:, 0] << 8) | (raw[:, 1] << 16) | (raw[:, 2] << 24)
+        samples = (values >> 8).astype(np.float32) / 256.0
+    else:
+        samples = np.frombuffer(data, dtype="<i4", count=count, offset=offset).astype(np.float32) / 65536.0
+    return samples.reshape(wav.frame_count, wav.channels)
+
+
+@lru_cache(maxsize=16)
+def _polyphase_filter(up: int, down: int) -> np.ndarray:
+    """
+    Low-pass filter for resampling by up/down, one row per output phase
+
+    Row p holds the weights of the input samples around an output sample
+    that falls p/up of the way past an input sample.
+    """
+    cutoff = min(1.0, up / down)
+    half_width = int(np.ceil(RESAMPLE_ZERO_CROSSINGS / cutoff))
+    taps = np.arange(2 * half_width)
+    # Distance from the output position to each input sample, per phase
+    distance = (np.arange(up) / up)[:, None] + half_width - 1 - taps[None, :]
+    window = np.i0(RESAMPLE_KAISER_BETA * np.sqrt(np.clip(1 - (distance / half_width) ** 2, 0, None)))
+    weights = np.sinc(cutoff * distance) * window / np.i0(RESAMPLE_KAISER_BETA)
+    weights[np.abs(distance) >= half_width] = 0.0
+    # Unity gain at DC for every phase
+    weights /= weights.sum(axis=1, keepdims=True)
+    return weights.astype(np.float32)
+
+
+def resample(samples: np.ndarray, from_rate: int, to_rate: int) -> np.ndarray:
+    """
+    Change the sample rate of a mono float32 signal
+
+    Args:
+        samples: 1-D float32 samples
+        from_rate: Rate of samples
+        to_rate: Rate of the result
+
+    Returns:
+        1-D float32 samples at to_rate
+    """
+    if from_rate == to_rate:
+        return samples
+    divisor = gcd(from_rate, to_rate)
+    up, down = to_rate // divisor, from_rate // divisor
+    weights = _polyphase_filter(up, down)
+    half_width = weights.shape[1] // 2
+
+    padded = np.concatenate([
+        np.zeros(half_width, dtype=np.float32), samples, np.zeros(half_width, dtype=np.float32)
+    ])
+    # Every input window the filter can see, as a strided view (no copy)
+    windows = sliding_window_view(padded, weights.shape[1])
+    output_count = len(samples) * up // down
+    output = np.empty(output_count, dtype=np.float32)
+    # Outputs k, k + up, k + 2 * up, ... share a phase, and their windows
+    # start down input samples apart: one strided matrix-vector product each
+    for start in range(min(up, output_count)):
+        position = start * down
+        first = position // up + 1
+        count = len(range(start, output_count, up))
+        output[start::up] = windows[first:first + count * down:down] @ weights[position % up]
+    return output
+
+
+def wav_to_pcm16(data: BytesLike, wav: WavFormat, sample_rate: int) -> bytes:
+    """
+    16-bit little-endian mono PCM at sample_rate from a parsed WAV file
+
+    Channels are averaged; other rates are resampled. 16-bit mono files
+    already at sample_rate are copied out unchanged.
+    """
+    if wav.is_pcm16(sample_rate):
+        return bytes(memoryview(data)[wav.data_offset:wav.data_offset + wav.data_length])
+
+    samples = wav_samples(data, wav)
+    mono = samples[:, 0] if wav.channels == 1 else samples.mean(axis=1, dtype=np.float32)
+    mono = resample(mono, wav.sample_rate, sample_rate)
+    return np.clip(np.rint(mono), -32768, 32767).astype("<i2").tobytes()
@@ -0,0 +1,191 @@
+"""
+Rule-based English grapheme-to-phoneme conversion
+
+Estimates IPA for words that are not in the pronunciation lexicon (names,
+brand words, typos). Spelling is scanned once, left to right: at each
+position the longest matching grapheme from the tables below wins, with a
+few context rules (silent final e, magic e, soft c/g, word-initial kn/wr).
+The result is an approximation in the same symbols as AZURE_TO_IPA.
+"""
+from typing import Dict, List, Tuple
+
+Phones = Tuple[str, ...]
+
+VOWEL_LETTERS = frozenset("aeiou")
+FRONT_VOWEL_LETTERS = frozenset("eiy")
+
+# Multi-letter graphemes, matched longest first
+GRAPHEMES: Dict[str, Phones] = {
+    "tion": ("ʃ", "ə", "n"),
+    "sion": ("ʒ", "ə", "n"),
+    "ture": ("tʃ", "ɚ"),
+    "eigh": ("eɪ",),
+    "augh": ("ɔ",),
+    "ough": ("oʊ",),
+    "igh": ("aɪ",),
+    "tch": ("tʃ",),
+    "dge": ("dʒ",),
+    "air": ("ɛ", "ɹ"),
+    "ear": ("ɪ", "ɹ"),
+    "eer": ("ɪ", "ɹ"),
+    "our": ("aʊ", "ɚ"),
+    "ous": ("ə", "s"),
+    "sch": ("s", "k"),
+    "th": ("θ",),
+    "sh": ("ʃ",),
+    "ch": ("tʃ",),
+    "ph": ("f",),
+    "wh": ("w",),
+    "ck": ("k",),
+    "ng": ("ŋ",),
+    "nk": ("ŋ", "k"),
+    "qu": ("k", "w"),
+    "ee": ("i",),
+    "ea": ("i",),
+    "oo": ("u",),
+    "ou": ("aʊ",),
+    "ow": ("aʊ",),
+    "oi": ("ɔɪ",),
+    "oy": ("ɔɪ",),
+    "ai": ("eɪ",),
+    "ay": ("eɪ",),
+    "au": ("ɔ",),
+    "aw": ("ɔ",),
+    "ew": ("u",),
+    "ue": ("u",),
+    "oa": ("oʊ",),
+    "ey": ("i",),
+    "ie": ("i",),
+    "ar": ("ɑ", "ɹ"),
+    "or": ("ɔ", "ɹ"),
+    "er": ("ɚ",),
+    "ir": ("ɜ",),
+    "ur": ("ɜ",),
+}
+
+# Graphemes that only apply at the start of a word
+INITIAL_GRAPHEMES: Dict[str, Phones] = {
+    "kn": ("n",),
+    "wr": ("ɹ",),
+    "gn": ("n",),
+    "ps": ("s",),
+    "gh": ("ɡ",),
+}
+
+# Graphemes that only apply at the end of a word
+FINAL_GRAPHEMES: Dict[str, Phones] = {
+    "ow": ("oʊ",),
+    "ie": ("aɪ",),
+    "gh": (),
+    "mb": ("m",),
+}
+
+CONSONANTS: Dict[str, Phones] = {
+    "b": ("b",),
+    "c": ("k",),
+    "d": ("d",),
+    "f": ("f",),
+    "g": ("ɡ",),
+    "h": ("h",),
+    "j": ("dʒ",),
+    "k": ("k",),
+    "l": ("l",),
+    "m": ("m",),
+    "n": ("n",),
+    "p": ("p",),
+    "q": ("k",),
+    "r": ("ɹ",),
+    "s": ("s",),
+    "t": ("t",),
+    "v": ("v",),
+    "w": ("w",),
+    "x": ("k", "s"),
+    "z": ("z",),
+}
+
+SHORT_VOWELS: Dict[str, str] = {"a": "æ", "e": "ɛ", "i": "ɪ", "o": "ɑ", "u": "ʌ", "y": "ɪ"}
+LONG_VOWELS: Dict[str, str] = {"a": "eɪ", "e": "i", "i": "aɪ", "o": "oʊ", "u": "u", "y": "aɪ"}
+
+MAX_GRAPHEME_LENGTH = 4
+
+
+def word_to_phones(word: str) -> Phones:
+    """
+    Estimate the phones of one word
+
+    Args:
+        word: Lowercase word; characters other than a-z are ignored
+
+    Returns:
+        Tuple of IPA phones
+    """
+    letters = "".join(ch for ch in word if "a" <= ch <= "z")
+    length = len(letters)
+    has_vowel_before = [False] * (length + 1)
+    for index, ch in enumerate(letters):
+        has_vowel_before[index + 1] = has_vowel_before[index] or ch in VOWEL_LETTERS or (ch == "y" and index > 0)
+
+    phones: List[str] = []
+    index = 0
+    while index < length:
+        ch = letters[index]
+        rest = length - index
+
+        matched = None
+        for size in range(min(MAX_GRAPHEME_LENGTH, rest), 1, -1):
+            chunk = letters[index:index + size]
+            if index == 0 and chunk in INITIAL_GRAPHEMES:
+                matched = INITIAL_GRAPHEMES[chunk]
+            elif size == rest and chunk in FINAL_GRAPHEMES:
+                matched = FINAL_GRAPHEMES[chunk]
+            elif chunk in GRAPHEMES:
+                matched = GRAPHEMES[chunk]
+            if matched is not None:
+                break
+        if matched is not None:
+            phones.extend(matched)
+            index += size
+            continue
+
+        following = letters[index + 1] if index + 1 < length else ""
+
+        if ch in VOWEL_LETTERS or (ch == "y" and index > 0):
+            if ch == "e" and rest == 1 and has_vowel_before[index]:
+                # Silent final e ("make"); "-le" after a consonant is a syllable ("table")
+                if index > 0 and letters[index - 1] == "l" and index > 1 and letters[index - 2] not in VOWEL_LETTERS:
+                    phones[-1:] = ["ə", "l"]
+            elif ch == "e" and following == "d" and rest == 2 and has_vowel_before[index]:
+                # Past tense "-ed": voiced after vowels and voiced consonants, /ɪd/ after t or d
+                previous = letters[index - 1]
+                phones.extend(("ɪ", "d") if previous in "td" else ("t",) if previous in "pkfsx" else ("d",))
+                index += 1
+            elif rest == 1:
+                # Open final syllable ("go", "he", "my"); unstressed y after other vowels ("happy")
+                phones.append("i" if ch == "y" and has_vowel_before[index] else LONG_VOWELS[ch])
+            elif rest == 3 and letters[-1] == "e" and following not in VOWEL_LETTERS and following not in "wxy":
+                # Magic e ("time", "home")
+                phones.append(LONG_VOWELS[ch])
+            else:
+                phones.append(SHORT_VOWELS[ch])
+        elif ch == "y":
+            phones.append("j")
+        elif ch in CONSONANTS:
+            if ch == "c" and following in FRONT_VOWEL_LETTERS:
+                phones.append("s")
+            elif ch == "g" and following in FRONT_VOWEL_LETTERS:
+                phones.append("dʒ")
+            else:
+                phones.extend(CONSONANTS[ch])
+            if following == ch:
+                # Double consonants are one sound ("ball", "sitting")
+                index += 1
+        index += 1
+
+    return tuple(phones)
+
+
+def word_to_ipa(word: str) -> str:
+    """
+    Estimate space-separated IPA for one word (e.g. "zorblax" -> "z ɔ ɹ b l æ k s")
+    """
+    return " ".join(word_to_phones(word.lower()))
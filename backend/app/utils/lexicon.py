@@ -0,0 +1,348 @@
+"""
+Memory-mapped pronunciation lexicon
+
+The bundled CMU Pronouncing Dictionary (app/data/cmudict/cmudict.dict.gz,
+about 126k words) is compiled into a compact binary file that every
+worker maps read-only, so the pages are shared through the OS page cache
+instead of each process building a large dict. Lookups binary-search the
+sorted word table directly in the mapping.
+
+The compiled file is a build artifact: the Docker image and the Render
+build command build it. If it is missing at runtime it is built once from
+the bundled source on first lookup, into the system temp directory when
+the configured location is read-only (e.g. a Vercel bundle); if that fails
+too, the source is parsed into an in-memory dict instead. Regenerate it
+after changing the source dictionary:
+
+    python -m app.utils.lexicon build
+
+File layout (little-endian):
+    header          magic "LEX1", version (uint16), phone count (uint16),
+                    word count (uint32), pronunciation count (uint32)
+    phone table     phone count x 4-byte ASCII symbols (ARPABET with
+                    stress digit, NUL padded)
+    word offsets    (word count + 1) x uint32 into the word blob
+    word prons      (word count + 1) x uint32, first pronunciation of each word
+    pron offsets    (pronunciation count + 1) x uint32 into the phone blob
+    word blob       sorted lowercase UTF-8 words, concatenated
+    phone blob      one uint8 phone id per phone
+"""
+import argparse
+import gzip
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+DEFAULT_SOURCE_PATH = os.path.join(DATA_DIR, "cmudict", "cmudict.dict.gz")
+DEFAULT_LEXICON_PATH = os.path.join(DATA_DIR, "cmudict.lex")
+
+MAGIC = b"LEX1"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+PHONE_SYMBOL_SIZE = 4
+
+
+class LexiconError(Exception):
+    """Raised when a lexicon file is missing or malformed"""
+    pass
+
+
+class Lexicon:
+    """
+    Read-only word -> pronunciations lookup over a compiled lexicon file
+
+    The file is opened on first lookup. Pronunciations are returned as
+    tuples of ARPABET phones with stress digits (e.g. ("TH", "IH1", "NG", "K")),
+    in dictionary order, so the first one is the most common.
+    """
+
+    def __init__(self, path: str = DEFAULT_LEXICON_PATH, source_path: Optional[str] = DEFAULT_SOURCE_PATH):
+        """
+        Args:
+            path: Compiled lexicon file
+            source_path: Dictionary to compile if path does not exist (None disables building)
+        """
+        self.path = path
+        self.source_path = source_path
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._mmap: Optional[mmap.mmap] = None
+        self._phones: Tuple[str, ...] = ()
+        # Fallback when no compiled file can be opened or written
+        self._entries: Optional[Dict[str, List[Tuple[str, ...]]]] = None
+        # Set once loading has failed for good, so lookups do not retry it
+        self._load_error: Optional[str] = None
+        self.word_count = 0
+        self.pron_count = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self) -> int:
+        """
+        Open the lexicon now instead of on the first lookup
+
+        Returns:
+            Number of words
+
+        Raises:
+            LexiconError: If the file is missing and cannot be built
+        """
+        self._load()
+        return self.word_count
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            if self._load_error is not None:
+                raise LexiconError(self._load_error)
+            try:
+                path = self._compiled_path()
+                if path is not None:
+                    self._open(path)
+                else:
+                    self._load_source()
+            except (LexiconError, OSError) as e:
+                self._load_error = str(e)
+                raise LexiconError(self._load_error)
+            self._loaded = True
+
+    def _compiled_path(self) -> Optional[str]:
+        """
+        Path of a compiled lexicon, building one if needed
+
+        Returns:
+            The compiled file, or None if none exists or can be written
+            (the source is then read into memory)
+        """
+        if sys.byteorder != "little":
+            # The compiled format is little-endian
+            if not self.source_path or not os.path.exists(self.source_path):
+                raise LexiconError("Compiled lexicon requires a little-endian platform")
+            return None
+        if os.path.exists(self.path):
+            return self.path
+        if not self.source_path or not os.path.exists(self.source_path):
+            raise LexiconError(f"Lexicon file {self.path} not found")
+
+        # Shared by the workers on this host; named after the source so an
+        # updated dictionary is not shadowed by an old build
+        source = os.stat(self.source_path)
+        temp_path = os.path.join(
+            tempfile.gettempdir(),
+            f"speaksharp-lexicon-v{VERSION}-{source.st_size}-{int(source.st_mtime)}.lex"
+        )
+        if os.path.exists(temp_path):
+            return temp_path
+
+        for path in (self.path, temp_path):
+            if not os.access(os.path.dirname(os.path.abspath(path)), os.W_OK):
+                continue
+            logger.warning(f"Lexicon {self.path} not found, building {path} from {self.source_path}")
+            try:
+                build_lexicon(self.source_path, path)
+                return path
+            except OSError as e:
+                logger.warning(f"Cannot write lexicon {path}: {str(e)}")
+        return None
+
+    def _load_source(self) -> None:
+        logger.warning(f"Reading {self.source_path} into memory (no compiled lexicon available)")
+        entries = read_cmudict(self.source_path)
+        self._entries = {word: [tuple(pron) for pron in prons] for word, prons in entries.items()}
+        self.word_count = len(self._entries)
+        self.pron_count = sum(len(prons) for prons in self._entries.values())
+
+    def _open(self, path: str) -> None:
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, phone_count, word_count, pron_count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise LexiconError(f"{path} is not a version {VERSION} lexicon file")
+
+        offset = HEADER.size
+        phones = []
+        for index in range(phone_count):
+            start = offset + index * PHONE_SYMBOL_SIZE
+            phones.append(data[start:start + PHONE_SYMBOL_SIZE].rstrip(b"\0").decode("ascii"))
+        offset += phone_count * PHONE_SYMBOL_SIZE
+
+        view = memoryview(data)
+        self._word_offsets = view[offset:offset + (word_count + 1) * 4].cast("I")
+        offset += (word_count + 1) * 4
+        self._word_prons = view[offset:offset + (word_count + 1) * 4].cast("I")
+        offset += (word_count + 1) * 4
+        self._pron_offsets = view[offset:offset + (pron_count + 1) * 4].cast("I")
+        offset += (pron_count + 1) * 4
+        self._words_start = offset
+        self._phones_start = offset + self._word_offsets[word_count]
+
+        self._mmap = data
+        self._phones = tuple(phones)
+        self.word_count = word_count
+        self.pron_count = pron_count
+        logger.info(f"Loaded lexicon {path} ({word_count} words, {pron_count} pronunciations)")
+
+    def _word_at(self, index: int) -> bytes:
+        start = self._words_start + self._word_offsets[index]
+        end = self._words_start + self._word_offsets[index + 1]
+        return self._mmap[start:end]
+
+    def _find(self, key: bytes) -> int:
+        low, high = 0, self.word_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._word_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.word_count and self._word_at(low) == key:
+            return low
+        return -1
+
+    def lookup(self, word: str) -> List[Tuple[str, ...]]:
+        """
+        Get all pronunciations of a word
+
+        Args:
+            word: English word (case-insensitive)
+
+        Returns:
+            List of ARPABET phone tuples, empty if the word is unknown
+        """
+        self._load()
+        if self._entries is not None:
+            return list(self._entries.get(word.lower(), ()))
+        index = self._find(word.lower().encode("utf-8"))
+        if index < 0:
+            return []
+
+        pronunciations = []
+        for pron in range(self._word_prons[index], self._word_prons[index + 1]):
+            start = self._phones_start + self._pron_offsets[pron]
+            end = self._phones_start + self._pron_offsets[pron + 1]
+            pronunciations.append(tuple(self._phones[phone_id] for phone_id in self._mmap[start:end]))
+        return pronunciations
+
+    def __contains__(self, word: str) -> bool:
+        self._load()
+        if self._entries is not None:
+            return word.lower() in self._entries
+        return self._find(word.lower().encode("utf-8")) >= 0
+
+    def __len__(self) -> int:
+        self._load()
+        return self.word_count
+
+
+def read_cmudict(source_path: str) -> Dict[str, List[List[str]]]:
+    """
+    Parse a CMUdict-format file (plain or .gz)
+
+    Lines look like "word PH1 PH2" or "word(2) PH1 PH2", optionally
+    followed by a "# comment".
+
+    Returns:
+        Mapping of lowercase word to its pronunciations, in file order
+    """
+    opener = gzip.open if source_path.endswith(".gz") else open
+    entries: Dict[str, List[List[str]]] = {}
+    with opener(source_path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            word, *phones = line.split()
+            if "(" in word and word.endswith(")"):
+                word = word[:word.index("(")]
+            entries.setdefault(word.lower(), []).append(phones)
+    return entries
+
+
+def build_lexicon(source_path: str, output_path: str) -> Tuple[int, int]:
+    """
+    Compile a CMUdict-format source into the binary lexicon format
+
+    The file is written next to output_path and renamed into place, so
+    running workers keep their mapping of the old file.
+
+    Returns:
+        Tuple of (word count, pronunciation count)
+    """
+    entries = read_cmudict(source_path)
+    phone_symbols = sorted({phone for prons in entries.values() for pron in prons for phone in pron})
+    if len(phone_symbols) > 255:
+        raise LexiconError(f"Too many distinct phones ({len(phone_symbols)}) for one-byte ids")
+    phone_ids = {phone: index for index, phone in enumerate(phone_symbols)}
+
+    words = sorted(entries, key=lambda w: w.encode("utf-8"))
+    word_blob = bytearray()
+    phone_blob = bytearray()
+    word_offsets = [0]
+    word_prons = [0]
+    pron_offsets = [0]
+    for word in words:
+        word_blob += word.encode("utf-8")
+        word_offsets.append(len(word_blob))
+        for pron in entries[word]:
+            phone_blob += bytes(phone_ids[phone] for phone in pron)
+            pron_offsets.append(len(phone_blob))
+        word_prons.append(len(pron_offsets) - 1)
+
+    pron_count = len(pron_offsets) - 1
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(phone_symbols), len(words), pron_count))
+        for phone in phone_symbols:
+            f.write(phone.encode("ascii").ljust(PHONE_SYMBOL_SIZE, b"\0"))
+        for table in (word_offsets, word_prons, pron_offsets):
+            f.write(struct.pack(f"<{len(table)}I", *table))
+        f.write(word_blob)
+        f.write(phone_blob)
+    os.replace(temp_path, output_path)
+    return len(words), pron_count
+
+
+# Global instance
+lexicon = Lexicon(settings.LEXICON_PATH or DEFAULT_LEXICON_PATH)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pronunciation lexicon tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="Compile a CMUdict-format file")
+    build.add_argument("--source", default=DEFAULT_SOURCE_PATH, help="CMUdict source (plain or .gz)")
+    build.add_argument("--output", default=DEFAULT_LEXICON_PATH, help="Compiled lexicon path")
+    lookup = subparsers.add_parser("lookup", help="Print the pronunciations of words")
+    lookup.add_argument("--lexicon", default=DEFAULT_LEXICON_PATH, help="Compiled lexicon path")
+    lookup.add_argument("words", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        word_count, pron_count = build_lexicon(args.source, args.output)
+        print(f"Wrote {args.output}: {word_count} words, {pron_count} pronunciations, "
+              f"{os.path.getsize(args.output)} bytes")
+    else:
+        lexicon = Lexicon(args.lexicon)
+        for word in args.words:
+            prons = lexicon.lookup(word)
+            print(f"{word}: " + (" | ".join(" ".join(pron) for pron in prons) if prons else "(not found)"))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,19 @@ Azure uses ARPABET/SAMPA format phonemes.
 This module maps them to International Phonetic Alphabet (IPA) symbols.
 """
 
-from typing import Dict, List, Optional
+import logging
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from app.core.config import settings
+from app.utils.g2p import word_to_ipa
+from app.utils.lexicon import lexicon, LexiconError
+
+logger = logging.getLogger(__name__)
+
+# Words in reference text (keeps inner apostrophes: "don't")
+WORD_PATTERN = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)*")
 
 
 # Azure ARPABET/SAMPA to IPA mapping
@@ -106,35 +118,40 @@ def azure_word_to_ipa(azure_phonemes: List[str]) -> str:
     return " ".join(ipa_symbols)
 
 
+# CMUdict phones that differ from the Azure mapping: unstressed vowels
+# with a reduced IPA form, and ARPABET spellings Azure does not use
+CMUDICT_IPA_OVERRIDES: Dict[str, str] = {
+    "AH0": "ə",   # "about"
+    "ER0": "ɚ",   # "better"
+    "HH": "h",
+}
+
+
+def arpabet_to_ipa(phones: Sequence[str]) -> str:
+    """
+    Convert a CMUdict pronunciation to a space-separated IPA string
+
+    Args:
+        phones: ARPABET phones with stress digits (e.g. ["S", "EH1", "V", "AH0", "N"])
+
+    Returns:
+        IPA transcription string (e.g. "s ɛ v ə n")
+    """
+    return " ".join(CMUDICT_IPA_OVERRIDES.get(phone) or azure_to_ipa(phone) for phone in phones)
+
+
 def text_to_ipa_estimate(text: str) -> str:
     """
-    Rough estimate of IPA for English text
-    (Not accurate, just for display when Azure doesn't provide phonemes)
+    Expected IPA for English text, word by word
+    (dictionary pronunciations, spelling-based estimates for unknown words)
 
     Args:
         text: English word or phrase
 
     Returns:
-        Estimated IPA (very rough approximation)
+        Space-separated IPA for all words
     """
-    # This is a simplified mapping - real IPA requires pronunciation dictionary
-    simple_map = {
-        "th": "θ",
-        "sh": "ʃ",
-        "ch": "tʃ",
-        "ng": "ŋ",
-        "a": "æ",
-        "e": "ɛ",
-        "i": "ɪ",
-        "o": "ɑ",
-        "u": "ʌ",
-    }
-
-    result = text.lower()
-    for eng, ipa in simple_map.items():
-        result = result.replace(eng, ipa)
-
-    return " ".join(result)
+    return " ".join(ipa for ipa in get_expected_ipa_for_words(WORD_PATTERN.findall(text)) if ipa)
 
 
 # Common English words to IPA (for testing/demo)
@@ -179,14 +196,69 @@ COMMON_WORDS_IPA: Dict[str, str] = {
 }
 
 
-def get_expected_ipa(word: str) -> Optional[str]:
+def get_expected_ipa(word: str, estimate: bool = False) -> Optional[str]:
     """
-    Get expected IPA for common words
+    Get expected IPA for a word
+
+    Uses the curated COMMON_WORDS_IPA entries first, then the most common
+    pronunciation from the CMUdict lexicon, then (with estimate) the
+    rule-based spelling estimate. Results are memoized per word.
 
     Args:
         word: English word
+        estimate: Estimate IPA for words missing from the dictionary
 
     Returns:
         IPA transcription if known, None otherwise
     """
-    return COMMON_WORDS_IPA.get(word.lower())
+    return _expected_ipa(_normalize_word(word), estimate)
+
+
+def get_expected_ipa_for_words(words: Iterable[str], estimate: bool = True) -> List[Optional[str]]:
+    """
+    Get expected IPA for many words at once (e.g. every word of a sentence)
+
+    Args:
+        words: English words
+        estimate: Estimate IPA for words missing from the dictionary
+
+    Returns:
+        One IPA transcription (or None) per word, in order
+    """
+    return [_expected_ipa(_normalize_word(word), estimate) for word in words]
+
+
+@lru_cache(maxsize=settings.EXPECTED_IPA_CACHE_SIZE)
+def _expected_ipa(key: str, estimate: bool) -> Optional[str]:
+    if key in COMMON_WORDS_IPA:
+        return COMMON_WORDS_IPA[key]
+
+    variants = get_expected_ipa_variants(key)
+    if variants:
+        return variants[0]
+    if estimate and key:
+        return word_to_ipa(key) or None
+    return None
+
+
+def get_expected_ipa_variants(word: str) -> List[str]:
+    """
+    Get every dictionary pronunciation of a word (e.g. both readings of "read")
+
+    Args:
+        word: English word
+
+    Returns:
+        IPA transcriptions, most common first; empty if the word is unknown
+    """
+    try:
+        pronunciations = lexicon.lookup(_normalize_word(word))
+    except (LexiconError, OSError) as e:
+        logger.error(f"Pronunciation lexicon unavailable: {str(e)}")
+        return []
+    return [arpabet_to_ipa(pron) for pron in pronunciations]
+
+
+def _normalize_word(word: str) -> str:
+    """Lowercase and strip surrounding punctuation (keeps inner apostrophes)"""
+    return word.strip().strip(".,!?;:\"()[]").lower()
@@ -0,0 +1,9 @@
+"""
+Offline benchmarks for the SpeakSharp API
+
+    python -m benchmarks.micro    # microbenchmarks of the assessment stages
+    python -m benchmarks.load     # load test of /api/score against the fake speech provider
+
+Both run from backend/ without network access or an Azure key and write a
+JSON report (--output) for comparing builds.
+"""
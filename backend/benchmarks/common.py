@@ -0,0 +1,150 @@
+"""Timing statistics, fixtures and JSON reports shared by the benchmarks"""
+import io
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+import wave
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCHMARKS_DIR, "fixtures")
+AZURE_FIXTURES_DIR = os.path.join(FIXTURES_DIR, "azure")
+
+SAMPLE_RATE = 16000
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples: List[float], scale: float = 1.0) -> Dict[str, float]:
+    """
+    Mean, min, max and p50/p95/p99 of timing samples
+
+    Args:
+        samples: Durations in seconds
+        scale: Multiplier for the reported values (1e3 for ms, 1e6 for us)
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered) * scale, 3),
+        "min": round(ordered[0] * scale, 3),
+        "p50": round(percentile(ordered, 0.50) * scale, 3),
+        "p95": round(percentile(ordered, 0.95) * scale, 3),
+        "p99": round(percentile(ordered, 0.99) * scale, 3),
+        "max": round(ordered[-1] * scale, 3)
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """Build and host details recorded with every report"""
+    try:
+        revision: Optional[str] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCHMARKS_DIR, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=5
+        ).stdout.decode().strip() or None
+    except (OSError, subprocess.SubprocessError):
+        revision = None
+    return {
+        "git_revision": revision,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    }
+
+
+def write_report(path: Optional[str], report: Dict[str, Any]) -> None:
+    """Write a report as JSON (to stdout when path is None or "-")"""
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if not path or path == "-":
+        print(text)
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+    print(f"Wrote {path}", file=sys.stderr)
+
+
+def load_azure_fixture(name: str) -> Dict[str, Any]:
+    """Azure detailed JSON result from fixtures/azure/<name>.json"""
+    with open(os.path.join(AZURE_FIXTURES_DIR, f"{name}.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def speech_like_pcm(seconds: float = 2.0, seed: int = 0, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Voiced, syllable-rate modulated signal with background noise
+
+    Not speech, but it has the pitch, envelope and noise floor that codecs
+    and voice activity checks react to, so decoding costs are realistic.
+
+    Returns:
+        int16 samples
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 120 + 20 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 12))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) ** 2
+    signal = 0.3 * voiced * envelope + 0.01 * rng.standard_normal(t.size)
+    return (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+
+
+def encode_audio(
+    pcm: np.ndarray,
+    audio_format: str,
+    ffmpeg: Optional[str] = None,
+    sample_rate: int = SAMPLE_RATE,
+    channels: int = 1
+) -> Optional[bytes]:
+    """
+    Encode int16 PCM as an upload in the given format
+
+    Args:
+        pcm: Mono samples at sample_rate (duplicated when channels=2)
+        audio_format: wav, webm (Opus) or mp3
+        ffmpeg: ffmpeg path; needed for anything but WAV
+        sample_rate: Sample rate of pcm
+        channels: Output channels
+
+    Returns:
+        Encoded bytes, or None if the format needs ffmpeg and it is missing
+    """
+    raw = np.repeat(pcm, channels).tobytes() if channels > 1 else pcm.tobytes()
+    if audio_format == "wav":
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav_file:
+            wav_file.setnchannels(channels)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(sample_rate)
+            wav_file.writeframes(raw)
+        return buffer.getvalue()
+
+    if ffmpeg is None:
+        return None
+    codec = {
+        "webm": ["-f", "webm", "-c:a", "libopus", "-b:a", "32k"],
+        "mp3": ["-f", "mp3", "-c:a", "libmp3lame", "-b:a", "64k"]
+    }[audio_format]
+    result = subprocess.run(
+        [ffmpeg, "-hide_banner", "-loglevel", "error",
+         "-f", "s16le", "-ar", str(sample_rate), "-ac", str(channels), "-i", "pipe:0", *codec, "pipe:1"],
+        input=raw, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=60
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg could not encode {audio_format}: {result.stderr.decode(errors='replace')}")
+    return result.stdout
@@ -0,0 +1,253 @@
+"""
+Load test of /api/score
+
+    python -m benchmarks.load --concurrency 16 --duration 30 --output load.json
+    python -m benchmarks.load --rate 40 --duration 60 --workers 2 --latency-ms 400
+    python -m benchmarks.load --url http://staging:8001 --format webm
+
+Without --url a local server is started (uvicorn app.main:app) with
+SPEECH_PROVIDER=fake, so Azure is replaced by a stand-in answering after
+--latency-ms (+ up to --jitter-ms). The spawned server runs without the
+assessment cache (identical uploads would otherwise be cache hits; see
+--cache) and without Allosaurus (see --allosaurus).
+
+Load is closed-loop by default: --concurrency clients each send the next
+request as soon as the previous one is answered. With --rate, requests
+start on a fixed schedule instead and latency is measured from the
+scheduled start, so a slow server shows up in the percentiles rather than
+as a lower request rate.
+
+The report has throughput, status counts, latency mean/p50/p95/p99/max in
+milliseconds and, from the server's /metrics, the mean time per pipeline
+stage during the run (for the worker that answered the scrape).
+"""
+import argparse
+import asyncio
+import base64
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.common import encode_audio, environment, speech_like_pcm, summarize, write_report
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_START_TIMEOUT_SECONDS = 60.0
+DEFAULT_TEXT = "The weather is really rough this evening, but I think we should leave the village early."
+
+STAGE_METRIC_PATTERN = re.compile(r'^speaksharp_stage_duration_seconds_(sum|count)\{stage="([^"]+)"\} (\S+)$', re.M)
+
+
+class LoadResult:
+    """Outcomes of the measured requests"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Dict[str, int] = {}
+
+    def record(self, status: str, latency: float) -> None:
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status == "200":
+            self.latencies.append(latency)
+
+
+def start_server(args: argparse.Namespace) -> Tuple[subprocess.Popen, str]:
+    """Start uvicorn with the fake speech provider; returns (process, base URL)"""
+    env = dict(os.environ)
+    env.update({
+        "SPEECH_PROVIDER": "fake",
+        "FAKE_SPEECH_LATENCY_MS": str(args.latency_ms),
+        "FAKE_SPEECH_JITTER_MS": str(args.jitter_ms),
+        "DEBUG": "False",
+        "ASSESSMENT_CACHE_ENABLED": str(args.cache),
+    })
+    if not args.allosaurus:
+        env["PHONEME_BACKEND"] = "off"
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--host", "127.0.0.1", "--port", str(args.port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env
+    )
+    return process, f"http://127.0.0.1:{args.port}"
+
+
+def wait_until_ready(url: str, process: Optional[subprocess.Popen]) -> None:
+    deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{url}/health/ready", timeout=2.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"Server at {url} not ready after {SERVER_START_TIMEOUT_SECONDS:.0f}s")
+
+
+def build_body(args: argparse.Namespace) -> Dict[str, Any]:
+    """The /api/score request body sent by every client"""
+    ffmpeg = None
+    if args.format != "wav":
+        from app.services.audio_decoder import audio_decoder
+        if not audio_decoder.probe():
+            raise RuntimeError(f"ffmpeg is needed to encode {args.format} uploads")
+        ffmpeg = audio_decoder.ffmpeg_path
+    audio = encode_audio(speech_like_pcm(args.audio_seconds), args.format, ffmpeg)
+    body: Dict[str, Any] = {"audio_data": base64.b64encode(audio).decode("ascii"), "audio_format": args.format}
+    if args.exercise_id:
+        body["exercise_id"] = args.exercise_id
+    else:
+        body["text"] = args.text
+    return body
+
+
+async def send(client: httpx.AsyncClient, url: str, body: Dict[str, Any]) -> str:
+    try:
+        response = await client.post(f"{url}/api/score", json=body)
+        return str(response.status_code)
+    except httpx.HTTPError as e:
+        return type(e).__name__
+
+
+async def closed_loop(client: httpx.AsyncClient, url: str, body: Dict[str, Any], args: argparse.Namespace, result: LoadResult, measure_from: float, stop_at: float) -> None:
+    async def client_loop() -> None:
+        while time.perf_counter() < stop_at and (args.requests is None or sum(result.statuses.values()) < args.requests):
+            started = time.perf_counter()
+            status = await send(client, url, body)
+            if started >= measure_from:
+                result.record(status, time.perf_counter() - started)
+
+    await asyncio.gather(*(client_loop() for _ in range(args.concurrency)))
+
+
+async def open_loop(client: httpx.AsyncClient, url: str, body: Dict[str, Any], args: argparse.Namespace, result: LoadResult, measure_from: float, stop_at: float) -> None:
+    async def one(scheduled: float) -> None:
+        status = await send(client, url, body)
+        if scheduled >= measure_from:
+            result.record(status, time.perf_counter() - scheduled)
+
+    tasks = []
+    start = time.perf_counter()
+    index = 0
+    while True:
+        scheduled = start + index / args.rate
+        if scheduled >= stop_at or (args.requests is not None and index >= args.requests):
+            break
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(one(scheduled)))
+        index += 1
+    await asyncio.gather(*tasks)
+
+
+async def scrape_stages(client: httpx.AsyncClient, url: str) -> Dict[str, Dict[str, float]]:
+    """Stage duration sums and counts from /metrics (empty if unavailable)"""
+    try:
+        response = await client.get(f"{url}/metrics")
+    except httpx.HTTPError:
+        return {}
+    if response.status_code != 200:
+        return {}
+    stages: Dict[str, Dict[str, float]] = {}
+    for kind, stage, value in STAGE_METRIC_PATTERN.findall(response.text):
+        stages.setdefault(stage, {"sum": 0.0, "count": 0.0})[kind] = float(value)
+    return stages
+
+
+async def run(args: argparse.Namespace, url: str) -> Dict[str, Any]:
+    body = build_body(args)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+        result = LoadResult()
+        started = time.perf_counter()
+        measure_from = started + args.warmup
+        stop_at = measure_from + args.duration
+
+        # Scraped when measuring starts (after the warm-up) and at the end
+        async def scrape_after_warmup() -> Dict[str, Dict[str, float]]:
+            await asyncio.sleep(args.warmup)
+            return await scrape_stages(client, url)
+
+        before_task = asyncio.ensure_future(scrape_after_warmup())
+        if args.rate:
+            await open_loop(client, url, body, args, result, measure_from, stop_at)
+        else:
+            await closed_loop(client, url, body, args, result, measure_from, stop_at)
+        before = await before_task
+        after = await scrape_stages(client, url)
+        elapsed = max(1e-9, min(time.perf_counter(), stop_at) - measure_from)
+
+    stages = {}
+    for stage, totals in after.items():
+        count = totals["count"] - before.get(stage, {}).get("count", 0.0)
+        if count > 0:
+            total = totals["sum"] - before.get(stage, {}).get("sum", 0.0)
+            stages[stage] = {"count": int(count), "mean_ms": round(total / count * 1000, 3)}
+
+    measured = sum(result.statuses.values())
+    return {
+        "requests": measured,
+        "ok": len(result.latencies),
+        "errors": measured - len(result.latencies),
+        "status_counts": result.statuses,
+        "duration_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(result.latencies) / elapsed, 3),
+        "latency_ms": summarize(result.latencies, scale=1e3),
+        "server_stages": stages
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test of /api/score")
+    parser.add_argument("--url", help="Server to test; omitted starts a local one with the fake speech provider")
+    parser.add_argument("--port", type=int, default=8765, help="Port of the local server")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers of the local server")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Fake Azure round trip (local server)")
+    parser.add_argument("--jitter-ms", type=float, default=100.0, help="Fake Azure extra delay, up to (local server)")
+    parser.add_argument("--cache", action="store_true", help="Keep the assessment cache on (local server)")
+    parser.add_argument("--allosaurus", action="store_true", help="Keep PHONEME_BACKEND as configured (local server)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Clients (closed loop) or connections (with --rate)")
+    parser.add_argument("--rate", type=float, help="Requests per second on a fixed schedule (open loop)")
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds")
+    parser.add_argument("--requests", type=int, help="Stop after this many requests")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of load before measuring")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--format", choices=("wav", "webm", "mp3"), default="wav", help="Upload format")
+    parser.add_argument("--audio-seconds", type=float, default=2.0, help="Length of the uploaded audio")
+    parser.add_argument("--text", default=DEFAULT_TEXT, help="Reference text")
+    parser.add_argument("--exercise-id", help="Send a drill id instead of --text")
+    parser.add_argument("--output", default="-", help="JSON report path (- for stdout)")
+    args = parser.parse_args()
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_server(args)
+    try:
+        wait_until_ready(url, process)
+        summary = asyncio.run(run(args, url))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    latency = summary["latency_ms"]
+    print(
+        f"{summary['throughput_rps']} req/s, p50 {latency.get('p50')}ms, p95 {latency.get('p95')}ms, "
+        f"p99 {latency.get('p99')}ms, {summary['errors']} errors",
+        file=sys.stderr
+    )
+    write_report(args.output, {"benchmark": "load", "environment": environment(), "config": config, **summary})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Microbenchmarks of the assessment stages
+
+    python -m benchmarks.micro [--filter azure_parse] [--min-time 0.5] [--output micro.json]
+
+Cases:
+    azure_parse/*       AzureSpeechService._parse_azure_result on the payloads
+                        in fixtures/azure (word, sentence, paragraph)
+    phoneme_mapper/*    ARPABET to IPA and expected IPA lookups (memoized and cold)
+    error_patterns/*    phoneme_aligner.analyze_error_patterns on parsed words
+                        and on an IPA transcript
+    decode/*            audio_decoder.decode of synthetic 2s uploads (wav
+                        16kHz mono, wav 44.1kHz stereo, wav 48kHz mono, mp3,
+                        webm); the ffmpeg cases are skipped without ffmpeg
+
+Each case runs for at least --min-time seconds (and --min-iterations
+calls) after a warm-up; the report has per-call mean, min, max and
+p50/p95/p99 in microseconds.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.common import encode_audio, environment, load_azure_fixture, speech_like_pcm, summarize, write_report
+
+AZURE_FIXTURES = ("word", "sentence", "paragraph")
+
+Case = Tuple[str, Callable[[], Any]]
+
+
+def azure_parse_cases() -> List[Case]:
+    from app.core.azure_speech import azure_speech_service
+    from app.core.fake_speech import FakeRecognitionResult
+    from app.utils.phoneme_mapper import text_to_ipa_estimate
+
+    cases: List[Case] = []
+    for name in AZURE_FIXTURES:
+        payload = load_azure_fixture(name)
+        text = payload["DisplayText"]
+        result = FakeRecognitionResult(text, json.dumps(payload, ensure_ascii=False))
+        cases.append((f"azure_parse/{name}", lambda r=result, t=text: azure_speech_service._parse_azure_result(r, t)))
+
+    # A drill: expected IPA precompiled, no per-word lookups
+    payload = load_azure_fixture("sentence")
+    text = payload["DisplayText"]
+    result = FakeRecognitionResult(text, json.dumps(payload, ensure_ascii=False))
+    expected_ipa = text_to_ipa_estimate(text)
+    cases.append((
+        "azure_parse/sentence_precompiled",
+        lambda: azure_speech_service._parse_azure_result(result, text, expected_ipa)
+    ))
+    return cases
+
+
+def phoneme_mapper_cases() -> List[Case]:
+    from app.utils import phoneme_mapper
+
+    payload = load_azure_fixture("paragraph")
+    text = payload["DisplayText"]
+    words = phoneme_mapper.WORD_PATTERN.findall(text)
+    symbols = [p["Phoneme"] for w in payload["NBest"][0]["Words"] for p in w.get("Phonemes", ())]
+
+    def cold_lookup() -> None:
+        phoneme_mapper._expected_ipa.cache_clear()
+        phoneme_mapper.get_expected_ipa_for_words(words)
+
+    return [
+        ("phoneme_mapper/azure_to_ipa_paragraph", lambda: [phoneme_mapper.azure_to_ipa(s) for s in symbols]),
+        ("phoneme_mapper/azure_word_to_ipa_paragraph", lambda: phoneme_mapper.azure_word_to_ipa(symbols)),
+        ("phoneme_mapper/text_to_ipa_estimate_paragraph", lambda: phoneme_mapper.text_to_ipa_estimate(text)),
+        ("phoneme_mapper/expected_ipa_paragraph_cold", cold_lookup)
+    ]
+
+
+def error_pattern_cases() -> List[Case]:
+    from app.core.azure_speech import azure_speech_service
+    from app.core.fake_speech import FakeRecognitionResult
+    from app.services.phoneme_alignment import phoneme_aligner
+
+    cases: List[Case] = []
+    for name in ("sentence", "paragraph"):
+        payload = load_azure_fixture(name)
+        text = payload["DisplayText"]
+        parsed = azure_speech_service._parse_azure_result(
+            FakeRecognitionResult(text, json.dumps(payload, ensure_ascii=False)), text
+        )
+        words = parsed["words"]
+        cases.append((
+            f"error_patterns/words_{name}",
+            lambda w=words, t=text: phoneme_aligner.analyze_error_patterns(w, expected_text=t)
+        ))
+        # Allosaurus path: the whole transcript against the text
+        transcript = parsed["ipa_transcription"]
+        cases.append((
+            f"error_patterns/transcript_{name}",
+            lambda t=text, ipa=transcript: phoneme_aligner.analyze_error_patterns([], expected_text=t, recognized_ipa=ipa)
+        ))
+    return cases
+
+
+def decode_cases() -> List[Case]:
+    from app.services.audio_decoder import audio_decoder
+
+    ffmpeg = audio_decoder.ffmpeg_path if audio_decoder.probe() else None
+    pcm = speech_like_pcm(2.0)
+    # name -> (upload, format); WAV is decoded in process, the rest by ffmpeg
+    fixtures = {
+        "wav_16k_mono": (encode_audio(pcm, "wav"), "wav"),
+        "wav_44k_stereo": (
+            encode_audio(speech_like_pcm(2.0, sample_rate=44100), "wav", sample_rate=44100, channels=2), "wav"
+        ),
+        "wav_48k_mono": (encode_audio(speech_like_pcm(2.0, sample_rate=48000), "wav", sample_rate=48000), "wav"),
+        "mp3": (encode_audio(pcm, "mp3", ffmpeg), "mp3"),
+        "webm": (encode_audio(pcm, "webm", ffmpeg), "webm")
+    }
+    loop = asyncio.new_event_loop()
+    cases: List[Case] = []
+    for name, (data, audio_format) in fixtures.items():
+        if ffmpeg is None and audio_format != "wav":
+            print(f"Skipping decode/{name}: ffmpeg not available", file=sys.stderr)
+            continue
+        cases.append((
+            f"decode/{name}",
+            lambda d=data, f=audio_format: loop.run_until_complete(audio_decoder.decode(d, f))
+        ))
+    return cases
+
+
+def run_case(function: Callable[[], Any], min_time: float, min_iterations: int, warmup: int) -> Dict[str, float]:
+    """Time single calls of function; returns summarize() in microseconds"""
+    for _ in range(warmup):
+        function()
+    samples: List[float] = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < min_iterations or time.perf_counter() < deadline:
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples, scale=1e6)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SpeakSharp microbenchmarks")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Seconds per case")
+    parser.add_argument("--min-iterations", type=int, default=20, help="Calls per case at least")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed calls before timing")
+    parser.add_argument("--output", default="-", help="JSON report path (- for stdout)")
+    parser.add_argument("--log-level", default="WARNING", help="Log level while benchmarking")
+    args = parser.parse_args()
+
+    # Importing app modules configures nothing, so logging stays at this level
+    logging.basicConfig(level=args.log_level, format="%(levelname)s %(name)s: %(message)s")
+
+    cases: List[Case] = []
+    for group in (azure_parse_cases, phoneme_mapper_cases, error_pattern_cases, decode_cases):
+        cases.extend(group())
+
+    results = []
+    for name, function in cases:
+        if args.filter not in name:
+            continue
+        stats = run_case(function, args.min_time, args.min_iterations, args.warmup)
+        results.append({"name": name, "unit": "us", **stats})
+        print(f"{name:48s} p50 {stats['p50']:>10.1f}us  p99 {stats['p99']:>10.1f}us  ({stats['count']} calls)", file=sys.stderr)
+
+    write_report(args.output, {"benchmark": "micro", "environment": environment(), "results": results})
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,10 @@
 """Vercel serverless function entry point"""
+import os
+
+# Every cold start is a request waiting: load backends on first use rather
+# than warming all of them (STARTUP_WARMUP can still override this)
+os.environ.setdefault("STARTUP_WARMUP", "off")
+
 from app.main import app
 
 # Export the FastAPI app for Vercel
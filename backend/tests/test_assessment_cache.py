@@ -0,0 +1,141 @@
+"""Assessment result cache (app.services.assessment_cache.AssessmentCache)"""
+import asyncio
+import time
+
+import pytest
+
+from app.services.assessment_cache import AssessmentCache
+
+KEY = "a" * 64
+
+
+class Assessor:
+    """Counts computations; each takes a moment so concurrent callers overlap"""
+
+    def __init__(self, result=None, error=None):
+        self.calls = 0
+        self.result = result if result is not None else {"success": True, "overall_score": 80.0, "words": []}
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        if self.error is not None:
+            raise self.error
+        return dict(self.result)
+
+
+def make_cache(**kwargs) -> AssessmentCache:
+    kwargs.setdefault("max_bytes", 1 << 20)
+    kwargs.setdefault("ttl_seconds", 60)
+    return AssessmentCache(**kwargs)
+
+
+def test_concurrent_requests_share_one_computation():
+    cache = make_cache()
+    assess = Assessor()
+
+    async def main():
+        return await asyncio.gather(*[cache.get_or_compute(KEY, assess) for _ in range(5)])
+
+    results = asyncio.run(main())
+
+    assert assess.calls == 1
+    assert all(result == results[0] for result in results)
+    # Every caller gets its own copy
+    results[0]["words"].append("changed")
+    assert results[1]["words"] == []
+    assert cache.get_stats()["coalesced"] == 4
+
+
+def test_hits_are_copies_of_the_cached_result():
+    cache = make_cache()
+    assess = Assessor()
+
+    first = asyncio.run(cache.get_or_compute(KEY, assess))
+    first["overall_score"] = 0.0
+    second = asyncio.run(cache.get_or_compute(KEY, assess))
+
+    assert assess.calls == 1
+    assert second["overall_score"] == 80.0
+
+
+def test_entries_expire():
+    cache = make_cache(ttl_seconds=0.05)
+    assess = Assessor()
+
+    asyncio.run(cache.get_or_compute(KEY, assess))
+    time.sleep(0.1)
+    asyncio.run(cache.get_or_compute(KEY, assess))
+
+    assert assess.calls == 2
+
+
+def test_failures_are_not_cached():
+    cache = make_cache()
+    assess = Assessor(result={"success": False, "message": "No speech detected in audio"})
+
+    asyncio.run(cache.get_or_compute(KEY, assess))
+    asyncio.run(cache.get_or_compute(KEY, assess))
+
+    assert assess.calls == 2
+
+
+def test_errors_reach_every_waiting_caller():
+    cache = make_cache()
+    assess = Assessor(error=RuntimeError("Azure down"))
+
+    async def main():
+        return await asyncio.gather(*[cache.get_or_compute(KEY, assess) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(main())
+
+    assert assess.calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert cache.get_stats()["entries"] == 0
+    assert cache.get_stats()["inflight"] == 0
+
+
+def without_ipa(result) -> bool:
+    return not result.get("ipa_transcription")
+
+
+@pytest.mark.parametrize("partial_ttl_seconds, calls", [(0, 3), (60, 1)])
+def test_partial_results_use_their_own_ttl(partial_ttl_seconds, calls):
+    cache = make_cache(partial_ttl_seconds=partial_ttl_seconds)
+    assess = Assessor()
+
+    for _ in range(3):
+        asyncio.run(cache.get_or_compute(KEY, assess, is_partial=without_ipa))
+
+    assert assess.calls == calls
+    assert cache.get_stats()["partial"] == calls
+
+
+def test_partial_results_expire_before_complete_ones(tmp_path):
+    cache = make_cache(ttl_seconds=60, partial_ttl_seconds=0.05, disk_dir=str(tmp_path))
+    partial = Assessor()
+    complete = Assessor(result={"success": True, "overall_score": 80.0, "ipa_transcription": "θ ɪ ŋ k"})
+
+    asyncio.run(cache.get_or_compute(KEY, partial, is_partial=without_ipa))
+    time.sleep(0.1)
+    result = asyncio.run(cache.get_or_compute(KEY, complete, is_partial=without_ipa))
+
+    assert partial.calls == 1
+    assert complete.calls == 1
+    assert result["ipa_transcription"] == "θ ɪ ŋ k"
+
+
+def test_disk_tier_keeps_only_complete_results(tmp_path):
+    asyncio.run(make_cache(disk_dir=str(tmp_path), partial_ttl_seconds=60).get_or_compute(
+        "b" * 64, Assessor(), is_partial=without_ipa
+    ))
+    asyncio.run(make_cache(disk_dir=str(tmp_path)).get_or_compute(KEY, Assessor()))
+
+    restarted = make_cache(disk_dir=str(tmp_path))
+    assess = Assessor()
+    asyncio.run(restarted.get_or_compute(KEY, assess))
+    asyncio.run(restarted.get_or_compute("b" * 64, assess))
+
+    assert restarted.get_stats()["disk_hits"] == 1
+    assert assess.calls == 1
@@ -0,0 +1,100 @@
+"""Upload decoding (app.services.audio_decoder.AudioDecoder)"""
+import asyncio
+import io
+import threading
+import time
+import wave
+
+import numpy as np
+import pytest
+
+from app.core.executor import StageExecutor
+from app.services import audio_decoder as audio_decoder_module
+from app.services.audio_decoder import AudioDecodeError, AudioDecoder
+
+# EBML magic, so the upload is sniffed as webm and needs ffmpeg
+WEBM_UPLOAD = b"\x1aE\xdf\xa3" + bytes(64)
+
+
+def wav_upload(sample_rate: int, channels: int, frames: int) -> bytes:
+    output = io.BytesIO()
+    with wave.open(output, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(np.zeros(frames * channels, dtype="<i2").tobytes())
+    return output.getvalue()
+
+
+def slow_probe(decoder: AudioDecoder, seconds: float, available: bool = False) -> None:
+    def find_ffmpeg() -> bool:
+        time.sleep(seconds)
+        return available
+    decoder._find_ffmpeg = find_ffmpeg
+
+
+def test_cold_probe_does_not_block_the_event_loop():
+    decoder = AudioDecoder(max_concurrent=1, timeout=5)
+    slow_probe(decoder, 0.3)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.ensure_future(ticker())
+        with pytest.raises(AudioDecodeError, match="ffmpeg is not available"):
+            await decoder.decode(WEBM_UPLOAD, "webm")
+        ticking.cancel()
+        return ticks
+
+    # The loop kept running while ffmpeg was probed
+    assert asyncio.run(main()) >= 10
+
+
+def test_request_during_warm_up_probe_waits_for_its_answer():
+    decoder = AudioDecoder(max_concurrent=1, timeout=5)
+    slow_probe(decoder, 0.2, available=True)
+    warm_up = threading.Thread(target=decoder.probe)
+    warm_up.start()
+    time.sleep(0.05)
+
+    assert asyncio.run(decoder.probe_async()) is True
+    warm_up.join()
+
+
+def test_wav_is_converted_to_16k_mono():
+    decoder = AudioDecoder(max_concurrent=1, timeout=5)
+
+    audio = asyncio.run(decoder.decode(wav_upload(44100, 2, 44100), "wav"))
+
+    assert audio.sample_rate == 16000
+    assert audio.num_samples == 16000
+
+
+def test_empty_wav_is_rejected():
+    decoder = AudioDecoder(max_concurrent=1, timeout=5)
+
+    with pytest.raises(AudioDecodeError, match="WAV file has no audio"):
+        asyncio.run(decoder.decode(wav_upload(16000, 1, 0), "wav"))
+
+
+def test_slow_wav_conversion_times_out(monkeypatch):
+    def slow_conversion(data, wav, sample_rate):
+        time.sleep(0.3)
+        return b""
+
+    executor = StageExecutor(max_workers=1, max_pending=2)
+    monkeypatch.setattr(audio_decoder_module, "stage_executor", executor)
+    monkeypatch.setattr(audio_decoder_module, "wav_to_pcm16", slow_conversion)
+    decoder = AudioDecoder(max_concurrent=1, timeout=0.05)
+
+    try:
+        with pytest.raises(AudioDecodeError, match="timed out"):
+            asyncio.run(decoder.decode(wav_upload(8000, 1, 800), "wav"))
+    finally:
+        executor.shutdown()
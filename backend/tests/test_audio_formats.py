@@ -0,0 +1,130 @@
+"""WAV parsing and resampling (app.utils.audio_formats)"""
+import struct
+
+import numpy as np
+import pytest
+
+from app.utils.audio_formats import (
+    WAVE_FORMAT_EXTENSIBLE,
+    WAVE_FORMAT_IEEE_FLOAT,
+    WAVE_FORMAT_PCM,
+    WavError,
+    parse_wav,
+    resample,
+    sniff_container,
+    wav_to_pcm16,
+)
+
+
+def wav_file(
+    samples: bytes,
+    sample_rate: int = 16000,
+    channels: int = 1,
+    bits: int = 16,
+    format_tag: int = WAVE_FORMAT_PCM,
+    data_size=None,
+    extra_chunks: bytes = b""
+) -> bytes:
+    block_align = channels * bits // 8
+    if format_tag == WAVE_FORMAT_EXTENSIBLE:
+        fmt = struct.pack("<HHIIHH", format_tag, channels, sample_rate, sample_rate * block_align, block_align, bits)
+        # cbSize, valid bits, channel mask, then the subformat GUID (PCM)
+        fmt += struct.pack("<HHI", 22, bits, 0) + struct.pack("<H", WAVE_FORMAT_PCM) + bytes(14)
+    else:
+        fmt = struct.pack("<HHIIHH", format_tag, channels, sample_rate, sample_rate * block_align, block_align, bits)
+    size = len(samples) if data_size is None else data_size
+    body = (
+        b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + extra_chunks
+        + b"data" + struct.pack("<I", size) + samples
+    )
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def tone(frequency: float, sample_rate: int, seconds: float = 0.5, amplitude: float = 10000.0) -> np.ndarray:
+    return amplitude * np.sin(2 * np.pi * frequency * np.arange(int(sample_rate * seconds)) / sample_rate)
+
+
+def pcm16(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype="<i2").astype(np.float64)
+
+
+def test_sniffs_containers():
+    assert sniff_container(wav_file(bytes(4))) == "wav"
+    assert sniff_container(b"\x1aE\xdf\xa3" + bytes(8)) == "webm"
+    assert sniff_container(b"ID3\x04" + bytes(8)) == "mp3"
+    # Headerless PCM may start like an MPEG frame header
+    assert sniff_container(b"\xff\xfb" + bytes(10), frame_sync=False) is None
+
+
+def test_16k_mono_pcm_is_copied_unchanged():
+    samples = np.arange(-100, 100, dtype="<i2").tobytes()
+    data = wav_file(samples)
+
+    assert wav_to_pcm16(data, parse_wav(data), 16000) == samples
+
+
+@pytest.mark.parametrize("bits, format_tag, encode", [
+    (8, WAVE_FORMAT_PCM, lambda x: (np.rint(x / 256) + 128).astype(np.uint8).tobytes()),
+    (24, WAVE_FORMAT_PCM, lambda x: b"".join(int(v * 256).to_bytes(3, "little", signed=True) for v in np.rint(x))),
+    (32, WAVE_FORMAT_IEEE_FLOAT, lambda x: (x / 32768).astype("<f4").tobytes()),
+    (16, WAVE_FORMAT_EXTENSIBLE, lambda x: np.rint(x).astype("<i2").tobytes()),
+])
+def test_sample_encodings_become_pcm16(bits, format_tag, encode):
+    expected = tone(440, 16000)
+    data = wav_file(encode(expected), bits=bits, format_tag=format_tag)
+
+    converted = pcm16(wav_to_pcm16(data, parse_wav(data), 16000))
+
+    # 8-bit keeps only the top byte
+    assert np.abs(converted - expected).max() <= (129 if bits == 8 else 1)
+
+
+def test_stereo_is_averaged():
+    left, right = tone(440, 16000), -0.5 * tone(440, 16000)
+    interleaved = np.rint(np.stack([left, right], axis=1)).astype("<i2").tobytes()
+    data = wav_file(interleaved, channels=2)
+
+    converted = pcm16(wav_to_pcm16(data, parse_wav(data), 16000))
+
+    assert np.abs(converted - (left + right) / 2).max() <= 1
+
+
+@pytest.mark.parametrize("from_rate", [8000, 22050, 44100, 48000])
+def test_resampling_keeps_a_tone(from_rate):
+    converted = resample(tone(440, from_rate).astype(np.float32), from_rate, 16000)
+
+    assert len(converted) == 8000
+    # Away from the edges, where the filter runs into the zero padding
+    middle = slice(500, -500)
+    assert np.abs(converted[middle] - tone(440, 16000)[middle]).max() < 100
+
+
+def test_downsampling_removes_frequencies_above_the_new_nyquist():
+    converted = resample(tone(12000, 48000).astype(np.float32), 48000, 16000)
+
+    assert np.abs(converted[500:-500]).max() < 100
+
+
+def test_streaming_data_size_and_odd_chunks():
+    samples = np.arange(50, dtype="<i2").tobytes()
+    # An odd-sized LIST chunk is followed by a pad byte
+    data = wav_file(samples, data_size=0xFFFFFFFF, extra_chunks=b"LIST" + struct.pack("<I", 3) + b"abc\0")
+
+    wav = parse_wav(data)
+
+    assert wav.frame_count == 50
+    assert wav_to_pcm16(data, wav, 16000) == samples
+
+
+@pytest.mark.parametrize("data, message", [
+    (b"RIFF", "Too short"),
+    (b"RIFX" + bytes(4) + b"WAVE", "Not a RIFF/WAVE file"),
+    (wav_file(bytes(4))[:30], "Truncated fmt chunk"),
+    (b"RIFF" + bytes(4) + b"WAVE" + b"data" + struct.pack("<I", 2) + bytes(2), "data chunk before fmt chunk"),
+    (wav_file(bytes(4), format_tag=0x0002, bits=4), "Unsupported WAV encoding"),
+    (wav_file(bytes(4), channels=0), "Inconsistent WAV header"),
+    (wav_file(b"")[:36], "No data chunk"),
+])
+def test_malformed_files_are_rejected(data, message):
+    with pytest.raises(WavError, match=message):
+        parse_wav(data)
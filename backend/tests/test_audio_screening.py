@@ -0,0 +1,76 @@
+"""Speech detection before assessment (app.services.audio_screening.AudioScreener)"""
+import numpy as np
+import pytest
+
+from app.models.audio import AudioBuffer
+from app.services.audio_screening import AudioScreener
+from benchmarks.common import speech_like_pcm
+
+SAMPLE_RATE = 16000
+
+
+def buffer(samples: np.ndarray) -> AudioBuffer:
+    return AudioBuffer(pcm=np.clip(samples, -32768, 32767).astype(np.int16).tobytes(), sample_rate=SAMPLE_RATE)
+
+
+def noise(seconds: float, amplitude: float, seed: int = 1) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal(int(seconds * SAMPLE_RATE)) * amplitude
+
+
+@pytest.fixture
+def screener() -> AudioScreener:
+    return AudioScreener()
+
+
+@pytest.mark.parametrize("samples", [
+    np.zeros(SAMPLE_RATE),
+    # Steady noise well above speech_dbfs: nothing stands out from the floor
+    noise(3.0, 1000),
+    # Hum
+    8000 * np.sin(np.arange(SAMPLE_RATE) / 10),
+    # Too quiet to be speech
+    noise(0.5, 30, seed=2) + np.concatenate([np.zeros(4000), noise(0.25, 60), np.zeros(100)])[:8000],
+], ids=["silence", "steady noise", "tone", "quiet"])
+def test_recordings_without_speech_are_rejected(screener, samples):
+    result = screener.screen(buffer(samples))
+
+    assert result.rejected == "no_speech"
+    assert result.message == "No speech detected in the recording"
+
+
+def test_silence_around_speech_is_trimmed(screener):
+    speech = speech_like_pcm(2.0).astype(np.float64)
+    result = screener.screen(buffer(np.concatenate([noise(1.5, 30), speech, noise(2.0, 30)])))
+
+    assert result.rejected is None
+    assert 1.8 <= result.speech_seconds <= 2.0
+    # Speech plus at most pad_ms either side
+    assert 2.0 <= result.audio.duration <= 2.5
+
+
+def test_speech_throughout_is_kept_whole(screener):
+    audio = buffer(speech_like_pcm(2.0))
+    result = screener.screen(audio)
+
+    assert result.rejected is None
+    assert result.audio is audio
+
+
+def test_speech_over_steady_noise_is_kept(screener):
+    speech = speech_like_pcm(2.0).astype(np.float64)
+    result = screener.screen(buffer(np.concatenate([noise(1.0, 300), speech + noise(2.0, 300), noise(1.0, 300)])))
+
+    assert result.rejected is None
+    # The syllable envelope is silent about half the time
+    assert result.speech_seconds >= 0.8
+
+
+def test_clipped_speech_is_rejected(screener):
+    result = screener.screen(buffer(speech_like_pcm(2.0).astype(np.float64) * 20))
+
+    assert result.rejected == "clipped"
+    assert result.clipped_ratio > screener.max_clipped_ratio
+
+
+def test_too_short_input_is_rejected(screener):
+    assert screener.screen(buffer(np.zeros(10))).rejected == "no_speech"
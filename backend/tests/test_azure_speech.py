@@ -0,0 +1,77 @@
+"""Azure result handling (app.core.azure_speech.AzureSpeechService)"""
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from app.core import azure_speech
+from app.core.azure_speech import AzureSpeechService
+from app.core.fake_speech import FakeSpeechProvider
+from app.models.audio import AudioBuffer
+from app.utils import phoneme_mapper
+from app.utils.lexicon import Lexicon
+
+AUDIO = AudioBuffer(pcm=np.zeros(16000, dtype=np.int16).tobytes(), sample_rate=16000)
+
+
+class SlowLexicon(Lexicon):
+    """A cold lexicon whose first use takes a while, like building it"""
+
+    def _load(self) -> None:
+        if not self.loaded:
+            time.sleep(0.3)
+        super()._load()
+
+
+class InstantProvider:
+    def __init__(self, result):
+        self.result = result
+
+    async def recognize_async(self, audio: AudioBuffer, reference_text: str):
+        return self.result
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch) -> AzureSpeechService:
+    source = tmp_path / "dict.txt"
+    source.write_text("think TH IH1 NG K\n", encoding="utf-8")
+    # Built before the lexicon is swapped for the cold one
+    result = FakeSpeechProvider(0, 0).result_for("think")
+
+    cold = SlowLexicon(str(tmp_path / "dict.lex"), str(source))
+    monkeypatch.setattr(azure_speech, "lexicon", cold)
+    monkeypatch.setattr(phoneme_mapper, "lexicon", cold)
+    service = AzureSpeechService()
+    service.fake_provider = InstantProvider(result)
+    return service
+
+
+def test_cold_lexicon_is_loaded_off_the_event_loop(service):
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.ensure_future(ticker())
+        result = await service.assess_pronunciation_async(AUDIO, "think")
+        ticking.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(main())
+
+    assert result["success"]
+    assert result["expected_ipa"] == "θ ɪ ŋ k"
+    assert ticks >= 10
+    assert azure_speech.lexicon.loaded
+
+
+def test_precompiled_ipa_leaves_the_lexicon_closed(service):
+    result = asyncio.run(service.assess_pronunciation_async(AUDIO, "think", expected_ipa="θɪŋk"))
+
+    assert result["expected_ipa"] == "θɪŋk"
+    assert not azure_speech.lexicon.loaded
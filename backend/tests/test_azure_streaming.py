@@ -0,0 +1,42 @@
+"""Streaming segments (app.core.azure_streaming.StreamingAssessmentSession)"""
+import asyncio
+import types
+
+from app.core.azure_speech import AzureSpeechService
+from app.core.azure_streaming import StreamingAssessmentSession
+from app.core.fake_speech import FakeSpeechProvider
+from app.models.phonemes import phoneme_inventory
+
+
+def recognize_segments(segment_texts, expected_phonemes):
+    async def main():
+        session = StreamingAssessmentSession(
+            AzureSpeechService(),
+            reference_text=" ".join(segment_texts),
+            expected_phonemes=expected_phonemes
+        )
+        for text in segment_texts:
+            session._on_recognized(types.SimpleNamespace(result=FakeSpeechProvider(0, 0).result_for(text)))
+        await asyncio.sleep(0)
+        return session
+
+    return asyncio.run(main())
+
+
+def test_segments_use_the_drills_expected_ipa():
+    # The drill's "is" differs from the dictionary's "ɪ z"; "good" is not in it
+    drill_words = {
+        "this": tuple(phoneme_inventory.ids_of_ipa("ð ɪ s")),
+        "is": tuple(phoneme_inventory.ids_of_ipa("ɪ s"))
+    }
+
+    session = recognize_segments(["this is", "good"], drill_words)
+
+    assert [segment["expected_ipa"] for segment in session._segments] == ["ð ɪ s ɪ s", "ɡ ʊ d"]
+    assert session._aggregate()["expected_ipa"] == "ð ɪ s ɪ s ɡ ʊ d"
+
+
+def test_segments_without_a_drill_use_the_lexicon():
+    session = recognize_segments(["this is"], None)
+
+    assert session._segments[0]["expected_ipa"] == "ð ɪ s ɪ z"
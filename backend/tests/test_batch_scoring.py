@@ -0,0 +1,88 @@
+"""Batch scoring endpoint (app.api.routes.pronunciation /api/score/batch)"""
+import asyncio
+import base64
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import pronunciation
+from app.core.config import settings
+from app.models.schemas import ErrorResponse
+
+AUDIO = base64.b64encode(b"\0" * 64).decode()
+
+
+@pytest.fixture
+def assessments(monkeypatch):
+    """Fake assessment: an item's text is its duration in seconds; it "fails" with that text"""
+    state = {"running": 0, "most": 0}
+
+    async def run_assessment(audio_data, text, audio_format, drill=None):
+        state["running"] += 1
+        state["most"] = max(state["most"], state["running"])
+        try:
+            await asyncio.sleep(float(text))
+        finally:
+            state["running"] -= 1
+        return 400, ErrorResponse(message=text)
+
+    monkeypatch.setattr(pronunciation, "_run_assessment", run_assessment)
+    return state
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(pronunciation.router)
+    return TestClient(app)
+
+
+def batch(*durations, **options):
+    return {"items": [{"text": str(duration), "audio_data": AUDIO} for duration in durations], **options}
+
+
+def stream(client, body):
+    response = client.post("/api/score/batch", json={**body, "stream": True})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_streamed_in_input_order(client, assessments):
+    lines = stream(client, batch(0.2, 0, 0.1))
+
+    assert [line["index"] for line in lines] == [0, 1, 2]
+    assert [line["error"]["message"] for line in lines] == ["0.2", "0", "0.1"]
+
+
+def test_streamed_in_completion_order(client, assessments):
+    lines = stream(client, batch(0.2, 0, 0.1, order="completion"))
+
+    assert [line["index"] for line in lines] == [1, 2, 0]
+
+
+def test_one_response_in_input_order(client, assessments):
+    body = batch(0.1, 0)
+    body["items"].insert(1, {"text": "0", "audio_data": "not base64!"})
+
+    response = client.post("/api/score/batch", json=body).json()
+
+    assert [result["index"] for result in response["results"]] == [0, 1, 2]
+    assert response["results"][1]["error"]["message"] == "Invalid base64 audio data"
+    assert (response["succeeded"], response["failed"]) == (0, 3)
+
+
+def test_concurrency_is_capped(client, assessments, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_CONCURRENCY", 2)
+
+    stream(client, batch(0.05, 0.05, 0.05, 0.05, 0.05))
+
+    assert assessments["most"] == 2
+
+
+def test_batch_size_limits(client, assessments, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_MAX_ITEMS", 2)
+
+    assert client.post("/api/score/batch", json=batch()).status_code == 400
+    assert client.post("/api/score/batch", json=batch(0, 0, 0)).status_code == 413
@@ -0,0 +1,71 @@
+"""Bounded stage worker pool (app.core.executor.StageExecutor)"""
+import asyncio
+import contextvars
+import threading
+
+import pytest
+
+from app.core.executor import StageExecutor, StageTimeout, WorkerPoolSaturated
+
+request_id = contextvars.ContextVar("request_id", default="-")
+
+
+@pytest.fixture
+def executor():
+    executor = StageExecutor(max_workers=2, max_pending=3)
+    yield executor
+    executor.shutdown()
+
+
+def test_runs_blocking_calls_with_the_callers_context(executor):
+    async def main():
+        request_id.set("req-1")
+        return await executor.run("test", lambda a, b=0: (a + b, request_id.get()), 1, b=2)
+
+    assert asyncio.run(main()) == (3, "req-1")
+    assert executor.pending == 0
+
+
+def test_jobs_over_the_limit_are_rejected(executor):
+    release = threading.Event()
+
+    async def main():
+        jobs = [asyncio.ensure_future(executor.run("test", release.wait)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        assert executor.pending == 3
+        with pytest.raises(WorkerPoolSaturated):
+            await executor.run("test", release.wait)
+        release.set()
+        await asyncio.gather(*jobs)
+
+    asyncio.run(main())
+    assert executor.pending == 0
+
+
+def test_timed_out_job_keeps_its_slot_until_it_finishes(executor):
+    release = threading.Event()
+
+    async def main():
+        with pytest.raises(StageTimeout) as error:
+            await executor.run("azure", release.wait, timeout=0.05)
+        # Still running on its thread
+        assert executor.pending == 1
+        release.set()
+        for _ in range(100):
+            if executor.pending == 0:
+                break
+            await asyncio.sleep(0.01)
+        return error.value
+
+    error = asyncio.run(main())
+    assert (error.stage, error.timeout) == ("azure", 0.05)
+    assert executor.pending == 0
+
+
+def test_errors_are_raised_to_the_caller(executor):
+    def fail():
+        raise ValueError("bad audio")
+
+    with pytest.raises(ValueError, match="bad audio"):
+        asyncio.run(executor.run("decode", fail))
+    assert executor.pending == 0
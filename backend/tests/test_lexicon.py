@@ -0,0 +1,56 @@
+"""Pronunciation lexicon (app.utils.lexicon.Lexicon)"""
+import os
+
+import pytest
+
+from app.utils.lexicon import Lexicon, LexiconError, build_lexicon
+
+SOURCE = """\
+read R EH1 D
+read(2) R IY1 D
+think TH IH1 NG K  # comment
+zebra Z IY1 B R AH0
+"""
+
+
+@pytest.fixture
+def source(tmp_path) -> str:
+    path = tmp_path / "dict.txt"
+    path.write_text(SOURCE, encoding="utf-8")
+    return str(path)
+
+
+def test_lookup_in_compiled_file(source, tmp_path):
+    path = str(tmp_path / "dict.lex")
+    assert build_lexicon(source, path) == (3, 4)
+    lexicon = Lexicon(path, source_path=None)
+
+    assert lexicon.lookup("THINK") == [("TH", "IH1", "NG", "K")]
+    # Variants in dictionary order, most common first
+    assert lexicon.lookup("read") == [("R", "EH1", "D"), ("R", "IY1", "D")]
+    assert lexicon.lookup("aardvark") == []
+    assert lexicon.lookup("zzz") == []
+    assert "zebra" in lexicon
+    assert len(lexicon) == 3
+
+
+def test_missing_file_is_built_from_source(source, tmp_path):
+    path = str(tmp_path / "built.lex")
+    lexicon = Lexicon(path, source_path=source)
+
+    assert lexicon.load() == 3
+    assert os.path.exists(path)
+    assert lexicon.lookup("zebra") == [("Z", "IY1", "B", "R", "AH0")]
+
+
+def test_failed_load_is_not_retried(tmp_path, monkeypatch):
+    lexicon = Lexicon(str(tmp_path / "missing.lex"), source_path=None)
+    with pytest.raises(LexiconError, match="not found"):
+        lexicon.lookup("think")
+
+    def fail():
+        raise AssertionError("lexicon load retried")
+    monkeypatch.setattr(lexicon, "_compiled_path", fail)
+    with pytest.raises(LexiconError, match="not found"):
+        lexicon.lookup("think")
+    assert not lexicon.loaded
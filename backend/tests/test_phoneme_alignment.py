@@ -0,0 +1,97 @@
+"""Weighted phoneme alignment (app.services.phoneme_alignment.PhonemeAligner)"""
+import random
+from typing import List, Sequence
+
+import pytest
+
+from app.models.phonemes import phoneme_inventory
+from app.services.phoneme_alignment import AlignmentOp, PhonemeAligner
+
+PHONES = ["p", "b", "t", "d", "k", "s", "z", "θ", "ð", "m", "n", "l", "ɹ", "w", "i", "ɪ", "ɛ", "æ", "ə", "u"]
+
+
+@pytest.fixture
+def aligner() -> PhonemeAligner:
+    return PhonemeAligner()
+
+
+def ids(ipa: str) -> List[int]:
+    return list(phoneme_inventory.ids_of_ipa(ipa))
+
+
+def ops(alignment: Sequence[AlignmentOp]) -> List[str]:
+    return [step.op for step in alignment]
+
+
+def cost(aligner: PhonemeAligner, expected: Sequence[int], actual: Sequence[int], alignment: Sequence[AlignmentOp]) -> float:
+    costs = aligner._cost_matrix()
+    total = 0.0
+    for step in alignment:
+        if step.op in ("match", "sub"):
+            total += float(costs[expected[step.expected], actual[step.actual]])
+        else:
+            total += 1.0
+    return total
+
+
+def test_similar_sounds_are_paired(aligner):
+    # "think" said as "sink": θ -> s is a same-class substitution
+    assert aligner.align(ids("θ ɪ ŋ k"), ids("s ɪ ŋ k")) == [
+        AlignmentOp("sub", 0, 0),
+        AlignmentOp("match", 1, 1),
+        AlignmentOp("match", 2, 2),
+        AlignmentOp("match", 3, 3),
+    ]
+    # Accent variants count as matches
+    assert ops(aligner.align(ids("ə b ʌ v"), ids("ʌ b ə v"))) == ["match"] * 4
+
+
+def test_dropped_and_extra_phones(aligner):
+    assert ops(aligner.align(ids("h æ n d z"), ids("h æ n z"))) == ["match", "match", "match", "del", "match"]
+    assert ops(aligner.align(ids("s p u n"), ids("ə s p u n"))) == ["ins", "match", "match", "match", "match"]
+    assert ops(aligner.align([], ids("ə"))) == ["ins"]
+    assert ops(aligner.align(ids("ə"), [])) == ["del"]
+
+
+def test_batch_matches_single_alignments(aligner):
+    pairs = [
+        (ids("θ ɪ ŋ k"), ids("s ɪ ŋ k")),
+        (ids("ð ɪ s"), ids("d ɪ s ə")),
+        (ids("ɡ ʊ d"), ids("ɡ d")),
+        ([], ids("ə")),
+    ]
+    assert aligner.align_batch(pairs) == [aligner.align(*pair, band=None) for pair in pairs]
+
+
+def test_band_finds_the_optimum_for_long_transcripts(aligner):
+    rng = random.Random(7)
+    expected = ids(" ".join(rng.choice(PHONES) for _ in range(400)))
+    actual = list(expected)
+    for _ in range(30):
+        position = rng.randrange(len(actual))
+        edit = rng.choice(("sub", "del", "ins"))
+        if edit == "sub":
+            actual[position] = ids(rng.choice(PHONES))[0]
+        elif edit == "del":
+            del actual[position]
+        else:
+            actual.insert(position, ids(rng.choice(PHONES))[0])
+
+    banded = aligner.align(expected, actual, band=16)
+    full = aligner.align(expected, actual, band=None)
+
+    assert cost(aligner, expected, actual, banded) == pytest.approx(cost(aligner, expected, actual, full))
+    assert [step.expected for step in banded if step.expected >= 0] == list(range(len(expected)))
+    assert [step.actual for step in banded if step.actual >= 0] == list(range(len(actual)))
+
+
+def test_band_widens_for_lopsided_lengths(aligner):
+    expected = ids("k æ t")
+    actual = ids(" ".join(["ə"] * 60) + " k æ t")
+
+    # A band of 2 around the diagonal would leave rows without reachable cells
+    alignment = aligner.align(expected, actual, band=2)
+
+    assert [step.expected for step in alignment if step.expected >= 0] == [0, 1, 2]
+    assert [step.actual for step in alignment if step.actual >= 0] == list(range(len(actual)))
+    assert ops(aligner.align(expected, actual, band=None)).count("match") == 3
@@ -0,0 +1,108 @@
+"""Batched Allosaurus transcription (app.services.phoneme_server.AllosaurusModel)"""
+import sys
+import threading
+import types
+from contextlib import contextmanager
+from typing import List
+
+import numpy as np
+import pytest
+
+from app.models.audio import AudioBuffer
+from app.services.phoneme_server import AllosaurusModel
+
+SAMPLE_RATE = 16000
+# Samples per feature frame of the fake front end
+HOP = 160
+
+
+class FakeOutput:
+    def __init__(self, array: np.ndarray):
+        self.array = array
+
+    def cpu(self) -> "FakeOutput":
+        return self
+
+    def numpy(self) -> np.ndarray:
+        return self.array
+
+
+class FakeModel:
+    """
+    Stand-in for allosaurus.app.Recognizer
+
+    Each frame's features hold the clip's first sample, so the "IPA" of a
+    clip names which clip it was and how many frames it had. Like
+    AllosaurusTorchModel (pack_padded_sequence with enforce_sorted=True),
+    the acoustic model rejects batches not sorted longest first.
+    """
+
+    def __init__(self):
+        self.config = types.SimpleNamespace(device_id=-1)
+        self.pm = types.SimpleNamespace(compute=self._features)
+        self.lm = types.SimpleNamespace(compute=self._decode)
+        self.batch_sizes: List[int] = []
+
+    def _features(self, audio: types.SimpleNamespace) -> np.ndarray:
+        return np.full((len(audio.samples) // HOP, 2), float(audio.samples[0]), dtype=np.float32)
+
+    def am(self, feats: np.ndarray, lengths: np.ndarray) -> FakeOutput:
+        if any(lengths[index] < lengths[index + 1] for index in range(len(lengths) - 1)):
+            raise RuntimeError("`lengths` array must be sorted in decreasing order when `enforce_sorted` is True")
+        self.batch_sizes.append(len(lengths))
+        return FakeOutput(feats)
+
+    def _decode(self, lprobs: np.ndarray, output: str, topk: int) -> str:
+        return f"clip{int(lprobs[0, 0])}  {len(lprobs)}"
+
+
+@pytest.fixture
+def allosaurus_modules(monkeypatch):
+    """Minimal torch and allosaurus modules for AllosaurusModel._transcribe_batch"""
+    @contextmanager
+    def no_grad():
+        yield
+
+    modules = {
+        "torch": types.SimpleNamespace(no_grad=no_grad),
+        "allosaurus": types.ModuleType("allosaurus"),
+        "allosaurus.am": types.ModuleType("allosaurus.am"),
+        "allosaurus.am.utils": types.SimpleNamespace(move_to_tensor=lambda arrays, device_id: arrays),
+        "allosaurus.audio": types.SimpleNamespace(
+            Audio=lambda samples, sample_rate: types.SimpleNamespace(samples=samples, sample_rate=sample_rate)
+        )
+    }
+    for name, module in modules.items():
+        monkeypatch.setitem(sys.modules, name, module)
+
+
+def clip(clip_id: int, frames: int) -> AudioBuffer:
+    return AudioBuffer(pcm=np.full(frames * HOP, clip_id, dtype=np.int16).tobytes(), sample_rate=SAMPLE_RATE)
+
+
+def test_batch_of_ascending_lengths_keeps_request_order(allosaurus_modules):
+    model = AllosaurusModel()
+    model.model = FakeModel()
+
+    results = model._transcribe_batch([clip(1, 10), clip(2, 25), clip(3, 25), clip(4, 40)])
+
+    assert results == ["clip1 10", "clip2 25", "clip3 25", "clip4 40"]
+
+
+def test_concurrent_transcriptions_of_unequal_length(allosaurus_modules):
+    model = AllosaurusModel(batch_window_seconds=0.2, max_batch_size=4)
+    model.model = FakeModel()
+    results = {}
+
+    def transcribe(clip_id: int) -> None:
+        results[clip_id] = model.transcribe(clip(clip_id, clip_id * 5))
+
+    # Submitted shortest first, so an unsorted batch would fail every caller
+    threads = [threading.Thread(target=transcribe, args=(clip_id,)) for clip_id in range(1, 5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert results == {clip_id: f"clip{clip_id} {clip_id * 5}" for clip_id in range(1, 5)}
+    assert max(model.model.batch_sizes) > 1
@@ -0,0 +1,113 @@
+"""Pre-connected Azure recognizers (app.core.recognizer_pool.RecognizerPool)"""
+import time
+import types
+from typing import List
+
+import pytest
+
+from app.core import recognizer_pool
+from app.core.recognizer_pool import RecognizerPool
+
+
+class FakeSignal:
+    def __init__(self):
+        self.handlers: List = []
+
+    def connect(self, handler) -> None:
+        self.handlers.append(handler)
+
+    def disconnect_all(self) -> None:
+        self.handlers = []
+
+    def fire(self) -> None:
+        for handler in list(self.handlers):
+            handler(None)
+
+
+class FakeConnection:
+    """Connection.open() succeeds or is rejected right away, like a bad key"""
+
+    def __init__(self, service: "FakeService"):
+        self.service = service
+        self.connected = FakeSignal()
+        self.disconnected = FakeSignal()
+
+    def open(self, for_continuous_recognition: bool) -> None:
+        self.service.opened += 1
+        if self.service.reachable:
+            self.connected.fire()
+        else:
+            self.disconnected.fire()
+
+    def close(self) -> None:
+        pass
+
+
+class FakeService:
+    def __init__(self, reachable: bool):
+        self.reachable = reachable
+        self.opened = 0
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = FakeService(reachable=False)
+    speechsdk = types.SimpleNamespace(
+        Connection=types.SimpleNamespace(from_recognizer=lambda recognizer: FakeConnection(service))
+    )
+    monkeypatch.setattr(recognizer_pool, "speechsdk", speechsdk)
+    return service
+
+
+def make_pool(**kwargs) -> RecognizerPool:
+    pool = RecognizerPool(lambda: (object(), object()), size=4, idle_seconds=60, **kwargs)
+    pool.start()
+    return pool
+
+
+def test_rejected_connections_back_off(service):
+    pool = make_pool(backoff_seconds=0.1, max_backoff_seconds=0.2)
+    try:
+        time.sleep(0.55)
+    finally:
+        pool.stop()
+
+    # One attempt at a time, at 0, 0.1, 0.3 and 0.5s, instead of a reconnect loop
+    assert 3 <= service.opened <= 5
+    assert pool.get_stats()["failures"] == service.opened
+    assert pool._retry_at - time.monotonic() <= 0.2
+
+
+def test_successful_connect_resets_the_backoff(service):
+    pool = make_pool(backoff_seconds=0.1, max_backoff_seconds=10)
+    try:
+        time.sleep(0.2)
+        assert pool.get_stats()["failures"] >= 1
+        service.reachable = True
+        deadline = time.monotonic() + 2
+        while pool.get_stats()["connected"] < pool.size and time.monotonic() < deadline:
+            time.sleep(0.02)
+        stats = pool.get_stats()
+    finally:
+        pool.stop()
+
+    assert stats["failures"] == 0
+    assert stats["connected"] == pool.size
+
+
+def test_disconnect_of_checked_out_recognizer_is_not_a_failure(service):
+    service.reachable = True
+    pool = make_pool()
+    try:
+        deadline = time.monotonic() + 2
+        entry = None
+        while entry is None and time.monotonic() < deadline:
+            entry = pool.acquire()
+            time.sleep(0.01)
+        assert entry is not None
+
+        entry.connection.disconnected.fire()
+        assert pool.get_stats()["failures"] == 0
+        pool.release(entry)
+    finally:
+        pool.stop()
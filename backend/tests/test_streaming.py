@@ -0,0 +1,88 @@
+"""Live scoring WebSocket (app.api.routes.streaming)"""
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import streaming
+from app.core.config import settings
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Semaphore of a fresh event loop for each test
+    monkeypatch.setattr(streaming, "_session_slots", None)
+    app = FastAPI()
+    app.include_router(streaming.router)
+    with TestClient(app) as client:
+        yield client
+
+
+def start(websocket, **fields):
+    websocket.send_json({"type": "start", **fields})
+    return websocket.receive_json()
+
+
+@pytest.mark.parametrize("fields, field", [
+    ({"text": ["think"]}, "text"),
+    ({"text": "think", "exercise_id": 6}, "exercise_id"),
+    ({"exercise_id": {"id": "ex-6"}}, "exercise_id"),
+    ({"text": "think", "audio_format": ["pcm"]}, "audio_format"),
+])
+def test_start_fields_must_be_strings(client, fields, field):
+    with client.websocket_connect("/ws/score") as websocket:
+        reply = start(websocket, **fields)
+
+    assert reply["type"] == "error"
+    assert reply["message"] == f'Start message field "{field}" must be a string'
+
+
+def test_session_scores_after_stop(client):
+    with client.websocket_connect("/ws/score") as websocket:
+        assert start(websocket, text="think this") == {"type": "ready"}
+        websocket.send_bytes(bytes(3200))
+        # Not a control message; ignored
+        websocket.send_text("5")
+        websocket.send_json({"type": "stop"})
+        reply = websocket.receive_json()
+
+    assert reply["type"] == "result"
+    assert reply["expected_text"] == "think this"
+
+
+def test_sessions_over_the_limit_are_rejected(client, monkeypatch):
+    monkeypatch.setattr(settings, "STREAMING_MAX_SESSIONS", 1)
+    with client.websocket_connect("/ws/score") as first:
+        assert start(first, text="think") == {"type": "ready"}
+        with client.websocket_connect("/ws/score") as second:
+            reply = second.receive_json()
+        first.send_json({"type": "stop"})
+        assert first.receive_json()["type"] == "result"
+
+    assert reply["message"] == "Too many streaming sessions, try again later"
+
+    # The slot is free again
+    with client.websocket_connect("/ws/score") as third:
+        assert start(third, text="think") == {"type": "ready"}
+
+
+def test_idle_session_is_closed(client, monkeypatch):
+    monkeypatch.setattr(settings, "STREAMING_IDLE_TIMEOUT_SECONDS", 0.2)
+    with client.websocket_connect("/ws/score") as websocket:
+        assert start(websocket, text="think") == {"type": "ready"}
+        began = time.monotonic()
+        reply = websocket.receive_json()
+
+    assert reply["message"] == "No audio for 0.2s"
+    assert time.monotonic() - began < 2
+
+
+def test_oversized_stream_is_closed(client, monkeypatch):
+    monkeypatch.setattr(settings, "STREAMING_MAX_SECONDS", 1)
+    with client.websocket_connect("/ws/score") as websocket:
+        assert start(websocket, text="think") == {"type": "ready"}
+        websocket.send_bytes(bytes(streaming.PCM_BYTES_PER_SECOND + 2))
+        reply = websocket.receive_json()
+
+    assert reply["message"] == "Audio stream exceeds the size limit"